@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Admin Authentication Module
+
+This module provides the admin_required decorator for API routes that change
+how the server runs. Callers send the admin token as a bearer token
+(Authorization: Bearer <token>); without a configured token the routes are
+disabled rather than open.
+"""
+
+import hmac
+import functools
+import logging
+from flask import request
+from api_error_handler import error_response
+
+logger = logging.getLogger("admin_auth")
+
+def request_token():
+    """Bearer token sent with the current request, or None"""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+def admin_required(get_token):
+    """Decorator: only let through requests carrying the token get_token() returns"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            expected = get_token()
+            if not expected:
+                return error_response("Admin endpoints are disabled; set ADMIN_TOKEN to enable them", 403)
+            token = request_token()
+            if token is None or not hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8")):
+                logger.warning(f"Rejected admin request to {request.path} from {request.remote_addr}")
+                return error_response("Admin token required", 401)
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
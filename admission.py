@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Admission Control Module
+
+This module keeps dashboard traffic from starving the gate lanes, which share
+the Pi's cores with every HTTP request. It provides:
+
+- per-client token buckets, so one browser (or a script) cannot flood the API;
+- concurrency limits per class of endpoint, so only a few camera streams or
+  heavy report queries run at once;
+- a gate load signal read from the lanes' frame schedulers. While the lanes
+  miss their frame slots, streams and heavy endpoints are shed with 503 and
+  snapshots are served from an older cached JPEG.
+
+Rejected requests get 429 (rate limit) or 503 (busy or shed) with a
+Retry-After header, in the API's usual error format.
+"""
+
+import time
+import functools
+import logging
+import threading
+from collections import OrderedDict
+from flask import request
+from api_error_handler import error_response
+from metrics import Counter, Gauge
+
+logger = logging.getLogger("admission")
+
+HTTP_REJECTED = Counter("http_rejected_total", "Requests turned away by admission control", ["kind", "reason"])
+GATE_OVERLOADED = Gauge("gate_overloaded", "1 while the gate lanes miss their frame budget and API work is shed")
+
+class TokenBucket:
+    """One client's tokens; refilled at the limiter's rate up to its burst"""
+
+    def __init__(self, burst, now):
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, rate, burst, now):
+        """Take one token; returns 0 if there was one, else the seconds until there is"""
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / rate
+
+class ClientRateLimiter:
+    """Token bucket per client address; the least recently seen clients are forgotten"""
+
+    def __init__(self, rate=20.0, burst=40, max_clients=1024, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.clock = clock
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def check(self, client):
+        """0 if the client may make a request now, else the seconds it should wait"""
+        if not self.rate:
+            return 0.0
+        now = self.clock()
+        with self.lock:
+            bucket = self.buckets.get(client)
+            if bucket is None:
+                bucket = self.buckets[client] = TokenBucket(self.burst, now)
+                if len(self.buckets) > self.max_clients:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(client)
+            return bucket.take(self.rate, self.burst, now)
+
+class ConcurrencyLimit:
+    """Non-blocking limit on requests of one kind in progress"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.active = 0
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        with self.lock:
+            if self.active >= self.limit:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self.lock:
+            self.active -= 1
+
+class GateLoad:
+    """Whether the gate lanes are missing their frame budget
+
+    The lanes count as overloaded while any lane's share of frames that
+    overran their slot is above late_ratio_limit, and for hold seconds after,
+    so shedding does not flap on and off with every frame.
+    """
+
+    def __init__(self, schedulers, late_ratio_limit=0.2, hold=5.0, clock=time.monotonic):
+        self.schedulers = schedulers  # Callable returning the lanes' FrameSchedulers
+        self.late_ratio_limit = late_ratio_limit
+        self.hold = hold
+        self.clock = clock
+        self.overloaded_until = 0.0
+
+    def overloaded(self):
+        now = self.clock()
+        if any(scheduler.late_ratio > self.late_ratio_limit for scheduler in self.schedulers()):
+            if now >= self.overloaded_until:
+                logger.warning("Gate lanes are missing their frame budget; shedding streams and heavy requests")
+            self.overloaded_until = now + self.hold
+        overloaded = now < self.overloaded_until
+        GATE_OVERLOADED.set(1 if overloaded else 0)
+        return overloaded
+
+class AdmissionController:
+    """Rate limits, concurrency limits and load shedding for the Flask app"""
+
+    # Kinds of endpoint with a concurrency limit; shed ones are refused while the gate is overloaded
+    SHED_KINDS = ("stream", "heavy")
+
+    def __init__(self, load, limits, rate=20.0, burst=40):
+        self.load = load
+        self.limits = {kind: ConcurrencyLimit(limit) for kind, limit in limits.items()}
+        self.rate_limiter = ClientRateLimiter(rate, burst)
+        self.exempt = set()
+
+    def init_app(self, app):
+        """Apply the per-client rate limit to every request except exempt endpoints"""
+        @app.before_request
+        def check_rate_limit():
+            if request.endpoint in self.exempt or request.method == "OPTIONS":
+                return None
+            wait = self.rate_limiter.check(request.remote_addr)
+            if wait:
+                return self.reject("rate", "rate_limited", 429, "Too many requests", wait)
+            return None
+
+    def exempt_endpoint(self, func):
+        """Decorator: skip the rate limit for this view (health checks, admin)"""
+        self.exempt.add(func.__name__)
+        return func
+
+    def reject(self, kind, reason, status, message, retry_after):
+        HTTP_REJECTED.labels(kind, reason).inc()
+        response, status = error_response(message, status)
+        response.headers["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+        return response, status
+
+    def acquire(self, kind):
+        """Start a request of a limited kind; returns None, or the rejection response"""
+        if kind in self.SHED_KINDS and self.load.overloaded():
+            return self.reject(kind, "shed", 503, "Gate is busy; try again shortly", self.load.hold)
+        if not self.limits[kind].try_acquire():
+            return self.reject(kind, "busy", 503, f"Too many {kind} requests in progress", 2)
+        return None
+
+    def release(self, kind):
+        self.limits[kind].release()
+
+    def limit(self, kind):
+        """Decorator: run the view only with a free slot of its kind, and not while shed"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                rejected = self.acquire(kind)
+                if rejected is not None:
+                    return rejected
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.release(kind)
+            return wrapper
+        return decorator
+
+    def set_limits(self, limits):
+        """Change the concurrency limits while running; requests in progress keep their slot"""
+        for kind, limit in limits.items():
+            self.limits[kind].limit = limit
+
+    def summary(self):
+        return {
+            "overloaded": self.load.overloaded(),
+            "active": {kind: limit.active for kind, limit in self.limits.items()},
+            "limits": {kind: limit.limit for kind, limit in self.limits.items()}
+        }
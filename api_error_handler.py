@@ -11,16 +11,7 @@ import functools
 import logging
 from flask import jsonify
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("api_server.log"),
-        logging.StreamHandler()
-    ]
-)
-
+# Handlers are set up once by logging_setup.configure_logging()
 logger = logging.getLogger("api_server")
 
 # Error response generator
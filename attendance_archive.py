@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Attendance Archive Module
+
+This module keeps student_attendance small. The table can be range-partitioned
+by month on its date column, so queries that filter on a date range only read
+the partitions they need. Months older than the retention period are exported
+to compressed files on local disk (CSV.gz, or Parquet when pyarrow is
+installed) and then removed from the table. With partitioning, removing a month
+drops its partition instead of deleting rows one by one, which spares the SD
+card. The report rollups are kept, so reports still cover archived months.
+
+Archived months are recorded in a manifest.json next to the files, with row
+counts and checksums.
+"""
+
+import os
+import csv
+import gzip
+import json
+import hashlib
+import logging
+from datetime import date
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger("attendance_archive")
+
+COLUMNS = ("id", "student_id", "date", "timestamp", "status", "verification_method")
+
+# Rows removed per statement when the table is not partitioned
+DELETE_BATCH = 5000
+
+def month_start(day):
+    return day.replace(day=1)
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month):
+    return f"p{month.year:04d}{month.month:02d}"
+
+def is_partitioned(cursor):
+    """True if student_attendance is partitioned (MySQL only)"""
+    cursor.execute("SELECT COUNT(*) FROM information_schema.PARTITIONS WHERE TABLE_SCHEMA = DATABASE() "
+                   "AND TABLE_NAME = 'student_attendance' AND PARTITION_NAME IS NOT NULL")
+    return cursor.fetchone()[0] > 0
+
+def _partition_clauses(first_month, last_month):
+    clauses = []
+    month = first_month
+    while month <= last_month:
+        clauses.append(f"PARTITION {partition_name(month)} VALUES LESS THAN ('{add_months(month, 1).isoformat()}')")
+        month = add_months(month, 1)
+    clauses.append("PARTITION pfuture VALUES LESS THAN (MAXVALUE)")
+    return clauses
+
+def partition_table(cursor, today, months_ahead=3):
+    """Convert student_attendance to monthly RANGE COLUMNS(date) partitions
+
+    MySQL requires every unique key to contain the partitioning column, so the
+    primary key becomes (id, date); (student_id, date) is unique already. This
+    rebuilds the table and can take a while on a large one.
+    """
+    cursor.execute("SELECT MIN(date) FROM student_attendance")
+    first = cursor.fetchone()[0]
+    first_month = month_start(first) if first else month_start(today)
+    last_month = add_months(month_start(today), months_ahead)
+
+    cursor.execute("ALTER TABLE student_attendance DROP PRIMARY KEY, ADD PRIMARY KEY (id, date)")
+    cursor.execute("ALTER TABLE student_attendance PARTITION BY RANGE COLUMNS(date) ("
+                   + ", ".join(_partition_clauses(first_month, last_month)) + ")")
+    logger.info(f"Partitioned student_attendance by month from {first_month} to {last_month}")
+
+def ensure_future_partitions(cursor, today, months_ahead=3):
+    """Split the catch-all partition so the coming months each have their own"""
+    cursor.execute("SELECT PARTITION_NAME FROM information_schema.PARTITIONS WHERE TABLE_SCHEMA = DATABASE() "
+                   "AND TABLE_NAME = 'student_attendance' AND PARTITION_NAME LIKE 'p______'")
+    existing = {row[0] for row in cursor.fetchall()}
+    missing = []
+    month = month_start(today)
+    for _ in range(months_ahead + 1):
+        if partition_name(month) not in existing:
+            missing.append(month)
+        month = add_months(month, 1)
+    if not missing:
+        return 0
+    # Months can only be split off the end, in order
+    start = missing[0]
+    last = add_months(month_start(today), months_ahead)
+    cursor.execute("ALTER TABLE student_attendance REORGANIZE PARTITION pfuture INTO ("
+                   + ", ".join(_partition_clauses(start, last)) + ")")
+    return len(missing)
+
+class AttendanceArchive:
+    """Archive directory and its manifest"""
+
+    def __init__(self, directory, file_format="csv"):
+        if file_format == "parquet" and pyarrow is None:
+            logger.warning("pyarrow is not installed; archiving as CSV instead of Parquet")
+            file_format = "csv"
+        self.directory = directory
+        self.file_format = file_format
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def months(self):
+        """Archived months, oldest first"""
+        return [{"month": month, **entry} for month, entry in sorted(self.manifest.items())]
+
+    def path(self, month_key):
+        entry = self.manifest.get(month_key)
+        return os.path.join(self.directory, entry["file"]) if entry else None
+
+    def retained_since(self):
+        """First day still in the table, or None when nothing was archived"""
+        if not self.manifest:
+            return None
+        last = date.fromisoformat(max(self.manifest) + "-01")
+        return add_months(last, 1)
+
+    def _write(self, month, rows):
+        """Write rows to the month's file atomically; returns (file name, sha256)"""
+        os.makedirs(self.directory, exist_ok=True)
+        if self.file_format == "parquet":
+            name = f"attendance-{month:%Y-%m}.parquet"
+            columns = {column: [None if row[i] is None else str(row[i]) for row in rows]
+                       for i, column in enumerate(COLUMNS)}
+            columns["id"] = [row[0] for row in rows]
+            tmp_path = os.path.join(self.directory, name + ".tmp")
+            pyarrow.parquet.write_table(pyarrow.table(columns), tmp_path, compression="zstd")
+        else:
+            name = f"attendance-{month:%Y-%m}.csv.gz"
+            tmp_path = os.path.join(self.directory, name + ".tmp")
+            with gzip.open(tmp_path, "wt", newline="", compresslevel=6) as f:
+                writer = csv.writer(f)
+                writer.writerow(COLUMNS)
+                writer.writerows(rows)
+        digest = hashlib.sha256()
+        with open(tmp_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        return name, digest.hexdigest()
+
+    def archive_month(self, cursor, month, partitioned):
+        """Export one month to disk and remove it from the table; returns rows archived
+
+        The caller commits. The file is complete and recorded in the manifest
+        before any row is removed.
+        """
+        start, end = month.isoformat(), add_months(month, 1).isoformat()
+        cursor.execute("SELECT " + ", ".join(COLUMNS) + " FROM student_attendance "
+                       "WHERE date >= %s AND date < %s ORDER BY date, id", (start, end))
+        rows = cursor.fetchall()
+
+        key = f"{month:%Y-%m}"
+        if rows:
+            name, checksum = self._write(month, rows)
+            self.manifest[key] = {"file": name, "rows": len(rows), "sha256": checksum,
+                                  "archivedAt": date.today().isoformat()}
+            self._save_manifest()
+
+        if partitioned:
+            cursor.execute(f"ALTER TABLE student_attendance DROP PARTITION {partition_name(month)}")
+        else:
+            while True:
+                cursor.execute("DELETE FROM student_attendance WHERE date >= %s AND date < %s LIMIT %s",
+                               (start, end, DELETE_BATCH))
+                if cursor.rowcount < DELETE_BATCH:
+                    break
+        logger.info(f"Archived {len(rows)} attendance record(s) of {key}")
+        return len(rows)
+
+    def closed_months(self, cursor, today, retention_months):
+        """Months with data that ended more than retention_months ago, oldest first"""
+        cutoff = add_months(month_start(today), -retention_months)
+        cursor.execute("SELECT MIN(date) FROM student_attendance WHERE date < %s", (cutoff.isoformat(),))
+        first = cursor.fetchone()[0]
+        if first is None:
+            return []
+        first = date.fromisoformat(str(first)[:10])
+        months = []
+        month = month_start(first)
+        while month < cutoff:
+            months.append(month)
+            month = add_months(month, 1)
+        return months
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Attendance Rollups Module
+
+This module maintains pre-aggregated attendance counts next to the raw
+student_attendance table and answers the report queries from them. Each
+attendance write adds to the student's day, week and month rows and to the
+course's day row in the same transaction, and a nightly job recomputes recent
+periods from the raw table to correct any drift. Reports then sum a few rows
+per student (whole months plus the days at the edges of the range) instead of
+scanning every attendance record.
+
+All functions take a cursor; the caller owns the connection and commits.
+Weeks run Sunday to Saturday, as on the dashboard.
+"""
+
+from datetime import date, datetime, timedelta
+
+ROLLUP_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS attendance_rollup_student (
+      student_id VARCHAR(20) NOT NULL,
+      period VARCHAR(5) NOT NULL,
+      period_start DATE NOT NULL,
+      present INT NOT NULL DEFAULT 0,
+      proxy INT NOT NULL DEFAULT 0,
+      PRIMARY KEY (student_id, period, period_start)
+    )""",
+    """CREATE TABLE IF NOT EXISTS attendance_rollup_course (
+      course VARCHAR(50) NOT NULL,
+      day DATE NOT NULL,
+      present INT NOT NULL DEFAULT 0,
+      proxy INT NOT NULL DEFAULT 0,
+      PRIMARY KEY (course, day)
+    )"""
+]
+
+PERIODS = ("day", "week", "month")
+
+# Students without a course are counted under this name
+NO_COURSE = "unassigned"
+
+def as_date(value):
+    """Date from a DATE/DATETIME column or a YYYY-MM-DD string"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+def week_start(day):
+    """Sunday on or before day"""
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+def month_start(day):
+    return day.replace(day=1)
+
+def next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def period_start(period, day):
+    if period == "week":
+        return week_start(day)
+    if period == "month":
+        return month_start(day)
+    return day
+
+def ensure_rollup_tables(cursor):
+    for statement in ROLLUP_SCHEMA:
+        cursor.execute(statement)
+
+def record_attendance(cursor, student_id, course, day, present=0, proxy=0):
+    """Add to the rollups for one attendance change; counts may be negative"""
+    for period in PERIODS:
+        cursor.execute(
+            "INSERT INTO attendance_rollup_student (student_id, period, period_start, present, proxy) "
+            "VALUES (%s, %s, %s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE present = present + %s, proxy = proxy + %s",
+            (student_id, period, period_start(period, day).isoformat(), present, proxy, present, proxy))
+    cursor.execute(
+        "INSERT INTO attendance_rollup_course (course, day, present, proxy) VALUES (%s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE present = present + %s, proxy = proxy + %s",
+        (course or NO_COURSE, day.isoformat(), present, proxy, present, proxy))
+
+def _first_period_from(period, day):
+    """Start of the first period that begins on or after day"""
+    first = period_start(period, day)
+    if first < day:
+        first = first + timedelta(days=7) if period == "week" else next_month(first)
+    return first
+
+def rebuild_rollups(cursor, start, end, floor=None):
+    """Recompute every rollup row for the periods touching start..end from the raw table
+
+    Weeks and months that only partly overlap the range are recomputed whole,
+    so their totals stay complete. floor is the oldest day still in the raw
+    table (older months are archived): rollups of periods that began before it
+    are left alone. Returns the number of raw records read.
+    """
+    # Period starts to rebuild, per period
+    ranges = {period: (period_start(period, start), period_start(period, end)) for period in PERIODS}
+    if floor:
+        ranges = {period: (max(first, _first_period_from(period, floor)), last)
+                  for period, (first, last) in ranges.items()}
+    first = min(first for first, _ in ranges.values())
+    last = max(week_start(end) + timedelta(days=6), next_month(end) - timedelta(days=1))
+
+    cursor.execute(
+        "SELECT sa.student_id, sa.date, sa.status, s.course FROM student_attendance sa "
+        "LEFT JOIN students s ON sa.student_id = s.rollno "
+        "WHERE sa.date >= %s AND sa.date <= %s",
+        (first.isoformat(), last.isoformat()))
+    records = cursor.fetchall()
+
+    student_rows = {}
+    course_rows = {}
+    for student_id, day, status, course in records:
+        day = as_date(day)
+        counts = (0, 1) if str(status).lower() == "proxy" else (1, 0)
+        for period in PERIODS:
+            key_start = period_start(period, day)
+            if not ranges[period][0] <= key_start <= ranges[period][1]:
+                continue
+            key = (student_id, period, key_start.isoformat())
+            old = student_rows.get(key, (0, 0))
+            student_rows[key] = (old[0] + counts[0], old[1] + counts[1])
+        key = (course or NO_COURSE, day.isoformat())
+        old = course_rows.get(key, (0, 0))
+        course_rows[key] = (old[0] + counts[0], old[1] + counts[1])
+
+    for period, (period_first, period_last) in ranges.items():
+        cursor.execute("DELETE FROM attendance_rollup_student WHERE period = %s AND period_start >= %s "
+                       "AND period_start <= %s", (period, period_first.isoformat(), period_last.isoformat()))
+    cursor.execute("DELETE FROM attendance_rollup_course WHERE day >= %s AND day <= %s",
+                   (first.isoformat(), last.isoformat()))
+    if student_rows:
+        cursor.executemany(
+            "INSERT INTO attendance_rollup_student (student_id, period, period_start, present, proxy) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            [key + counts for key, counts in student_rows.items()])
+    if course_rows:
+        cursor.executemany(
+            "INSERT INTO attendance_rollup_course (course, day, present, proxy) VALUES (%s, %s, %s, %s)",
+            [key + counts for key, counts in course_rows.items()])
+    return len(records)
+
+def backfill_rollups(cursor):
+    """Build the rollups for the whole history when they are empty; returns records read"""
+    cursor.execute("SELECT COUNT(*) FROM attendance_rollup_course")
+    if cursor.fetchone()[0]:
+        return 0
+    cursor.execute("SELECT MIN(date), MAX(date) FROM student_attendance")
+    first, last = cursor.fetchone()
+    if first is None:
+        return 0
+    return rebuild_rollups(cursor, as_date(first), as_date(last))
+
+def _split_range(start, end):
+    """Whole months inside start..end, and (first, last) runs of the days outside them"""
+    months = []
+    runs = []
+    day = start
+    while day <= end:
+        if day.day == 1 and next_month(day) - timedelta(days=1) <= end:
+            months.append(day)
+            day = next_month(day)
+        else:
+            if runs and runs[-1][1] == day - timedelta(days=1):
+                runs[-1] = (runs[-1][0], day)
+            else:
+                runs.append((day, day))
+            day += timedelta(days=1)
+    return months, runs
+
+def working_days(cursor, start, end):
+    """Days in the range on which anyone's attendance was recorded"""
+    cursor.execute("SELECT COUNT(DISTINCT day) FROM attendance_rollup_course WHERE day >= %s AND day <= %s",
+                   (start.isoformat(), end.isoformat()))
+    return cursor.fetchone()[0]
+
+def entries_between(cursor, start, end):
+    """Attendance records (present and proxy) between two days"""
+    cursor.execute("SELECT COALESCE(SUM(present + proxy), 0) FROM attendance_rollup_course "
+                   "WHERE day >= %s AND day <= %s", (start.isoformat(), end.isoformat()))
+    return int(cursor.fetchone()[0])
+
+def _percentage(attended, possible):
+    return round(100 * attended / possible, 1) if possible else None
+
+def student_report(cursor, start, end, course=None):
+    """Attendance count and percentage per student over a date range"""
+    days_possible = working_days(cursor, start, end)
+    months, runs = _split_range(start, end)
+
+    # Month rows for whole months, day rows for the partial months at either end
+    conditions = ["1 = 0"]
+    params = []
+    if months:
+        conditions.append(f"(r.period = 'month' AND r.period_start IN ({', '.join(['%s'] * len(months))}))")
+        params += [m.isoformat() for m in months]
+    for first, last in runs:
+        conditions.append("(r.period = 'day' AND r.period_start >= %s AND r.period_start <= %s)")
+        params += [first.isoformat(), last.isoformat()]
+
+    query = ("SELECT s.rollno, s.name, s.course, COALESCE(SUM(r.present), 0), COALESCE(SUM(r.proxy), 0) "
+             "FROM students s LEFT JOIN attendance_rollup_student r ON r.student_id = s.rollno AND ("
+             + " OR ".join(conditions) + ")")
+    if course:
+        query += " WHERE s.course = %s"
+        params.append(course)
+    query += " GROUP BY s.rollno, s.name, s.course ORDER BY s.name"
+    cursor.execute(query, params)
+
+    return days_possible, [{
+        'studentId': rollno,
+        'name': name,
+        'course': student_course,
+        'present': int(present),
+        'proxy': int(proxy),
+        'percentage': _percentage(int(present), days_possible)
+    } for rollno, name, student_course, present, proxy in cursor.fetchall()]
+
+def course_report(cursor, start, end):
+    """Attendance totals and percentage per course over a date range"""
+    days_possible = working_days(cursor, start, end)
+    cursor.execute("SELECT COALESCE(course, %s), COUNT(*) FROM students GROUP BY course", (NO_COURSE,))
+    enrolled = {}
+    for course, count in cursor.fetchall():
+        enrolled[course] = enrolled.get(course, 0) + count
+
+    cursor.execute("SELECT course, SUM(present), SUM(proxy) FROM attendance_rollup_course "
+                   "WHERE day >= %s AND day <= %s GROUP BY course", (start.isoformat(), end.isoformat()))
+    totals = {course: (int(present), int(proxy)) for course, present, proxy in cursor.fetchall()}
+
+    report = []
+    for course in sorted(set(enrolled) | set(totals)):
+        present, proxy = totals.get(course, (0, 0))
+        students = enrolled.get(course, 0)
+        report.append({
+            'course': course,
+            'students': students,
+            'present': present,
+            'proxy': proxy,
+            'percentage': _percentage(present, students * days_possible)
+        })
+    return days_possible, report
+
+def attendance_trend(cursor, start, end, granularity="day", course=None):
+    """Present and proxy counts per day, week or month"""
+    query = "SELECT day, SUM(present), SUM(proxy) FROM attendance_rollup_course WHERE day >= %s AND day <= %s"
+    params = [start.isoformat(), end.isoformat()]
+    if course:
+        query += " AND course = %s"
+        params.append(course)
+    query += " GROUP BY day ORDER BY day"
+    cursor.execute(query, params)
+
+    buckets = {}
+    for day, present, proxy in cursor.fetchall():
+        key = period_start(granularity, as_date(day)).isoformat()
+        old = buckets.get(key, (0, 0))
+        buckets[key] = (old[0] + int(present), old[1] + int(proxy))
+    return [{'date': key, 'present': present, 'proxy': proxy} for key, (present, proxy) in sorted(buckets.items())]
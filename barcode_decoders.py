@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Barcode Decoders Module
+
+This module provides the QR code decoder backends the gate can use: zbar
+(through pyzbar), OpenCV's QRCodeDetector and QRCodeDetectorAruco, and
+zxing-cpp. All backends take a grayscale frame and return the payload and the
+(x, y, w, h) box of the first code found, or None. A comma-separated list of
+backends tries each in turn, so a fast decoder can handle most frames and a
+more tolerant one the worn or tilted badges it misses. Backends whose library
+is not installed raise ImportError when created.
+"""
+
+import logging
+import cv2
+import numpy as np
+
+logger = logging.getLogger("barcode_decoders")
+
+try:
+    from pyzbar import pyzbar
+except ImportError:  # The pyzbar module or the zbar shared library is missing
+    pyzbar = None
+
+try:
+    import zxingcpp
+except ImportError:
+    zxingcpp = None
+
+def points_to_rect(points):
+    """(x, y, w, h) bounding box of a code's corner points"""
+    x, y, w, h = cv2.boundingRect(np.asarray(points, dtype=np.float32).reshape(-1, 2))
+    return (int(x), int(y), int(w), int(h))
+
+class BarcodeDecoder:
+    """Base class: subclasses implement decode()"""
+
+    name = None
+
+    def decode(self, gray):
+        """Return (data, (x, y, w, h)) of the first code in a grayscale frame, or None"""
+        raise NotImplementedError
+
+class ZbarDecoder(BarcodeDecoder):
+    """zbar through pyzbar, by default looking for QR codes only
+
+    Restricting the symbologies saves zbar running its linear barcode scanners
+    over every row of the frame. Pass symbols=None to scan for all of them.
+    """
+
+    name = "zbar"
+
+    def __init__(self, symbols=("QRCODE",)):
+        if pyzbar is None:
+            raise ImportError("pyzbar or the zbar library is not installed")
+        self.symbols = [pyzbar.ZBarSymbol[symbol] for symbol in symbols] if symbols else None
+
+    def decode(self, gray):
+        for barcode in pyzbar.decode(gray, symbols=self.symbols):
+            return barcode.data.decode("utf-8"), tuple(barcode.rect)
+        return None
+
+class OpenCvDecoder(BarcodeDecoder):
+    """OpenCV's QRCodeDetector; no extra dependency"""
+
+    name = "opencv"
+
+    def __init__(self):
+        self.detector = cv2.QRCodeDetector()
+
+    def decode(self, gray):
+        data, points, _ = self.detector.detectAndDecode(gray)
+        if not data or points is None:
+            return None
+        return data, points_to_rect(points)
+
+class OpenCvArucoDecoder(OpenCvDecoder):
+    """OpenCV's QRCodeDetectorAruco (OpenCV 4.8+): finds codes at steeper angles and in poorer light"""
+
+    name = "opencv-aruco"
+
+    def __init__(self):
+        if not hasattr(cv2, "QRCodeDetectorAruco"):
+            raise ImportError(f"OpenCV {cv2.__version__} has no QRCodeDetectorAruco")
+        self.detector = cv2.QRCodeDetectorAruco()
+
+class ZxingDecoder(BarcodeDecoder):
+    """zxing-cpp, looking for QR codes only; tolerant of blur and perspective"""
+
+    name = "zxing"
+
+    def __init__(self, try_rotate=True, try_downscale=True):
+        if zxingcpp is None:
+            raise ImportError("zxing-cpp is not installed")
+        self.options = {"formats": zxingcpp.BarcodeFormat.QRCode, "try_rotate": try_rotate,
+                        "try_downscale": try_downscale}
+
+    def decode(self, gray):
+        result = zxingcpp.read_barcode(gray, **self.options)
+        if result is None or not result.valid:
+            return None
+        position = result.position
+        corners = [(point.x, point.y) for point in
+                   (position.top_left, position.top_right, position.bottom_right, position.bottom_left)]
+        return result.text, points_to_rect(corners)
+
+class FallbackDecoder(BarcodeDecoder):
+    """Tries each decoder in order and returns the first code found"""
+
+    def __init__(self, decoders):
+        self.decoders = decoders
+        self.name = ",".join(decoder.name for decoder in decoders)
+
+    def decode(self, gray):
+        for decoder in self.decoders:
+            result = decoder.decode(gray)
+            if result is not None:
+                return result
+        return None
+
+BARCODE_DECODERS = {
+    ZbarDecoder.name: ZbarDecoder,
+    OpenCvDecoder.name: OpenCvDecoder,
+    OpenCvArucoDecoder.name: OpenCvArucoDecoder,
+    ZxingDecoder.name: ZxingDecoder
+}
+
+# Order tried by "auto": the first installed backend is used. zxing-cpp is
+# both faster and more tolerant than zbar; OpenCV is always installed.
+AUTO_ORDER = [ZxingDecoder.name, ZbarDecoder.name, OpenCvDecoder.name]
+
+def create_barcode_decoder(name="auto", **options):
+    """Create a decoder backend by name
+
+    "auto" picks the first installed backend of AUTO_ORDER. A comma-separated
+    list ("zbar,zxing") chains those backends; a frame without a code then
+    costs the sum of all of them. Options apply to a single named backend only.
+    """
+    if name == "auto":
+        for candidate in AUTO_ORDER:
+            try:
+                return BARCODE_DECODERS[candidate]()
+            except ImportError as e:
+                logger.info(f"Barcode decoder {candidate} unavailable: {e}")
+        raise ImportError("No barcode decoder backend could be loaded")
+
+    names = [part.strip() for part in name.split(",") if part.strip()]
+    for candidate in names:
+        if candidate not in BARCODE_DECODERS:
+            raise ValueError(f"Unknown barcode decoder '{candidate}', expected one of: auto, "
+                             f"{', '.join(BARCODE_DECODERS)}")
+    if len(names) == 1:
+        return BARCODE_DECODERS[names[0]](**options)
+    return FallbackDecoder([BARCODE_DECODERS[candidate]() for candidate in names])
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+API Throughput Benchmark
+
+Serves the real Flask app on a local port, backed by the offline stand-ins in
+server_harness.py, and hammers the JSON endpoints the dashboard polls with
+concurrent clients. Reports requests per second, latency percentiles and error
+counts for each endpoint. The lanes replay camera frames in the background
+while the benchmark runs, as they would at the gate.
+
+Example:
+    python benchmarks/api_throughput.py --clients 8 --duration 10 --json api_throughput.json
+"""
+
+import sys
+import time
+import argparse
+import threading
+from bench_utils import print_colored, summarize_ms, write_results
+import requests
+from werkzeug.serving import make_server
+
+# Endpoints polled by the dashboard, plus the monitoring endpoints
+DEFAULT_ENDPOINTS = [
+    "/api/stats",
+    "/api/attendance",
+    "/api/students",
+    "/api/door-status",
+    "/api/recognition-status",
+    "/api/lanes",
+    "/api/health",
+    "/metrics"
+]
+
+def client(base_url, endpoint, deadline, durations, errors):
+    session = requests.Session()
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = session.get(base_url + endpoint, timeout=10)
+            response.content
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+        except requests.RequestException as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            continue
+        durations.append(time.perf_counter() - start)
+    session.close()
+
+def benchmark_endpoint(base_url, endpoint, clients, duration):
+    durations = []
+    errors = {}
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=client, args=(base_url, endpoint, deadline, durations, errors))
+               for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "endpoint": endpoint,
+        "clients": clients,
+        "requests": len(durations),
+        "requests_per_second": round(len(durations) / elapsed, 1),
+        "latency_ms": summarize_ms(durations),
+        "errors": errors
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API endpoint throughput under concurrent clients")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients per endpoint")
+    parser.add_argument("--duration", type=float, default=5, help="seconds per endpoint")
+    parser.add_argument("--endpoints", nargs="+", default=DEFAULT_ENDPOINTS)
+    parser.add_argument("--lanes", type=int, default=1, help="gate lanes replaying frames in the background")
+    parser.add_argument("--students", type=int, default=1000, help="roster size of the stand-in database")
+    parser.add_argument("--attendance-days", type=int, default=30, help="days of attendance history to seed")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    from server_harness import load_server
+    harness = load_server(lanes=args.lanes, students=args.students, attendance_days=args.attendance_days)
+    server = make_server("127.0.0.1", 0, harness.server.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    print_colored("===== API THROUGHPUT BENCHMARK =====", "YELLOW")
+    print(f"{args.clients} clients, {args.duration:g} s per endpoint, {args.students} students")
+
+    results = []
+    for endpoint in args.endpoints:
+        result = benchmark_endpoint(base_url, endpoint, args.clients, args.duration)
+        results.append(result)
+        latency = result["latency_ms"]
+        color = "RED" if result["errors"] else "GREEN"
+        line = f"{endpoint:<26} {result['requests_per_second']:8.1f} req/s"
+        if result["requests"]:
+            line += f"  p50 {latency['p50']:7.2f} ms  p99 {latency['p99']:7.2f} ms"
+        if result["errors"]:
+            line += f"  errors {result['errors']}"
+        print_colored(line, color)
+
+    server.shutdown()
+    harness.close()
+    write_results("api_throughput", results, args.json)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print_colored("\nBenchmark stopped by user", "YELLOW")
+        sys.exit(0)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Barcode Decoder Benchmark
+
+Runs every available QR decoder backend, and the fallback chains given with
+--chains, over a corpus of badge images and reports the decode rate, wrong
+reads and per-frame latency, overall and per capture condition.
+
+The corpus is a directory with one subdirectory per condition:
+
+    <data>/clean/*.jpg        badges held up normally
+    <data>/blur/*.jpg         motion blur, out of focus
+    <data>/angle/*.jpg        tilted or held at an angle
+    <data>/low_light/*.jpg    evening, backlit
+    <data>/empty/*.jpg        frames without a badge (decoding must find nothing)
+
+A labels.json file in <data> ({"blur/0001.jpg": "R00123", ...}) gives the
+expected payloads; without it any decoded text counts as read. Without a
+corpus, --synthetic generates badges with those degradations, which is enough
+to compare the decoders' speed but no substitute for real worn badges.
+
+Example:
+    python benchmarks/barcode_decoders.py --data benchmarks/data/badges --chains zbar,zxing --json barcodes.json
+    python benchmarks/barcode_decoders.py --synthetic 40
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import bench_utils
+from bench_utils import print_colored, summarize_ms, write_results
+import cv2
+import numpy as np
+import barcode_decoders
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+EMPTY_CONDITION = "empty"
+
+def load_corpus(directory, size=None):
+    """[(condition, name, gray frame, expected payload or None)] from a corpus directory"""
+    labels = {}
+    labels_file = os.path.join(directory, "labels.json")
+    if os.path.exists(labels_file):
+        with open(labels_file) as f:
+            labels = json.load(f)
+
+    corpus = []
+    for condition in sorted(os.listdir(directory)):
+        condition_dir = os.path.join(directory, condition)
+        if not os.path.isdir(condition_dir):
+            continue
+        for filename in sorted(os.listdir(condition_dir)):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            image = cv2.imread(os.path.join(condition_dir, filename), cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                continue
+            if size and (image.shape[1], image.shape[0]) != size:
+                image = cv2.resize(image, size)
+            name = f"{condition}/{filename}"
+            corpus.append((condition, name, image, labels.get(name)))
+    return corpus
+
+def place_badge(payload, size, rng, badge_width):
+    """Gray camera-sized frame with a QR badge at a random position"""
+    code = cv2.QRCodeEncoder.create().encode(payload)
+    code = cv2.resize(code, (badge_width, badge_width), interpolation=cv2.INTER_NEAREST)
+    code = cv2.copyMakeBorder(code, 16, 16, 16, 16, cv2.BORDER_CONSTANT, value=255)
+    width, height = size
+    frame = np.full((height, width), 120, np.uint8)
+    frame += rng.integers(0, 20, frame.shape, dtype=np.uint8)  # Background texture
+    x = int(rng.integers(0, width - code.shape[1]))
+    y = int(rng.integers(0, height - code.shape[0]))
+    frame[y:y + code.shape[0], x:x + code.shape[1]] = code
+    return frame
+
+def degrade(frame, condition, rng):
+    """Apply one capture condition to a synthetic frame"""
+    if condition == "blur":
+        kernel = np.zeros((9, 9), np.float32)
+        kernel[4, :] = 1 / 9  # Horizontal motion blur
+        return cv2.GaussianBlur(cv2.filter2D(frame, -1, kernel), (3, 3), 0)
+    if condition == "angle":
+        height, width = frame.shape
+        skew = width * 0.12
+        source = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+        target = np.float32([[skew, rng.uniform(0, skew)], [width - skew, 0], [width, height], [0, height - skew]])
+        return cv2.warpPerspective(frame, cv2.getPerspectiveTransform(source, target), (width, height),
+                                   borderValue=120)
+    if condition == "low_light":
+        dark = (frame.astype(np.float32) * 0.25).astype(np.int16)
+        noise = rng.normal(0, 6, frame.shape).astype(np.int16)
+        return np.clip(dark + noise, 0, 255).astype(np.uint8)
+    return frame
+
+def synthetic_corpus(count, size, seed=7):
+    """Generated badges: count frames for each of clean, blur, angle, low_light and empty"""
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for condition in ("clean", "blur", "angle", "low_light"):
+        for i in range(count):
+            payload = f"R{rng.integers(0, 100000):05d}"
+            frame = place_badge(payload, size, rng, badge_width=int(rng.integers(140, 260)))
+            corpus.append((condition, f"{condition}/{i:04d}", degrade(frame, condition, rng), payload))
+    for i in range(count):
+        frame = np.full((size[1], size[0]), 120, np.uint8) + rng.integers(0, 20, (size[1], size[0]), dtype=np.uint8)
+        corpus.append((EMPTY_CONDITION, f"{EMPTY_CONDITION}/{i:04d}", frame, None))
+    return corpus
+
+def benchmark_decoder(decoder, corpus, warmup=3):
+    """Decode rate, wrong reads and latency of a decoder over the corpus, per condition"""
+    for _ in range(warmup):
+        decoder.decode(corpus[0][2])
+
+    by_condition = {}
+    for condition, _, gray, expected in corpus:
+        stats = by_condition.setdefault(condition, {"frames": 0, "read": 0, "wrong": 0, "durations": []})
+        start = time.perf_counter()
+        result = decoder.decode(gray)
+        stats["durations"].append(time.perf_counter() - start)
+        stats["frames"] += 1
+        if result is None:
+            continue
+        if condition == EMPTY_CONDITION or (expected is not None and result[0] != expected):
+            stats["wrong"] += 1
+        else:
+            stats["read"] += 1
+
+    conditions = {}
+    durations = []
+    badges = read = wrong = 0
+    for condition, stats in by_condition.items():
+        durations += stats["durations"]
+        wrong += stats["wrong"]
+        entry = {"frames": stats["frames"], "wrong": stats["wrong"], "latency_ms": summarize_ms(stats["durations"])}
+        if condition != EMPTY_CONDITION:
+            badges += stats["frames"]
+            read += stats["read"]
+            entry["decode_rate"] = round(stats["read"] / stats["frames"], 4)
+        conditions[condition] = entry
+    return {
+        "decode_rate": round(read / badges, 4) if badges else None,
+        "wrong_reads": wrong,
+        "latency_ms": summarize_ms(durations),
+        "conditions": conditions
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the QR decoder backends")
+    parser.add_argument("--data", default=os.path.join(bench_utils.REPO_ROOT, "benchmarks", "data", "badges"),
+                        help="corpus directory with one subdirectory per capture condition")
+    parser.add_argument("--synthetic", type=int, metavar="N",
+                        help="generate N badges per condition instead of reading --data")
+    parser.add_argument("--backends", nargs="+", default=list(barcode_decoders.BARCODE_DECODERS),
+                        help="backends to benchmark")
+    parser.add_argument("--chains", nargs="*", default=["zbar,zxing", "zbar,opencv-aruco"],
+                        help="fallback chains to benchmark, e.g. zbar,zxing")
+    parser.add_argument("--size", default="1280x720", help="resize images to the camera frame size")
+    parser.add_argument("--min-decode-rate", type=float, default=0.95,
+                        help="decode rate a backend must reach to be recommended")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    # Benchmark a single thread, as in a lane loop
+    cv2.setNumThreads(1)
+
+    size = tuple(int(v) for v in args.size.split("x"))
+    if args.synthetic:
+        corpus = synthetic_corpus(args.synthetic, size)
+        source = f"{args.synthetic} synthetic badges per condition"
+    elif os.path.isdir(args.data):
+        corpus = load_corpus(args.data, size)
+        source = args.data
+    else:
+        corpus = []
+    if not corpus:
+        print_colored(f"No badge images found in {args.data}", "RED")
+        print("Expected one subdirectory of JPEG or PNG frames per condition, or use --synthetic N.")
+        sys.exit(1)
+
+    print_colored("===== BARCODE DECODER BENCHMARK =====", "YELLOW")
+    conditions = sorted({entry[0] for entry in corpus})
+    print(f"Corpus: {len(corpus)} frames from {source} ({', '.join(conditions)}), frames {args.size}")
+
+    results = []
+    for name in args.backends + args.chains:
+        try:
+            decoder = barcode_decoders.create_barcode_decoder(name)
+        except (ImportError, ValueError) as e:
+            print_colored(f"{name}: skipped ({e})", "YELLOW")
+            continue
+        result = {"backend": name, **benchmark_decoder(decoder, corpus)}
+        results.append(result)
+        latency = result["latency_ms"]
+        per_condition = "  ".join(f"{condition} {entry['decode_rate']:.2f}"
+                                  for condition, entry in sorted(result["conditions"].items())
+                                  if "decode_rate" in entry)
+        print(f"{name:18} mean {latency['mean']:8.2f} ms  p95 {latency['p95']:8.2f} ms  "
+              f"decoded {result['decode_rate']}  wrong {result['wrong_reads']}  ({per_condition})")
+
+    # Fastest decoder that still reads the badges
+    eligible = [r for r in results
+                if (r["decode_rate"] is None or r["decode_rate"] >= args.min_decode_rate) and not r["wrong_reads"]]
+    if eligible:
+        best = min(eligible, key=lambda r: r["latency_ms"]["mean"])
+        print_colored(f"\nRecommended: BARCODE_DECODER={best['backend']}", "GREEN")
+    else:
+        print_colored(f"\nNo decoder reached a decode rate of {args.min_decode_rate} without wrong reads", "RED")
+
+    write_results("barcode_decoders", results, args.json)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print_colored("\nBenchmark stopped by user", "YELLOW")
+        sys.exit(0)
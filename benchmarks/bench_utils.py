@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark Utilities
+
+Shared helpers for the benchmark scripts in this directory: coloured output,
+latency summaries and machine-readable results that can be compared between
+commits.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+
+# Make the server modules in the repository root importable
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Color codes for terminal output
+COLORS = {
+    "GREEN": "\033[92m",
+    "YELLOW": "\033[93m",
+    "RED": "\033[91m",
+    "BLUE": "\033[94m",
+    "ENDC": "\033[0m"
+}
+
+def print_colored(text, color):
+    """Print colored text to the terminal"""
+    print(f"{COLORS[color]}{text}{COLORS['ENDC']}")
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize_ms(seconds):
+    """Latency summary in milliseconds for a list of durations in seconds"""
+    if not seconds:
+        return {"count": 0}
+    ms = [s * 1000 for s in seconds]
+    return {
+        "count": len(ms),
+        "mean": round(sum(ms) / len(ms), 3),
+        "p50": round(percentile(ms, 50), 3),
+        "p95": round(percentile(ms, 95), 3),
+        "p99": round(percentile(ms, 99), 3),
+        "max": round(max(ms), 3)
+    }
+
+def git_commit():
+    """Current commit of the repository, so results can be compared between commits"""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def write_results(name, results, path=None):
+    """Write benchmark results as JSON (to path, or print them when no path is given)"""
+    document = {
+        "benchmark": name,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "results": results
+    }
+    if path:
+        with open(path, "w") as f:
+            json.dump(document, f, indent=2)
+        print_colored(f"Results written to {path}", "GREEN")
+    return document
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark Comparison
+
+Compares two sets of benchmark results written with --json (single files, or
+directories written by run_all.py) and flags metrics that got worse by more
+than a threshold: latencies that went up and throughputs or accuracies that
+went down. Exits with status 1 when there is a regression, so it can gate a
+change.
+
+Example:
+    python benchmarks/compare.py results/abc1234 results/def5678 --threshold 10
+"""
+
+import os
+import sys
+import json
+import argparse
+from bench_utils import print_colored
+
+# Fields that identify an entry in a results list, e.g. one endpoint or roster size
+ID_KEYS = ("endpoint", "backend", "path", "phase", "detection_scale", "roster_size", "clients")
+
+# Latency summary fields worth comparing (count and max are too noisy)
+SUMMARY_KEYS = ("mean", "p50", "p95", "p99")
+
+def direction(path):
+    """+1 if higher is better, -1 if lower is better, 0 if the metric is not compared"""
+    name = path.split(".")[-1]
+    if "false" in path or name.startswith("wrong") or name.endswith("_bytes") or name.endswith("_ms"):
+        return -1
+    if name in SUMMARY_KEYS and "_ms" in path:
+        return -1
+    if name.endswith("per_second") or name.endswith("_rate"):
+        return 1
+    return 0
+
+def flatten(value, prefix=""):
+    """Dotted metric paths to numbers"""
+    metrics = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            metrics.update(flatten(item, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict):
+                ident = ",".join(f"{k}={item[k]}" for k in ID_KEYS if k in item)
+                metrics.update(flatten(item, f"{prefix}[{ident}]"))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        metrics[prefix] = value
+    return metrics
+
+def load(path):
+    """Benchmark name -> results, from a results file or a directory of them"""
+    paths = [path]
+    if os.path.isdir(path):
+        paths = [os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".json")]
+    documents = {}
+    for file_path in paths:
+        with open(file_path) as f:
+            document = json.load(f)
+        documents[document["benchmark"]] = document
+    return documents
+
+def compare(baseline, candidate, threshold):
+    """List of (benchmark, metric, old, new, change %, regressed)"""
+    rows = []
+    for name, document in candidate.items():
+        if name not in baseline:
+            continue
+        old_metrics = flatten(baseline[name]["results"])
+        new_metrics = flatten(document["results"])
+        for path, new in new_metrics.items():
+            sign = direction(path)
+            old = old_metrics.get(path)
+            if sign == 0 or old is None or old == 0:
+                continue
+            change = (new - old) / abs(old) * 100
+            rows.append((name, path, old, new, change, change * sign < -threshold))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two sets of benchmark results")
+    parser.add_argument("baseline", help="results file or directory of the reference commit")
+    parser.add_argument("candidate", help="results file or directory to check")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change that counts as a regression")
+    parser.add_argument("--all", action="store_true", help="show every compared metric, not only regressions")
+    args = parser.parse_args()
+
+    baseline = load(args.baseline)
+    candidate = load(args.candidate)
+    rows = compare(baseline, candidate, args.threshold)
+
+    commits = {name: (baseline[name].get("commit"), doc.get("commit")) for name, doc in candidate.items() if name in baseline}
+    for name, (old_commit, new_commit) in commits.items():
+        print_colored(f"{name}: {old_commit} -> {new_commit}", "BLUE")
+
+    regressions = [row for row in rows if row[5]]
+    for name, path, old, new, change, regressed in rows:
+        line = f"{name} {path}: {old:g} -> {new:g} ({change:+.1f}%)"
+        if regressed:
+            print_colored(f"REGRESSION {line}", "RED")
+        elif args.all:
+            print(f"           {line}")
+
+    print(f"\n{len(rows)} metrics compared, {len(regressions)} regressions over {args.threshold:g}%")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
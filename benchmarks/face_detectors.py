@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Face Detector Benchmark
+
+Runs every available face detector backend over a test set of images and
+reports per-frame latency, detection rate on images with a face and false
+detection rate on images without one.
+
+The test set is a directory with two subdirectories:
+
+    <data>/with_face/*.jpg      frames from the gate camera with one person in view
+    <data>/without_face/*.jpg   frames of the empty gate, bags, badges held up, ...
+
+Example:
+    python benchmarks/face_detectors.py --data benchmarks/data/faces --scales 1.0 0.5 --json faces.json
+"""
+
+import os
+import sys
+import time
+import argparse
+import bench_utils
+from bench_utils import print_colored, summarize_ms, write_results
+import cv2
+import face_detectors
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+def load_images(directory, size=None):
+    """Load the images of a directory as BGR frames, resized to the camera size"""
+    if not os.path.isdir(directory):
+        return []
+    images = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image = cv2.imread(os.path.join(directory, filename))
+        if image is None:
+            continue
+        if size and (image.shape[1], image.shape[0]) != size:
+            image = cv2.resize(image, size)
+        images.append((filename, image))
+    return images
+
+def benchmark_detector(detector, positives, negatives, warmup=3):
+    """Time a detector over the test set"""
+    sample = (positives or negatives)[0][1]
+    for _ in range(warmup):
+        detector.detect(sample)
+
+    durations = []
+    hits = 0
+    false_detections = 0
+    for _, image in positives:
+        start = time.perf_counter()
+        faces = detector.detect(image)
+        durations.append(time.perf_counter() - start)
+        hits += 1 if faces else 0
+    for _, image in negatives:
+        start = time.perf_counter()
+        faces = detector.detect(image)
+        durations.append(time.perf_counter() - start)
+        false_detections += 1 if faces else 0
+
+    return {
+        "latency_ms": summarize_ms(durations),
+        "detection_rate": round(hits / len(positives), 4) if positives else None,
+        "false_detection_rate": round(false_detections / len(negatives), 4) if negatives else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the face detector backends")
+    parser.add_argument("--data", default=os.path.join(bench_utils.REPO_ROOT, "benchmarks", "data", "faces"),
+                        help="test set directory with with_face/ and without_face/ subdirectories")
+    parser.add_argument("--backends", nargs="+", default=list(face_detectors.FACE_DETECTORS),
+                        help="backends to benchmark")
+    parser.add_argument("--scales", nargs="+", type=float, default=[1.0, 0.5],
+                        help="detection scales to try for each backend")
+    parser.add_argument("--size", default="1280x720", help="resize images to the camera frame size")
+    parser.add_argument("--min-detection-rate", type=float, default=0.95,
+                        help="accuracy a backend must reach to be recommended")
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    # Benchmark a single thread, as in a lane loop
+    cv2.setNumThreads(1)
+
+    size = tuple(int(v) for v in args.size.split("x"))
+    positives = load_images(os.path.join(args.data, "with_face"), size)
+    negatives = load_images(os.path.join(args.data, "without_face"), size)
+    if not positives and not negatives:
+        print_colored(f"No test images found in {args.data}", "RED")
+        print("Expected with_face/ and without_face/ subdirectories of JPEG or PNG frames.")
+        sys.exit(1)
+
+    print_colored("===== FACE DETECTOR BENCHMARK =====", "YELLOW")
+    print(f"Test set: {len(positives)} with face, {len(negatives)} without face, frames {args.size}")
+
+    results = []
+    for backend in args.backends:
+        for scale in args.scales:
+            label = f"{backend} @ {scale}"
+            try:
+                detector = face_detectors.create_face_detector(backend, detection_scale=scale)
+            except (FileNotFoundError, ValueError) as e:
+                print_colored(f"{label}: skipped ({e})", "YELLOW")
+                continue
+            result = {"backend": backend, "detection_scale": scale,
+                      **benchmark_detector(detector, positives, negatives)}
+            results.append(result)
+            latency = result["latency_ms"]
+            print(f"{label:12} mean {latency['mean']:8.2f} ms  p95 {latency['p95']:8.2f} ms  "
+                  f"detection {result['detection_rate']}  false {result['false_detection_rate']}")
+
+    # Fastest configuration that still meets the accuracy target
+    eligible = [r for r in results
+                if r["detection_rate"] is None or r["detection_rate"] >= args.min_detection_rate]
+    if eligible:
+        best = min(eligible, key=lambda r: r["latency_ms"]["mean"])
+        print_colored(f"\nRecommended: FACE_DETECTOR={best['backend']} FACE_DETECTION_SCALE={best['detection_scale']}",
+                      "GREEN")
+    else:
+        print_colored(f"\nNo backend reached a detection rate of {args.min_detection_rate}", "RED")
+
+    write_results("face_detectors", results, args.json)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print_colored("\nBenchmark stopped by user", "YELLOW")
+        sys.exit(0)
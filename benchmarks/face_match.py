@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Face Match Benchmark
+
+Measures how the face embedding index behaves as the roster grows: time to
+write the index, time to open it (memory-mapped), the latency of the 1:1 check
+the gate runs for every scan, and, for comparison, a full 1:N search over the
+roster. Embeddings are random unit vectors of the SFace size, so no model files
+or face images are needed.
+
+Example:
+    python benchmarks/face_match.py --sizes 100 1000 10000 50000 --json face_match.json
+"""
+
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+from bench_utils import print_colored, summarize_ms, write_results
+import numpy as np
+from face_index import FaceEmbeddingIndex
+
+EMBEDDING_SIZE = 128  # SFace feature length
+
+def benchmark_size(size, queries, rng):
+    directory = tempfile.mkdtemp(prefix="face_index_bench_")
+    try:
+        embeddings = rng.standard_normal((size, EMBEDDING_SIZE)).astype(np.float32)
+        rollnos = [f"R{i:07d}" for i in range(size)]
+
+        index = FaceEmbeddingIndex(directory)
+        start = time.perf_counter()
+        index.enroll_many(dict(zip(rollnos, embeddings)))
+        write_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = FaceEmbeddingIndex(directory)
+        open_seconds = time.perf_counter() - start
+
+        # A live face: the enrolled embedding plus noise
+        probe_ids = rng.integers(0, size, queries)
+        probes = embeddings[probe_ids] + 0.3 * rng.standard_normal((queries, EMBEDDING_SIZE)).astype(np.float32)
+        probes /= np.linalg.norm(probes, axis=1, keepdims=True)
+
+        match_durations = []
+        matched = 0
+        for probe_id, probe in zip(probe_ids, probes):
+            start = time.perf_counter()
+            ok, _ = index.match(rollnos[probe_id], probe)
+            match_durations.append(time.perf_counter() - start)
+            matched += 1 if ok else 0
+
+        search_durations = []
+        for probe in probes[:min(queries, 200)]:
+            start = time.perf_counter()
+            int(np.argmax(index.matrix @ probe))
+            search_durations.append(time.perf_counter() - start)
+
+        return {
+            "roster_size": size,
+            "index_bytes": index.summary()["bytes"],
+            "write_ms": round(write_seconds * 1000, 3),
+            "open_ms": round(open_seconds * 1000, 3),
+            "match_1to1_ms": summarize_ms(match_durations),
+            "search_1toN_ms": summarize_ms(search_durations),
+            "genuine_accept_rate": round(matched / queries, 4)
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark face embedding matching as the roster grows")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000, 50000],
+                        help="roster sizes to test")
+    parser.add_argument("--queries", type=int, default=2000, help="1:1 checks per roster size")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print_colored("===== FACE MATCH BENCHMARK =====", "YELLOW")
+
+    results = []
+    for size in args.sizes:
+        result = benchmark_size(size, args.queries, rng)
+        results.append(result)
+        match = result["match_1to1_ms"]
+        search = result["search_1toN_ms"]
+        print(f"roster {size:>7}: index {result['index_bytes'] / 1024:9.1f} KiB  open {result['open_ms']:7.2f} ms  "
+              f"1:1 p50 {match['p50']:.4f} ms p99 {match['p99']:.4f} ms  1:N p50 {search['p50']:.3f} ms")
+
+    write_results("face_match", results, args.json)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print_colored("\nBenchmark stopped by user", "YELLOW")
+        sys.exit(0)
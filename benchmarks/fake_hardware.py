@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Fake Hardware
+
+Stand-ins for picamera2, gpiod and RPi.GPIO so the API server can be imported
+and benchmarked on a machine without a Pi camera or GPIO header. The camera
+replays a fixed list of frames and the infrared sensor reports that the student
+walked through straight away.
+"""
+
+import sys
+import types
+import threading
+import numpy as np
+
+class ReplayCamera:
+    """Picamera2 stand-in that returns recorded frames in a loop"""
+
+    frames = [np.zeros((720, 1280, 3), dtype=np.uint8)]
+    count = 1
+
+    @classmethod
+    def global_camera_info(cls):
+        return [{"Model": "replay", "Num": i} for i in range(cls.count)]
+
+    def __init__(self, camera_num=0):
+        self.camera_num = camera_num
+        self.position = 0
+        self.lock = threading.Lock()
+
+    def create_still_configuration(self, **kwargs):
+        return kwargs
+
+    def configure(self, config):
+        pass
+
+    def set_controls(self, controls):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+    def capture_array(self, name="main"):
+        with self.lock:
+            frame = self.frames[self.position % len(self.frames)]
+            self.position += 1
+        # A real capture hands out a new array every time
+        return frame.copy()
+
+class FakeLine:
+    """gpiod line; the infrared sensor reads 0 (beam broken) immediately"""
+
+    def __init__(self, offset):
+        self.offset = offset
+        self.value = 0
+
+    def request(self, consumer=None, type=None):
+        pass
+
+    def get_value(self):
+        return 0
+
+    def set_value(self, value):
+        self.value = value
+
+    def release(self):
+        pass
+
+class FakeChip:
+    def __init__(self, name):
+        self.name = name
+
+    def get_line(self, offset):
+        return FakeLine(offset)
+
+class FakePWM:
+    def __init__(self, pin, frequency):
+        self.pin = pin
+
+    def start(self, duty):
+        pass
+
+    def ChangeDutyCycle(self, duty):
+        pass
+
+    def stop(self):
+        pass
+
+def install(frames=None, cameras=1):
+    """Register the fake modules in sys.modules; call before importing api_server"""
+    if frames is not None:
+        ReplayCamera.frames = list(frames)
+    ReplayCamera.count = cameras
+
+    picamera2 = types.ModuleType("picamera2")
+    picamera2_inner = types.ModuleType("picamera2.picamera2")
+    picamera2.Picamera2 = picamera2_inner.Picamera2 = ReplayCamera
+    picamera2.picamera2 = picamera2_inner
+    sys.modules["picamera2"] = picamera2
+    sys.modules["picamera2.picamera2"] = picamera2_inner
+
+    gpiod = types.ModuleType("gpiod")
+    gpiod.Chip = FakeChip
+    gpiod.LINE_REQ_DIR_IN = 1
+    gpiod.LINE_REQ_DIR_OUT = 2
+    sys.modules["gpiod"] = gpiod
+
+    rpi = types.ModuleType("RPi")
+    gpio = types.ModuleType("RPi.GPIO")
+    gpio.BCM = 11
+    gpio.OUT = 0
+    gpio.setmode = lambda mode: None
+    gpio.setup = lambda pin, mode: None
+    gpio.cleanup = lambda: None
+    gpio.PWM = FakePWM
+    rpi.GPIO = gpio
+    sys.modules["RPi"] = rpi
+    sys.modules["RPi.GPIO"] = gpio
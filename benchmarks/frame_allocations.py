@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Frame Allocations Benchmark
+
+Measures how much memory the per-frame path of a gate lane allocates, with
+tracemalloc, for the previous allocating path and the current one that reuses
+the lane's buffers (see frame_buffers.py). Each frame goes through the capture
+copy, the motion gate, the grayscale conversion, barcode decoding and
+downscaled face detection (the gate stages), then the JPEG encode for the live
+feed clients (the feed stage).
+
+For every frame and stage the peak of the traced memory above the level before
+it is recorded: that is the memory it churned through the allocator. The
+growth of the traced memory over the whole run shows whether anything is kept.
+Allocations made inside OpenCV's C++ code are not visible to tracemalloc; the
+numpy arrays it returns are.
+
+The gate stages allocate about 1 KiB per frame, against 3.5 MiB for the
+allocating path. The feed stage still allocates: cv2.imencode() always
+returns a new buffer and cannot encode into one the caller supplies. The feed
+part is then built from it, so each encoded frame costs about twice its JPEG
+size. That is about 520 KiB on the generated frames, which compress poorly,
+however many clients watch. The allocating path also built a part per client.
+Run with --clients 0 for a lane nobody is watching.
+
+Example:
+    python benchmarks/frame_allocations.py --frames 300 --json frame_allocations.json
+"""
+
+import time
+import argparse
+import tracemalloc
+from bench_utils import print_colored, summarize_ms, write_results
+import cv2
+import numpy as np
+import detection
+from frame_buffers import FrameBuffers
+from motion_gate import MotionGate
+from snapshot_cache import SnapshotCache, PART_HEADER
+from face_detectors import create_face_detector
+from gate_pipeline import synthetic_frames
+
+class FakeLane:
+    """Just what SnapshotCache reads from a lane"""
+
+    def __init__(self, frame_buffers):
+        self.lane_id = "bench"
+        self.frame_buffers = frame_buffers
+
+def barcode_decoder():
+    try:
+        return detection.get_barcode_decoder()
+    except Exception as e:
+        print_colored(f"No barcode decoder, skipping decoding: {e}", "YELLOW")
+        return None
+
+class AllocatingPath:
+    """The per-frame path before buffer reuse: new arrays at every stage"""
+
+    def __init__(self, face_detector, decoder, clients, quality):
+        self.face_detector = face_detector
+        self.decoder = decoder
+        self.clients = clients
+        self.quality = quality
+        self.previous = None
+
+    def motion(self, frame):
+        step = max(1, frame.shape[1] // 160)
+        current = np.ascontiguousarray(frame[::step, ::step, 1])
+        previous, self.previous = self.previous, current
+        if previous is not None:
+            np.count_nonzero(cv2.absdiff(current, previous) > 25)
+
+    def faces(self, frame):
+        scale = self.face_detector.detection_scale
+        size = (int(frame.shape[1] * scale), int(frame.shape[0] * scale))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        return self.face_detector._detect(small, cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+
+    def gate(self, camera_frame):
+        frame = camera_frame.copy()  # capture_array() returns a new array
+        self.motion(frame)
+        if self.decoder is not None:
+            self.decoder.decode(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        self.faces(frame)
+        return frame
+
+    def feed(self, frame):
+        if not self.clients:
+            return
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        jpeg = buffer.tobytes()
+        parts = [PART_HEADER + jpeg + b'\r\n' for _ in range(self.clients)]
+        del parts
+
+class ReusingPath:
+    """The current per-frame path, using the server's own modules"""
+
+    def __init__(self, face_detector, decoder, clients, quality):
+        self.face_detector = face_detector
+        self.decoder = decoder
+        self.clients = clients
+        self.quality = quality
+        self.buffers = FrameBuffers()
+        self.motion_gate = MotionGate()
+        self.lane = FakeLane(self.buffers)
+        self.snapshots = SnapshotCache(max_age=0)
+
+    def gate(self, camera_frame):
+        frame = self.buffers.store(camera_frame)  # What capture() does with the mapped camera buffer
+        self.buffers.publish(time.time())
+        self.motion_gate.update(frame)
+        gray = self.buffers.to_gray(frame)
+        if self.decoder is not None:
+            self.decoder.decode(gray)
+        self.face_detector.detect(frame, gray)
+        return frame
+
+    def feed(self, frame):
+        for _ in range(self.clients):
+            self.snapshots.get(self.lane, self.quality).part
+
+def churned(stage, *args):
+    """Run a stage; returns (its result, bytes it churned)"""
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    result = stage(*args)
+    return result, tracemalloc.get_traced_memory()[1] - before
+
+def measure(path, frames, count, warmup):
+    """Per-frame churn in bytes per stage, net growth over the run and time per frame"""
+    for i in range(warmup):
+        path.feed(path.gate(frames[i % len(frames)]))
+
+    tracemalloc.start(1)
+    gate_churn = []
+    feed_churn = []
+    durations = []
+    try:
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        for i in range(count):
+            frame_start = time.perf_counter()
+            frame, churn = churned(path.gate, frames[i % len(frames)])
+            gate_churn.append(churn)
+            feed_churn.append(churned(path.feed, frame)[1])
+            durations.append(time.perf_counter() - frame_start)
+        growth = tracemalloc.get_traced_memory()[0] - start_bytes
+    finally:
+        tracemalloc.stop()
+
+    churn = [gate + feed for gate, feed in zip(gate_churn, feed_churn)]
+    return {
+        "frames": count,
+        "frame_churn_bytes": round(sum(churn) / len(churn)),
+        "max_frame_churn_bytes": max(churn),
+        "gate_churn_bytes": round(sum(gate_churn) / len(gate_churn)),
+        "feed_churn_bytes": round(sum(feed_churn) / len(feed_churn)),
+        "growth_bytes": growth,
+        "frame_ms": summarize_ms(durations)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory allocated per frame on the gate lane path")
+    parser.add_argument("--frames", type=int, default=300, help="measured frames per path")
+    parser.add_argument("--warmup", type=int, default=30, help="frames run before measuring")
+    parser.add_argument("--clients", type=int, default=2, help="live feed clients served per frame")
+    parser.add_argument("--detector", default="haar", help="face detector backend")
+    parser.add_argument("--scale", type=float, default=0.5, help="face detection scale")
+    parser.add_argument("--quality", type=int, default=85, help="JPEG quality of the feed")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    frames = synthetic_frames(4, 1000, 0.0, seed=1)
+    decoder = barcode_decoder()
+    print(f"{args.frames} frames of {frames[0].shape[1]}x{frames[0].shape[0]}, {args.clients} feed client(s), "
+          f"{args.detector} face detector at scale {args.scale}")
+
+    results = []
+    for name, path_class in (("allocating", AllocatingPath), ("reusing", ReusingPath)):
+        # A detector per path, so the reusing one starts without buffers
+        face_detector = create_face_detector(args.detector, detection_scale=args.scale)
+        path = path_class(face_detector, decoder, args.clients, args.quality)
+        result = {"path": name, **measure(path, frames, args.frames, args.warmup)}
+        results.append(result)
+        print_colored(f"{name:<11} churn/frame {result['frame_churn_bytes'] / 1024:8.1f} KiB  "
+                      f"(gate {result['gate_churn_bytes'] / 1024:8.1f} KiB, feed {result['feed_churn_bytes'] / 1024:7.1f} KiB)  "
+                      f"growth {result['growth_bytes'] / 1024:7.1f} KiB  frame p50 {result['frame_ms']['p50']:.2f} ms",
+                      "GREEN" if name == "reusing" else "YELLOW")
+
+    write_results("frame_allocations", results, args.json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Gate Pipeline Benchmark
+
+Drives a gate lane of the real API server through replayed frames with no Pi
+attached (see server_harness.py) and measures how many gate decisions it makes
+per second and the latency from capturing a frame with a QR code to the door
+being open. Each frame goes through the lane's own process_frame(): barcode
+decode, student lookup in the database, face detection, identity check and the
+attendance write with its Supabase sync.
+
+Frames come from a directory of recorded images (--frames), or are generated:
+QR codes for students in the seeded roster plus some unknown codes. Generated
+frames contain no real face, so in that mode face detection is replaced by a
+fixed box above the code and the detector stage is not measured; record real
+frames at the gate to include it.
+
+Example:
+    python benchmarks/gate_pipeline.py --decisions 500 --json gate_pipeline.json
+"""
+
+import os
+import sys
+import time
+import glob
+import argparse
+from bench_utils import print_colored, summarize_ms, write_results
+import cv2
+import numpy as np
+
+FRAME_SHAPE = (720, 1280, 3)
+
+def synthetic_frames(count, students, unknown_share, seed):
+    """Frames with a QR code for a student id, some of them not in the roster"""
+    rng = np.random.default_rng(seed)
+    encoder = cv2.QRCodeEncoder.create()
+    frames = []
+    for i in range(count):
+        if rng.random() < unknown_share:
+            code = f"X{rng.integers(0, 99999):05d}"
+        else:
+            code = f"R{rng.integers(0, students):05d}"
+        qr = cv2.resize(encoder.encode(code), None, fx=8, fy=8, interpolation=cv2.INTER_NEAREST)
+        frame = rng.integers(90, 140, FRAME_SHAPE, dtype=np.uint8)
+        y = FRAME_SHAPE[0] - qr.shape[0] - 40
+        x = (FRAME_SHAPE[1] - qr.shape[1]) // 2
+        frame[y:y + qr.shape[0], x:x + qr.shape[1]] = qr[:, :, None]
+        frames.append(frame)
+    return frames
+
+def recorded_frames(directory):
+    paths = sorted(glob.glob(os.path.join(directory, "*.png")) + glob.glob(os.path.join(directory, "*.jpg")))
+    frames = [cv2.imread(path) for path in paths]
+    return [frame for frame in frames if frame is not None]
+
+class FixedFaceDetector:
+    """Reports one face in the middle of the search region; barcodes and embeddings are real"""
+
+    def __init__(self, detector):
+        self.detector = detector
+
+    def scan_barcode(self, frame, gray=None):
+        return self.detector.scan_barcode(frame, gray)
+
+    def detect_faces(self, frame, roi=None, gray=None):
+        x, y, w, h = roi or (0, 0, frame.shape[1], frame.shape[0])
+        return [(x + w // 4, y + h // 4, w // 2, h // 2)]
+
+    def embed_face(self, frame, roi=None):
+        return self.detector.embed_face(frame, roi)
+
+    def close(self):
+        self.detector.close()
+
+def wait_until_ready(lane, timeout=30):
+    deadline = time.perf_counter() + timeout
+    while not lane.ready_for_decision():
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"Lane {lane.lane_id} did not finish its door cycle")
+        time.sleep(0.0005)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gate decisions on replayed frames")
+    parser.add_argument("--frames", help="directory of recorded frames (*.png, *.jpg); generated when omitted")
+    parser.add_argument("--decisions", type=int, default=300, help="frames to run through the lane")
+    parser.add_argument("--students", type=int, default=1000, help="roster size of the stand-in database")
+    parser.add_argument("--unknown-share", type=float, default=0.1, help="share of generated codes not in the roster")
+    parser.add_argument("--workers", type=int, default=0, help="detection worker processes (DETECTION_WORKERS)")
+    parser.add_argument("--supabase-latency", type=float, default=0.05, help="mock Supabase response delay in seconds")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    os.environ["DETECTION_WORKERS"] = str(args.workers)
+    if args.frames:
+        frames = recorded_frames(args.frames)
+        if not frames:
+            print_colored(f"No frames found in {args.frames}", "RED")
+            sys.exit(1)
+    else:
+        frames = synthetic_frames(min(args.decisions, 200), args.students, args.unknown_share, args.seed)
+
+    from server_harness import load_server
+    harness = load_server(cameras=False, students=args.students, supabase_latency=args.supabase_latency)
+    lane = harness.server.default_lane
+    if not args.frames:
+        lane.detector = FixedFaceDetector(lane.detector)
+
+    # Time from the frame capture to the door being open, per decision
+    scan_to_open = []
+    pending = {}
+    original_open_door = lane.open_door
+
+    def timed_open_door():
+        original_open_door()
+        scan_to_open.append(time.perf_counter() - pending["captured_at"])
+    lane.open_door = timed_open_door
+
+    print_colored("===== GATE PIPELINE BENCHMARK =====", "YELLOW")
+    print(f"{len(frames)} {'recorded' if args.frames else 'generated'} frames, {args.decisions} decisions, "
+          f"{args.workers} detection workers")
+
+    decision_durations = []
+    decided = 0
+    start = time.perf_counter()
+    for i in range(args.decisions):
+        wait_until_ready(lane)
+        pending["captured_at"] = time.perf_counter()
+        # Same path as the lane loop: copy into the lane's buffers, convert once
+        frame = lane.frame_buffers.store(frames[i % len(frames)])
+        if lane.process_frame(frame, pending["captured_at"], lane.frame_buffers.to_gray(frame)):
+            decided += 1
+            decision_durations.append(time.perf_counter() - pending["captured_at"])
+    wait_until_ready(lane)
+    elapsed = time.perf_counter() - start
+    decision_seconds = sum(decision_durations)
+
+    results = {
+        "frames": "recorded" if args.frames else "generated",
+        "decisions": decided,
+        "frames_without_code": args.decisions - decided,
+        "wall_seconds": round(elapsed, 3),
+        # Decision throughput excludes waiting for door cycles to finish
+        "decisions_per_second": round(decided / decision_seconds, 2) if decision_seconds else None,
+        "decision_ms": summarize_ms(decision_durations),
+        "scan_to_open_ms": summarize_ms(scan_to_open),
+        "lane_stats": lane.metrics(),
+        "supabase_requests": dict(harness.supabase.requests),
+        "workers": args.workers
+    }
+
+    decision = results["decision_ms"]
+    opened = results["scan_to_open_ms"]
+    print(f"decisions/sec: {results['decisions_per_second']}  ({decided} decisions)")
+    if decided:
+        print(f"decision latency   p50 {decision['p50']:.2f} ms  p95 {decision['p95']:.2f} ms  p99 {decision['p99']:.2f} ms")
+    if scan_to_open:
+        print(f"scan to door open  p50 {opened['p50']:.2f} ms  p95 {opened['p95']:.2f} ms  p99 {opened['p99']:.2f} ms")
+    if decided == 0:
+        print_colored("No codes were decoded; check the frames and the barcode decoder", "RED")
+
+    harness.close()
+    write_results("gate_pipeline", results, args.json)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print_colored("\nBenchmark stopped by user", "YELLOW")
+        sys.exit(0)
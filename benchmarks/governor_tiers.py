@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Governor Tiers Benchmark
+
+Drives the load governor (governor.py) through its tiers from a temporary
+sensor file, the way THERMAL_SENSOR_FILE lets it be tried on a development
+machine, and measures the vision path at every tier it reaches: barcode
+decoding at the tier's barcode scale and face detection at its detection
+scale. It shows what each tier saves and whether badges still decode at it.
+
+The governor runs on a simulated clock, so the run takes no longer than the
+measurements. The CPU and frame time inputs are left out; only the
+temperature written into the sensor file moves the tiers.
+
+Example:
+    python benchmarks/governor_tiers.py --frames 40 --json governor_tiers.json
+"""
+
+import os
+import time
+import argparse
+import tempfile
+from bench_utils import print_colored, summarize_ms, write_results
+import detection
+from face_detectors import create_face_detector
+from governor import Governor
+from gate_pipeline import synthetic_frames
+
+INTERVAL = 5.0  # Simulated seconds between governor checks
+
+# (phase, SoC temperature in °C, governor checks): warming up, throttling, cooling down
+PHASES = [
+    ("warm", 60, 2),
+    ("hot", 78, 2),
+    ("still hot", 78, 2),
+    ("critical", 83, 1),
+    ("cooling", 60, 3),
+    ("cool", 60, 4)
+]
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def write_temperature(path, celsius):
+    """Write a temperature the way a sysfs thermal zone reports it, in millidegrees"""
+    with open(path, "w") as f:
+        f.write(f"{int(celsius * 1000)}\n")
+
+def measure(frames, face_detector, codes):
+    """Barcode and face detection latency over the frames, and the share of badges read"""
+    barcode_durations = []
+    face_durations = []
+    read = 0
+    for frame, code in zip(frames, codes):
+        gray = detection.to_gray(frame)
+        start = time.perf_counter()
+        result = detection.scan_barcode(gray)
+        barcode_durations.append(time.perf_counter() - start)
+        read += result is not None and result[0] == code
+        start = time.perf_counter()
+        face_detector.detect(frame, gray)
+        face_durations.append(time.perf_counter() - start)
+    return {
+        "read_rate": round(read / len(frames), 3),
+        "barcode_ms": summarize_ms(barcode_durations),
+        "faces_ms": summarize_ms(face_durations)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the vision path at every load governor tier")
+    parser.add_argument("--frames", type=int, default=40, help="frames measured at each phase")
+    parser.add_argument("--detector", default="haar", help="configured face detector backend")
+    parser.add_argument("--scale", type=float, default=1.0, help="configured face detection scale")
+    parser.add_argument("--barcode-decoder", default="auto", help="barcode decoder backend")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    detection.configure_barcode_decoder(args.barcode_decoder)
+    frames = synthetic_frames(args.frames, 1000, 0.0, seed=1)
+    # Read the payloads back at full resolution, so a miss at a lower scale counts against it
+    detection.configure_barcode_scale(1.0)
+    codes = [(detection.scan_barcode(detection.to_gray(frame)) or (None,))[0] for frame in frames]
+
+    face_detectors = {}
+
+    def face_detector_for(tier):
+        """The configured detector within the tier's caps, as governed_face_detector() picks it"""
+        name = tier.face_detector or args.detector
+        scale = min(args.scale, tier.detection_scale) if tier.detection_scale else args.scale
+        if (name, scale) not in face_detectors:
+            try:
+                face_detectors[name, scale] = create_face_detector(name, detection_scale=scale)
+            except FileNotFoundError as e:
+                print_colored(f"Keeping {args.detector} at tier {tier.name}: {e}", "YELLOW")
+                face_detectors[name, scale] = create_face_detector(args.detector, detection_scale=scale)
+        return face_detectors[name, scale]
+
+    def apply(tier):
+        detection.configure_barcode_scale(tier.barcode_scale or 1.0)
+
+    clock = SimulatedClock()
+    fd, sensor_path = tempfile.mkstemp(prefix="soc_temp")
+    os.close(fd)
+    results = []
+    try:
+        governor = Governor(apply, frame_seconds=lambda: [], sensor_path=sensor_path, interval=INTERVAL,
+                            cpu_high=float("inf"), recover_after=2 * INTERVAL, clock=clock)
+        for phase, celsius, checks in PHASES:
+            write_temperature(sensor_path, celsius)
+            for _ in range(checks):
+                clock.now += INTERVAL
+                governor.check()
+            tier = governor.tier
+            result = {
+                "phase": phase,
+                "temperature": celsius,
+                "tier": governor.index,
+                "name": tier.name,
+                "barcode_scale": tier.barcode_scale or 1.0,
+                "detection_scale": face_detector_for(tier).detection_scale,
+                **measure(frames, face_detector_for(tier), codes)
+            }
+            results.append(result)
+            print_colored(f"{phase:<10} {celsius:3d} °C  tier {governor.index} {tier.name:<8} "
+                          f"barcode x{result['barcode_scale']:.2f} p50 {result['barcode_ms']['p50']:6.2f} ms "
+                          f"read {result['read_rate']:.0%}  faces x{result['detection_scale']:.2f} "
+                          f"p50 {result['faces_ms']['p50']:6.2f} ms",
+                          "GREEN" if result["read_rate"] == 1 else "YELLOW")
+    finally:
+        os.unlink(sensor_path)
+
+    write_results("governor_tiers", results, args.json)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Mock Supabase Server
+
+A local HTTP server that accepts the PostgREST calls the API server makes to
+Supabase (/rest/v1/<table>) and answers them after an optional delay, so sync
+traffic can be benchmarked offline. It counts requests and rows per table.
+"""
+
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class MockSupabase:
+    """Start with start(), read counts from .requests, stop with stop()"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = {}
+        self.rows = {}
+        self.lock = threading.Lock()
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _record(self, method, table, rows=0):
+        with self.lock:
+            key = f"{method} {table}"
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.rows[table] = self.rows.get(table, 0) + rows
+
+    def start(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _table(self):
+                return self.path.split("/rest/v1/", 1)[-1].split("?", 1)[0]
+
+            def _reply(self, status, body=b""):
+                if mock.latency:
+                    time.sleep(mock.latency)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"null")
+                rows = len(payload) if isinstance(payload, list) else 1
+                mock._record("POST", self._table(), rows)
+                self._reply(201)
+
+            def do_PATCH(self):
+                self.do_POST()
+
+            def do_DELETE(self):
+                mock._record("DELETE", self._table())
+                self._reply(204)
+
+            def do_GET(self):
+                mock._record("GET", self._table())
+                self._reply(200, b"[]")
+
+            def do_HEAD(self):
+                mock._record("HEAD", self._table())
+                self._reply(200)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Run All Benchmarks
+
+Runs the offline benchmark suite and writes each benchmark's JSON results to
+benchmarks/results/<commit>/, ready for compare.py. Benchmarks that need data
+which is not present (the face detector test set) are skipped; without a badge
+corpus the barcode decoders are compared on synthetic badges.
+
+Example:
+    python benchmarks/run_all.py
+    python benchmarks/compare.py benchmarks/results/abc1234 benchmarks/results/def5678
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+from bench_utils import REPO_ROOT, print_colored, git_commit
+
+BENCHMARK_DIR = os.path.join(REPO_ROOT, "benchmarks")
+
+# Benchmark script and the arguments of the standard run
+SUITE = [
+    ("gate_pipeline", ["--decisions", "300"]),
+    ("api_throughput", ["--clients", "8", "--duration", "5"]),
+    ("face_match", ["--sizes", "100", "1000", "10000"]),
+    ("face_detectors", []),
+    ("barcode_decoders", []),
+    ("serialization", ["--students", "5000"]),
+    ("frame_allocations", ["--frames", "300"]),
+    ("governor_tiers", ["--frames", "40"])
+]
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and store results per commit")
+    parser.add_argument("--output", help="results directory (default benchmarks/results/<commit>)")
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(BENCHMARK_DIR, "results", git_commit() or "unknown")
+    os.makedirs(output, exist_ok=True)
+
+    failed = []
+    for name, bench_args in SUITE:
+        if args.only and name not in args.only:
+            continue
+        if name == "face_detectors" and not os.path.isdir(os.path.join(BENCHMARK_DIR, "data", "faces")):
+            print_colored(f"Skipping {name}: no test set in benchmarks/data/faces", "YELLOW")
+            continue
+        if name == "barcode_decoders" and not os.path.isdir(os.path.join(BENCHMARK_DIR, "data", "badges")):
+            bench_args = ["--synthetic", "20"]
+        print_colored(f"\n>>> {name}", "BLUE")
+        command = [sys.executable, os.path.join(BENCHMARK_DIR, f"{name}.py"), *bench_args,
+                   "--json", os.path.join(output, f"{name}.json")]
+        # Each benchmark runs in its own process, since importing the server starts its threads
+        if subprocess.call(command, cwd=REPO_ROOT) != 0:
+            failed.append(name)
+
+    print_colored(f"\nResults in {output}", "GREEN")
+    if failed:
+        print_colored(f"Failed: {', '.join(failed)}", "RED")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark
+
+Measures what a large JSON response costs: serialization time with the
+standard library encoder (as Flask's default provider uses it) and with orjson,
+row and columnar shapes, and the bytes and compression time of gzip and brotli
+at the levels the server uses. Transfer time is estimated for a Wi-Fi link of
+--link-mbps. With --url it also fetches the endpoints from a running server
+with each Accept-Encoding and reports the bytes on the wire and the time taken.
+
+Example:
+    python benchmarks/serialization.py --students 5000 --json serialization.json
+    python benchmarks/serialization.py --url http://192.168.187.113:5000
+"""
+
+import sys
+import json
+import time
+import argparse
+from bench_utils import print_colored, summarize_ms, write_results
+import response_encoding
+from response_encoding import columnar, compress, orjson, brotli
+
+COURSES = ("CSE", "ECE", "MECH", "CIVIL", "IT")
+
+def roster(count):
+    """Rows shaped like /api/students"""
+    return [{
+        "id": i + 1,
+        "name": f"Student {i:05d}",
+        "rollno": f"R{i:05d}",
+        "course": COURSES[i % len(COURSES)],
+        "email": f"stude{i:05d}@snuchennai.edu.in"
+    } for i in range(count)]
+
+def timed(function, repeat):
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    return result, durations
+
+def encoders():
+    # Flask's default provider: json.dumps with sorted keys, pretty-printed in debug mode
+    yield "json (flask default)", lambda obj: json.dumps(obj, sort_keys=True).encode("utf-8")
+    yield "json (flask debug)", lambda obj: json.dumps(obj, sort_keys=True, indent=2).encode("utf-8")
+    if orjson:
+        yield "orjson", response_encoding.dumps
+
+def compressors(args):
+    yield "identity", lambda data: data
+    yield f"gzip-{args.gzip_level}", lambda data: compress(data, "gzip", gzip_level=args.gzip_level)
+    if brotli:
+        yield f"br-{args.brotli_quality}", lambda data: compress(data, "br", brotli_quality=args.brotli_quality)
+
+def offline(args):
+    records = roster(args.students)
+    shapes = {"rows": records, "columns": columnar(records)}
+    link_bytes_per_second = args.link_mbps * 1e6 / 8
+
+    results = []
+    for encoder_name, encode in encoders():
+        for shape_name, obj in shapes.items():
+            body, encode_durations = timed(lambda: encode(obj), args.repeat)
+            for compressor_name, squeeze in compressors(args):
+                wire, compress_durations = timed(lambda: squeeze(body), args.repeat)
+                encode_ms = summarize_ms(encode_durations)
+                compress_ms = summarize_ms(compress_durations)
+                transfer_ms = len(wire) / link_bytes_per_second * 1000
+                results.append({
+                    "encoder": encoder_name,
+                    "shape": shape_name,
+                    "encoding": compressor_name,
+                    "body_bytes": len(body),
+                    "wire_bytes": len(wire),
+                    "serialize_ms": encode_ms,
+                    "compress_ms": compress_ms,
+                    "transfer_estimate_ms": round(transfer_ms, 2),
+                    "total_estimate_ms": round(encode_ms["p50"] + compress_ms["p50"] + transfer_ms, 2)
+                })
+    return results
+
+def online(args):
+    import requests
+    results = []
+    session = requests.Session()
+    for endpoint in args.endpoints:
+        for accept in ("identity", "gzip", "br"):
+            durations = []
+            wire = 0
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                response = session.get(args.url + endpoint, headers={"Accept-Encoding": accept}, stream=True, timeout=30)
+                raw = response.raw.read()  # Body as sent, before requests decodes it
+                durations.append(time.perf_counter() - start)
+                wire = len(raw)
+            results.append({
+                "endpoint": endpoint,
+                "encoding": response.headers.get("Content-Encoding", "identity"),
+                "requested": accept,
+                "wire_bytes": wire,
+                "latency_ms": summarize_ms(durations)
+            })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON serialization and response compression")
+    parser.add_argument("--students", type=int, default=5000, help="roster size")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--link-mbps", type=float, default=20.0, help="Wi-Fi throughput for the transfer estimate")
+    parser.add_argument("--gzip-level", type=int, default=5)
+    parser.add_argument("--brotli-quality", type=int, default=4)
+    parser.add_argument("--url", help="also measure a running server, e.g. http://192.168.187.113:5000")
+    parser.add_argument("--endpoints", nargs="+", default=["/api/students", "/api/students?shape=columns",
+                                                           "/api/attendance", "/api/camera-snapshot"])
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    args = parser.parse_args()
+
+    print_colored("===== SERIALIZATION BENCHMARK =====", "YELLOW")
+    print(f"{args.students} students, transfer estimated at {args.link_mbps:g} Mbit/s")
+    if not orjson:
+        print_colored("orjson is not installed; only the standard library encoder is measured", "YELLOW")
+
+    results = {"roster": offline(args)}
+    for row in results["roster"]:
+        print(f"{row['encoder']:<21} {row['shape']:<8} {row['encoding']:<9} {row['wire_bytes'] / 1024:8.1f} KiB  "
+              f"serialize {row['serialize_ms']['p50']:6.2f} ms  compress {row['compress_ms']['p50']:6.2f} ms  "
+              f"~total {row['total_estimate_ms']:7.1f} ms")
+
+    if args.url:
+        results["server"] = online(args)
+        print_colored(f"\n{args.url}", "BLUE")
+        for row in results["server"]:
+            print(f"{row['endpoint']:<30} {row['encoding']:<9} {row['wire_bytes'] / 1024:8.1f} KiB  "
+                  f"p50 {row['latency_ms']['p50']:7.1f} ms")
+
+    write_results("serialization", results, args.json)
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print_colored("\nBenchmark stopped by user", "YELLOW")
+        sys.exit(0)
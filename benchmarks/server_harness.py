@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Server Harness
+
+Imports the API server against offline stand-ins: replayed camera frames and
+fake GPIO (fake_hardware.py), a seeded SQLite database in place of MySQL
+(sqlite_pool.py) and a local mock of the Supabase REST API (mock_supabase.py).
+The gate and API benchmarks share this so they exercise the server's own code
+paths with no Pi, MySQL server or network access.
+"""
+
+import os
+import json
+import tempfile
+import fake_hardware
+from sqlite_pool import SQLitePool, seed
+from mock_supabase import MockSupabase
+
+# Door timings shortened so a decision's door cycle does not dominate a benchmark
+FAST_DOOR_TIMINGS = {
+    "door_open_time": 0,
+    "servo_move_time": 0,
+    "deny_buzz_time": 0.01,
+    "alert_buzz_time": 0.01
+}
+
+class ServerHarness:
+    """Holds the imported api_server module and the stand-ins behind it"""
+
+    def __init__(self, server, pool, supabase, workdir):
+        self.server = server
+        self.pool = pool
+        self.supabase = supabase
+        self.workdir = workdir
+
+    def close(self):
+        self.supabase.stop()
+
+def load_server(frames=None, lanes=1, cameras=True, students=1000, attendance_days=30,
+                supabase_latency=0.0, mysql_config=None):
+    """Import api_server wired to the offline stand-ins
+
+    frames: camera frames the fake cameras replay. cameras=False leaves the
+    lanes without a camera, so their threads stay idle and a benchmark can drive
+    process_frame() itself. mysql_config points the server at a real MySQL
+    database instead of the SQLite stand-in.
+    """
+    workdir = tempfile.mkdtemp(prefix="gate_bench_")
+    fake_hardware.install(frames, cameras=lanes if cameras else 0)
+
+    lane_configs = []
+    for index in range(lanes):
+        lane_configs.append({
+            "id": f"lane{index + 1}",
+            "camera_index": index,
+            "infrared_pin": 17 + 3 * index,
+            "buzzer_pin": 18 + 3 * index,
+            "servo_pin": 19 + 3 * index,
+            **FAST_DOOR_TIMINGS
+        })
+    lanes_file = os.path.join(workdir, "gate_lanes.json")
+    with open(lanes_file, "w") as f:
+        json.dump(lane_configs, f)
+
+    # Keep a server_config.json in the checkout from changing the benchmark
+    os.environ["SERVER_CONFIG_FILE"] = os.path.join(workdir, "server_config.json")
+    os.environ["GATE_LANES_FILE"] = lanes_file
+    os.environ["FACE_INDEX_DIR"] = os.path.join(workdir, "face_index")
+    os.environ["LOG_FILE"] = os.path.join(workdir, "api_server.log")
+    os.environ["EVENT_LOG_FILE"] = os.path.join(workdir, "gate_events.log")
+    os.environ["EVIDENCE_DIR"] = os.path.join(workdir, "evidence")
+    # Per-scan log lines on the console would dominate the benchmark output
+    os.environ.setdefault("LOG_LEVELS", "gate_lane=WARNING,api_server=WARNING,werkzeug=WARNING")
+
+    # All benchmark clients share one address; measure the server, not the admission limits
+    os.environ.setdefault("RATE_LIMIT_PER_CLIENT", "0")
+    os.environ.setdefault("HEAVY_LIMIT", "32")
+
+    supabase = MockSupabase(latency=supabase_latency).start()
+    os.environ["SUPABASE_URL"] = supabase.url
+    os.environ["SUPABASE_KEY"] = "benchmark"
+
+    import api_server
+
+    if mysql_config:
+        from mysql.connector.pooling import MySQLConnectionPool
+        pool = MySQLConnectionPool(pool_name="bench_pool", pool_size=5, **mysql_config)
+    else:
+        pool = SQLitePool(os.path.join(workdir, "attendance.db"))
+        seed(pool, students=students, attendance_days=attendance_days)
+    api_server.connection_pool = pool
+    api_server.prepare_attendance_rollups()
+    api_server.prepare_sync()
+
+    return ServerHarness(api_server, pool, supabase, workdir)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+SQLite Stand-in Pool
+
+A drop-in replacement for mysql.connector's MySQLConnectionPool backed by a
+SQLite file, so the API server's queries can be benchmarked without a MySQL
+server. It translates the MySQL parameter style and the handful of MySQL
+functions the server uses. Absolute numbers differ from MySQL on the Pi; use it
+to compare commits against each other, and point the benchmarks at a real MySQL
+database for production figures.
+"""
+
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+# Schema from the README, in SQLite syntax
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  rollno VARCHAR(20) UNIQUE NOT NULL,
+  name VARCHAR(100) NOT NULL,
+  course VARCHAR(50),
+  dob DATE,
+  email VARCHAR(100)
+);
+CREATE TABLE IF NOT EXISTS student_attendance (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  student_id VARCHAR(20) NOT NULL,
+  date DATE DEFAULT (DATE('now', 'localtime')),
+  timestamp DATETIME DEFAULT (DATETIME('now', 'localtime')),
+  status VARCHAR(20) DEFAULT 'present',
+  verification_method VARCHAR(50) DEFAULT 'fully verified',
+  UNIQUE (student_id, date)
+);
+"""
+
+def translate_schema(query):
+    """MySQL auto-increment key in SQLite syntax"""
+    return query.replace("BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT")
+
+def translate(query):
+    """MySQL statement in SQLite syntax"""
+    return query.replace("%s", "?").replace("ON DUPLICATE KEY UPDATE", "ON CONFLICT DO UPDATE SET")
+
+# MySQL DATE_FORMAT specifiers that differ from strftime
+_MYSQL_FORMAT = {"%i": "%M", "%s": "%S", "%k": "%H"}
+
+def _date_format(value, mysql_format):
+    if value is None:
+        return None
+    moment = datetime.fromisoformat(str(value))
+    fmt = re.sub(r"%[isk]", lambda m: _MYSQL_FORMAT[m.group(0)], mysql_format)
+    return moment.strftime(fmt)
+
+class SQLiteCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def execute(self, query, params=None):
+        if params is not None:
+            # mysql.connector only substitutes %s when parameters are given
+            query = translate(query)
+            params = tuple(str(p) if isinstance(p, datetime) else p for p in params)
+            return self.cursor.execute(query, params)
+        return self.cursor.execute(translate_schema(query))
+
+    def executemany(self, query, seq_params):
+        return self.cursor.executemany(translate(query), seq_params)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self.cursor.lastrowid
+
+    def close(self):
+        self.cursor.close()
+
+class SQLiteConnection:
+    def __init__(self, pool, connection):
+        self.pool = pool
+        self.connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return SQLiteCursor(self.connection.cursor())
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+    def close(self):
+        """Return the connection to the pool, like a pooled MySQL connection"""
+        self.connection.rollback()
+        self.pool._release(self.connection)
+
+class SQLitePool:
+    """Minimal MySQLConnectionPool look-alike"""
+
+    def __init__(self, path, pool_size=5):
+        self.path = path
+        self.pool_size = pool_size
+        self.idle = []
+        self.lock = threading.Lock()
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.commit()
+        self._release(connection)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.create_function("DATE_FORMAT", 2, _date_format)
+        connection.create_function("NOW", 0, lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        connection.create_function("CURDATE", 0, lambda: datetime.now().strftime("%Y-%m-%d"))
+        return connection
+
+    def _release(self, connection):
+        with self.lock:
+            if len(self.idle) < self.pool_size:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def get_connection(self):
+        with self.lock:
+            connection = self.idle.pop() if self.idle else None
+        return SQLiteConnection(self, connection or self._connect())
+
+def seed(pool, students=1000, attendance_days=30, courses=("CSE", "ECE", "MECH", "CIVIL", "IT")):
+    """Fill the stand-in database with a roster and some attendance history"""
+    db = pool.get_connection()
+    cursor = db.cursor()
+    rows = [(f"Student {i:05d}", f"R{i:05d}", courses[i % len(courses)], "2004-01-01",
+             f"r{i:05d}@snuchennai.edu.in") for i in range(students)]
+    cursor.executemany("INSERT OR IGNORE INTO students (name, rollno, course, dob, email) VALUES (%s, %s, %s, %s, %s)",
+                       rows)
+    attendance = []
+    today = datetime.now()
+    for day in range(attendance_days):
+        date = datetime.fromordinal(today.toordinal() - day - 1)
+        for i in range(0, students, 3):
+            stamp = date.replace(hour=8, minute=i % 60, second=0)
+            attendance.append((f"R{i:05d}", date.strftime("%Y-%m-%d"), stamp.strftime("%Y-%m-%d %H:%M:%S"),
+                               "present", "fully verified"))
+    cursor.executemany("INSERT OR IGNORE INTO student_attendance (student_id, date, timestamp, status, verification_method) "
+                       "VALUES (%s, %s, %s, %s, %s)", attendance)
+    db.commit()
+    cursor.close()
+    db.close()
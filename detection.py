@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Detection Module
+
+This module provides the barcode and face detection functions used by the gate
+lanes. They only depend on the frame they are given, so they can run either in
+the server process or inside the detection worker processes. Barcode decoding
+and face detection use the backends chosen with configure_barcode_decoder() and
+configure_face_detector() (see barcode_decoders.py and face_detectors.py).
+Barcodes can be decoded on a downscaled frame, set with configure_barcode_scale().
+"""
+
+import logging
+import threading
+import cv2
+import numpy as np
+from barcode_decoders import create_barcode_decoder
+from face_detectors import create_face_detector
+from face_index import FaceEmbedder
+
+logger = logging.getLogger("detection")
+
+# Face detector backend and options, set by configure_face_detector(). Each change
+# bumps the generation so every thread rebuilds its detector on its next frame.
+_face_detector_settings = {"name": "auto", "options": {}, "generation": 0}
+
+# Barcode decoder backend, set by configure_barcode_decoder() before the lanes start
+_barcode_decoder_name = "auto"
+
+# Scale of the frame barcodes are decoded on, set by configure_barcode_scale()
+_barcode_scale = 1.0
+
+# Detector objects are not safe to share between threads, so each thread
+# (lane loops, streaming requests, worker processes) builds its own once
+_thread_detectors = threading.local()
+
+def configure_face_detector(name="auto", **options):
+    """Select the face detector backend used by detect_faces()
+
+    Detection workers inherit the choice when they start; to change it while
+    they run, use the detector's configure_face_detector() instead.
+    """
+    _face_detector_settings["name"] = name
+    _face_detector_settings["options"] = options
+    _face_detector_settings["generation"] += 1
+
+def get_face_detector():
+    """Return this thread's face detector, creating it on first use"""
+    face_detector = getattr(_thread_detectors, "detector", None)
+    generation = _face_detector_settings["generation"]
+    if face_detector is None or _thread_detectors.generation != generation:
+        face_detector = create_face_detector(_face_detector_settings["name"], **_face_detector_settings["options"])
+        logger.info(f"Using {face_detector.name} face detector (scale {face_detector.detection_scale})")
+        _thread_detectors.detector = face_detector
+        _thread_detectors.generation = generation
+    return face_detector
+
+def configure_barcode_decoder(name="auto"):
+    """Select the barcode decoder backend used by scan_barcode()
+
+    The backend is created once here, so an unknown or missing backend fails
+    at startup rather than on the first frame. Detection workers inherit the
+    choice when they start.
+    """
+    global _barcode_decoder_name
+    decoder = create_barcode_decoder(name)
+    logger.info(f"Using {decoder.name} barcode decoder")
+    _barcode_decoder_name = name
+
+def configure_barcode_scale(scale=1.0):
+    """Decode barcodes on a frame downscaled by scale (1.0 = full resolution)
+
+    Detection workers inherit the scale when they start; to change it while
+    they run, use the detector's configure_barcode_scale() instead.
+    """
+    global _barcode_scale
+    _barcode_scale = scale
+
+def get_barcode_decoder():
+    """Return this thread's barcode decoder, creating it on first use"""
+    decoder = getattr(_thread_detectors, "barcode_decoder", None)
+    if decoder is None:
+        decoder = create_barcode_decoder(_barcode_decoder_name)
+        _thread_detectors.barcode_decoder = decoder
+    return decoder
+
+def get_face_embedder():
+    """Return this thread's face embedder, or None when the models are not installed"""
+    embedder = getattr(_thread_detectors, "embedder", None)
+    if embedder is None:
+        try:
+            embedder = FaceEmbedder()
+        except (FileNotFoundError, cv2.error) as e:
+            logger.error(f"Face identity verification unavailable: {e}")
+            embedder = False
+        _thread_detectors.embedder = embedder
+    return embedder or None
+
+def to_gray(frame):
+    """Convert a camera frame to grayscale"""
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+def crop(frame, roi):
+    """View of the (x, y, w, h) region of a frame, or the whole frame"""
+    if roi is None:
+        return frame
+    x, y, w, h = roi
+    return frame[y:y+h, x:x+w]
+
+def offset_faces(faces, roi):
+    """Move face boxes found in a region back to full-frame coordinates"""
+    if roi is None:
+        return faces
+    return [(x + roi[0], y + roi[1], w, h) for (x, y, w, h) in faces]
+
+def scan_barcode(gray):
+    """Return (data, (x, y, w, h)) of the first barcode in a grayscale frame, or None"""
+    decoder = get_barcode_decoder()
+    scale = _barcode_scale
+    if scale == 1.0:
+        return decoder.decode(gray)
+
+    size = (max(1, int(gray.shape[1] * scale)), max(1, int(gray.shape[0] * scale)))
+    # This thread's downscaled frame, reused while the frame size stays the same
+    small = getattr(_thread_detectors, "barcode_frame", None)
+    if small is None or small.shape != (size[1], size[0]):
+        small = _thread_detectors.barcode_frame = np.empty((size[1], size[0]), np.uint8)
+    result = decoder.decode(cv2.resize(gray, size, dst=small, interpolation=cv2.INTER_AREA))
+    if result is None:
+        return None
+    data, (x, y, w, h) = result
+    return data, (int(x / scale), int(y / scale), int(w / scale), int(h / scale))
+
+def detect_faces(frame, gray=None):
+    """Return the (x, y, w, h) boxes of the faces in a BGR frame"""
+    return get_face_detector().detect(frame, gray)
+
+def embed_face(frame):
+    """Return the embedding of the largest face in a BGR frame, or None"""
+    embedder = get_face_embedder()
+    if embedder is None:
+        return None
+    return embedder.embed(frame)
+
+class LocalDetector:
+    """Runs detection in the calling thread"""
+
+    def scan_barcode(self, frame, gray=None):
+        return scan_barcode(to_gray(frame) if gray is None else gray)
+
+    def detect_faces(self, frame, roi=None, gray=None):
+        gray = crop(gray, roi) if gray is not None else None
+        return offset_faces(detect_faces(crop(frame, roi), gray), roi)
+
+    def embed_face(self, frame, roi=None):
+        return embed_face(crop(frame, roi))
+
+    def configure_face_detector(self, name="auto", **options):
+        configure_face_detector(name, **options)
+
+    def configure_barcode_scale(self, scale=1.0):
+        configure_barcode_scale(scale)
+
+    def close(self):
+        pass
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Detection Workers Module
+
+This module provides a pool of detection worker processes so barcode decoding
+and face detection run outside the API server process and its GIL. Each worker
+owns a shared memory slot: the server copies a frame into the slot once and the
+worker reads it through a numpy view on the same memory, so frames are never
+pickled.
+"""
+
+import time
+import queue
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import detection
+from logging_setup import configure_child_logging
+
+logger = logging.getLogger("detection_workers")
+
+# Workers are forked so they inherit the loaded OpenCV and decoder modules and
+# the shared memory mappings. spawn and forkserver would re-run api_server's
+# startup in every worker. A child forked while another thread holds a lock
+# (logging, the database pool, OpenCV) can deadlock on it, so every worker is
+# forked when the pool is created, before the server starts any thread, and
+# none is forked later: a worker that hangs or crashes is retired, not replaced.
+_mp_context = multiprocessing.get_context("fork")
+
+def _worker_main(shm, conn):
+    """Worker loop: answer detection requests for frames in the shared slot"""
+    configure_child_logging()
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if request is None:
+            break
+
+        task, *args = request
+        if task == "configure":
+            name, options = args
+            detection.configure_face_detector(name, **options)
+            conn.send((True, None))
+            continue
+        if task == "barcode_scale":
+            detection.configure_barcode_scale(*args)
+            conn.send((True, None))
+            continue
+
+        shape, dtype = args
+        try:
+            # Zero-copy view on the frame the server wrote into the slot
+            frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+            if task == "barcode":
+                # The server sends the grayscale frame when it already has one
+                result = detection.scan_barcode(frame if frame.ndim == 2 else detection.to_gray(frame))
+            elif task == "embed":
+                result = detection.embed_face(frame)
+            else:
+                result = detection.detect_faces(frame)
+            del frame
+            conn.send((True, result))
+        except Exception as e:
+            conn.send((False, str(e)))
+
+class _Worker:
+    """A worker process together with its shared memory slot and pipe"""
+
+    def __init__(self, index, slot_size):
+        self.index = index
+        self.shm = shared_memory.SharedMemory(create=True, size=slot_size)
+        self.slot = np.ndarray((slot_size,), dtype=np.uint8, buffer=self.shm.buf)
+        self.process = None
+        self.conn = None
+        self.retired = False
+        self.start()
+
+    def start(self):
+        parent_conn, child_conn = _mp_context.Pipe()
+        self.process = _mp_context.Process(
+            target=_worker_main,
+            args=(self.shm, child_conn),
+            name=f"detection-worker-{self.index}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def stop(self, timeout=1):
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1)
+        self.conn.close()
+
+class DetectionWorkerPool:
+    """Pool of detection processes with the same interface as detection.LocalDetector"""
+
+    def __init__(self, num_workers, frame_shape, timeout=2.0):
+        self.frame_shape = tuple(frame_shape)
+        self.slot_size = int(np.prod(self.frame_shape))
+        self.timeout = timeout
+        self.local = detection.LocalDetector()
+        self.workers = [_Worker(i, self.slot_size) for i in range(num_workers)]
+
+        # Free workers; a caller holds a worker for the whole request
+        self.idle = queue.Queue()
+        for worker in self.workers:
+            self.idle.put(worker)
+
+        self.stats = {"requests": 0, "fallbacks": 0, "retired": 0, "busyWaitMs": 0.0}
+        logger.info(f"Started {num_workers} detection worker(s) with {self.slot_size} byte frame slots")
+
+    def _run(self, task, frame):
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_size:
+            # Frames that don't fit a slot are processed in this process
+            self.stats["fallbacks"] += 1
+            return None, False
+
+        if not self.live_workers():
+            self.stats["fallbacks"] += 1
+            return None, False
+        wait_start = time.time()
+        try:
+            worker = self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            # Every remaining worker is busy or was retired meanwhile
+            self.stats["fallbacks"] += 1
+            return None, False
+        self.stats["busyWaitMs"] += (time.time() - wait_start) * 1000
+        try:
+            # The only copy: camera frame into the worker's shared slot
+            np.copyto(self.slot_view(worker, frame.shape), frame)
+            worker.conn.send((task, frame.shape, frame.dtype.str))
+            if not worker.conn.poll(self.timeout):
+                raise TimeoutError(f"detection worker {worker.index} did not answer in {self.timeout}s")
+            ok, result = worker.conn.recv()
+            self.stats["requests"] += 1
+            if not ok:
+                raise RuntimeError(result)
+            return result, True
+        except (TimeoutError, EOFError, BrokenPipeError, OSError) as e:
+            self._retire(worker, e)
+            self.stats["fallbacks"] += 1
+            return None, False
+        except (RuntimeError, ValueError) as e:
+            # The task failed in the worker, or the frame did not fit its slot;
+            # the worker itself is fine and stays in the pool
+            logger.warning(f"Detection worker {worker.index} could not run {task}, running it here: {e}")
+            self.stats["fallbacks"] += 1
+            return None, False
+        finally:
+            if not worker.retired:
+                self.idle.put(worker)
+
+    def live_workers(self):
+        return sum(1 for worker in self.workers if not worker.retired)
+
+    def _retire(self, worker, reason):
+        """Stop a hung or crashed worker for good; its requests go to the others"""
+        logger.error(f"Detection worker {worker.index} failed, retiring it: {reason}")
+        worker.retired = True
+        worker.stop(timeout=0)
+        self.stats["retired"] += 1
+        if not self.live_workers():
+            logger.warning("No detection workers left; detecting in the server process until restarted")
+
+    @staticmethod
+    def slot_view(worker, shape):
+        """View of a worker's slot shaped like a frame"""
+        size = int(np.prod(shape))
+        return worker.slot[:size].reshape(shape)
+
+    def scan_barcode(self, frame, gray=None):
+        # A grayscale frame is a third of the bytes to copy into the slot
+        result, handled = self._run("barcode", frame if gray is None else gray)
+        if not handled:
+            return self.local.scan_barcode(frame, gray)
+        return result
+
+    def detect_faces(self, frame, roi=None, gray=None):
+        # Only the region of interest is copied into the worker's slot; workers
+        # may run a colour detector, so they always get the BGR frame
+        result, handled = self._run("faces", detection.crop(frame, roi))
+        if not handled:
+            return self.local.detect_faces(frame, roi, gray)
+        return detection.offset_faces([tuple(face) for face in result], roi)
+
+    def embed_face(self, frame, roi=None):
+        result, handled = self._run("embed", detection.crop(frame, roi))
+        if not handled:
+            return self.local.embed_face(frame, roi)
+        return result
+
+    def configure_face_detector(self, name="auto", **options):
+        """Change the face detector here and in every worker, between requests"""
+        self.local.configure_face_detector(name, **options)
+        self._configure_workers(("configure", name, options))
+
+    def configure_barcode_scale(self, scale=1.0):
+        """Change the barcode decoding scale here and in every worker, between requests"""
+        self.local.configure_barcode_scale(scale)
+        self._configure_workers(("barcode_scale", scale))
+
+    def _configure_workers(self, request):
+        """Send a configuration request to every live worker"""
+        # Take every live worker as it becomes free, so no frame is interrupted
+        workers = []
+        while len(workers) < self.live_workers():
+            try:
+                workers.append(self.idle.get(timeout=self.timeout))
+            except queue.Empty:
+                continue  # A busy worker may have been retired meanwhile
+        try:
+            for worker in workers:
+                try:
+                    worker.conn.send(request)
+                    if not worker.conn.poll(self.timeout):
+                        raise TimeoutError(f"no answer in {self.timeout}s")
+                    worker.conn.recv()
+                except (TimeoutError, EOFError, BrokenPipeError, OSError) as e:
+                    self._retire(worker, f"no answer to reconfiguration: {e}")
+        finally:
+            for worker in workers:
+                if not worker.retired:
+                    self.idle.put(worker)
+
+    def close(self):
+        """Stop the workers and release their shared memory"""
+        for worker in self.workers:
+            if not worker.retired:
+                worker.stop()
+            worker.slot = None
+            worker.shm.close()
+            worker.shm.unlink()
+        self.workers = []
+
+def create_detector(num_workers, frame_shape):
+    """Return a worker pool when workers are requested, otherwise in-process detection"""
+    if num_workers and num_workers > 0:
+        try:
+            return DetectionWorkerPool(num_workers, frame_shape)
+        except Exception as e:
+            logger.error(f"Failed to start detection workers, detecting in-process: {e}")
+    return detection.LocalDetector()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Evidence Ring Module
+
+This module provides the EvidenceRing class, which keeps a record of each gate
+decision (QR payload, face boxes, outcome, timings) with a small JPEG of the
+frame, so denied and proxy entries can be reviewed later.
+
+Records live in one file of fixed-size slots that is allocated once, so the
+evidence never takes more than slots x slot_size bytes of disk. The newest
+record overwrites the oldest. Each record is a single write at a page-aligned
+offset into the existing file: no files are created, grown or deleted, which
+keeps filesystem metadata updates, and the wear they cause on an SD card, to
+a minimum. The gate threads only queue a downscaled copy of the frame; JPEG
+encoding and disk writes happen in a background writer thread, and when the
+queue is full records are dropped rather than making the gate wait.
+"""
+
+import os
+import json
+import time
+import queue
+import struct
+import zlib
+import logging
+import threading
+from collections import deque
+import cv2
+from metrics import Counter, Histogram
+
+logger = logging.getLogger("evidence_ring")
+
+EVIDENCE_RECORDS = Counter("evidence_records_total", "Gate decision records by what happened to them", ["result"])
+EVIDENCE_WRITE_SECONDS = Histogram("evidence_write_seconds", "Time to encode and write one evidence record")
+
+RING_FILE = "evidence.ring"
+MAGIC = b"EVR1"
+# magic, event id, timestamp, metadata length, image length, CRC-32 of metadata and image
+HEADER = struct.Struct("<4sQdIII")
+PAGE_SIZE = 4096
+MIN_JPEG_QUALITY = 30
+
+class EvidenceRing:
+    """Fixed-size on-disk ring of gate decision records with a background writer"""
+
+    def __init__(self, directory, slots=1000, slot_size=64 * 1024, thumbnail_width=320, jpeg_quality=70,
+                 queue_size=32):
+        if slot_size % PAGE_SIZE:
+            raise ValueError(f"Evidence slot size must be a multiple of {PAGE_SIZE} bytes")
+        self.directory = directory
+        self.path = os.path.join(directory, RING_FILE)
+        self.slots = slots
+        self.slot_size = slot_size
+        self.thumbnail_width = thumbnail_width
+        self.jpeg_quality = jpeg_quality
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.recent = deque(maxlen=slots)  # Metadata of the stored records, oldest first
+        self.stats = {"written": 0, "dropped": 0, "failed": 0}
+
+        os.makedirs(directory, exist_ok=True)
+        self.fd = self._open()
+        self.next_id = self._scan() + 1
+        self.writer = threading.Thread(target=self._write_loop, name="evidence-writer", daemon=True)
+        self.writer.start()
+        logger.info(f"Evidence ring {self.path}: {slots} slots of {slot_size // 1024} KB, "
+                    f"{len(self.recent)} record(s) kept")
+
+    def _open(self):
+        """Open the ring file, allocating it at full size the first time"""
+        size = self.slots * self.slot_size
+        if os.path.exists(self.path) and os.path.getsize(self.path) != size:
+            logger.warning(f"{self.path} has a different slot layout; starting a new ring")
+            os.replace(self.path, self.path + ".old")
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o640)
+        if os.fstat(fd).st_size != size:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(fd, 0, size)
+            else:
+                os.ftruncate(fd, size)
+        return fd
+
+    def _read_slot(self, slot, with_image=False):
+        """(metadata, image bytes or None) of the record in a slot, or None if empty or torn"""
+        offset = slot * self.slot_size
+        header = os.pread(self.fd, HEADER.size, offset)
+        if len(header) < HEADER.size:
+            return None
+        magic, event_id, timestamp, meta_length, image_length, crc = HEADER.unpack(header)
+        if magic != MAGIC or HEADER.size + meta_length + image_length > self.slot_size:
+            return None
+        # Both parts are read to check the CRC, which catches a record cut short by a power loss
+        body = os.pread(self.fd, meta_length + image_length, offset + HEADER.size)
+        if zlib.crc32(body) != crc:
+            return None
+        metadata = json.loads(body[:meta_length])
+        return metadata, (body[meta_length:] if with_image and image_length else None)
+
+    def _read_metadata(self, slot):
+        """Metadata of the record in a slot, read without its image, or None if empty
+
+        The CRC covers the image too, so it is not checked here; get() and
+        image() still skip a torn record.
+        """
+        offset = slot * self.slot_size
+        # Metadata almost always fits in the first page along with the header
+        head = os.pread(self.fd, PAGE_SIZE, offset)
+        if len(head) < HEADER.size:
+            return None
+        magic, event_id, timestamp, meta_length, image_length, crc = HEADER.unpack_from(head)
+        if magic != MAGIC or HEADER.size + meta_length + image_length > self.slot_size:
+            return None
+        meta = head[HEADER.size:HEADER.size + meta_length]
+        if len(meta) < meta_length:
+            meta += os.pread(self.fd, meta_length - len(meta), offset + HEADER.size + len(meta))
+        try:
+            metadata = json.loads(meta)
+        except ValueError:
+            return None
+        return metadata if metadata.get("id") == event_id else None
+
+    def _scan(self):
+        """Load the metadata of the stored records; returns the highest event id
+
+        Only each slot's header and metadata are read, not the thumbnails.
+        """
+        records = []
+        for slot in range(self.slots):
+            metadata = self._read_metadata(slot)
+            if metadata:
+                records.append(metadata)
+        records.sort(key=lambda metadata: metadata["id"])
+        self.recent.extend(records)
+        return records[-1]["id"] if records else 0
+
+    def record(self, frame, **details):
+        """Queue a decision record with a thumbnail of frame; returns its event id, or None if dropped
+
+        Only the downscale happens in the caller's thread.
+        """
+        thumbnail = None
+        if frame is not None:
+            height, width = frame.shape[:2]
+            scale = min(1.0, self.thumbnail_width / width)
+            thumbnail = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                                   interpolation=cv2.INTER_AREA)
+        with self.lock:
+            event_id = self.next_id
+            self.next_id += 1
+        metadata = {"id": event_id, "timestamp": time.time(), **details}
+        try:
+            self.queue.put_nowait((metadata, thumbnail))
+        except queue.Full:
+            self.stats["dropped"] += 1
+            EVIDENCE_RECORDS.labels("dropped").inc()
+            logger.warning(f"Evidence queue full, dropped record {event_id}")
+            return None
+        return event_id
+
+    def _encode(self, metadata, thumbnail):
+        """Metadata and JPEG bytes that fit in one slot, lowering quality and size as needed"""
+        metadata["image"] = thumbnail is not None
+        meta = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+        room = self.slot_size - HEADER.size - len(meta)
+        if room < 0:
+            raise ValueError(f"Metadata of record {metadata['id']} does not fit in a slot")
+        quality = self.jpeg_quality
+        while thumbnail is not None:
+            ok, jpeg = cv2.imencode(".jpg", thumbnail, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if ok and len(jpeg) <= room:
+                return meta, jpeg.tobytes()
+            if quality > MIN_JPEG_QUALITY:
+                quality = max(MIN_JPEG_QUALITY, quality - 20)
+            elif thumbnail.shape[1] > 80:
+                thumbnail = cv2.resize(thumbnail, (thumbnail.shape[1] // 2, thumbnail.shape[0] // 2),
+                                       interpolation=cv2.INTER_AREA)
+            else:
+                break
+        if thumbnail is not None:
+            logger.warning(f"Thumbnail of record {metadata['id']} does not fit in a slot; keeping the details only")
+            metadata["image"] = False
+            meta = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+        return meta, b""
+
+    def _write(self, metadata, thumbnail):
+        meta, image = self._encode(metadata, thumbnail)
+        body = meta + image
+        header = HEADER.pack(MAGIC, metadata["id"], metadata["timestamp"], len(meta), len(image), zlib.crc32(body))
+        record = header + body
+        # Pad to whole pages so the card never has to read back a partly written page
+        record += b"\0" * (-len(record) % PAGE_SIZE)
+        os.pwrite(self.fd, record, self._slot_of(metadata["id"]) * self.slot_size)
+
+    def _write_loop(self):
+        while True:
+            metadata, thumbnail = self.queue.get()
+            if metadata is None:
+                break
+            try:
+                with EVIDENCE_WRITE_SECONDS.time():
+                    self._write(metadata, thumbnail)
+                self.recent.append(metadata)
+                self.stats["written"] += 1
+                EVIDENCE_RECORDS.labels("written").inc()
+            except (OSError, ValueError, cv2.error) as e:
+                self.stats["failed"] += 1
+                EVIDENCE_RECORDS.labels("failed").inc()
+                logger.error(f"Could not write evidence record {metadata['id']}: {e}")
+
+    def _slot_of(self, event_id):
+        return (event_id - 1) % self.slots
+
+    def get(self, event_id):
+        """Metadata of a stored record, or None if it was overwritten or never written"""
+        record = self._read_slot(self._slot_of(event_id))
+        if record is None or record[0]["id"] != event_id:
+            return None
+        return record[0]
+
+    def image(self, event_id):
+        """JPEG thumbnail of a stored record, or None"""
+        record = self._read_slot(self._slot_of(event_id), with_image=True)
+        if record is None or record[0]["id"] != event_id:
+            return None
+        return record[1]
+
+    def list(self, lane=None, outcome=None, before=None, limit=50):
+        """Newest records first, optionally filtered by lane and outcome, with ids below before"""
+        results = []
+        records = list(self.recent)
+        # After dropped records, the oldest entries may share a slot with a newer record
+        oldest = records[-1]["id"] - self.slots if records else 0
+        for metadata in reversed(records):
+            if metadata["id"] <= oldest:
+                break
+            if before is not None and metadata["id"] >= before:
+                continue
+            if lane is not None and metadata.get("lane") != lane:
+                continue
+            if outcome is not None and metadata.get("outcome") != outcome:
+                continue
+            results.append(metadata)
+            if len(results) >= limit:
+                break
+        return results
+
+    def summary(self):
+        """Ring size and writer counters for /api/events/summary"""
+        return {
+            "slots": self.slots,
+            "slotBytes": self.slot_size,
+            "diskBytes": self.slots * self.slot_size,
+            "stored": len(self.recent),
+            "queued": self.queue.qsize(),
+            **self.stats
+        }
+
+    def close(self):
+        """Write the queued records and close the ring file"""
+        try:
+            self.queue.put((None, None), timeout=5)
+        except queue.Full:
+            logger.warning("Evidence writer did not drain its queue before shutdown")
+        self.writer.join(timeout=5)
+        os.close(self.fd)
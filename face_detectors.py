@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Face Detectors Module
+
+This module provides the face detector backends the gate can use: OpenCV Haar
+and LBP cascades, the YuNet detector (cv2.FaceDetectorYN) and the ResNet-10 SSD
+DNN detector. All backends take a BGR frame and return (x, y, w, h) boxes in
+frame coordinates, and can work on a downscaled copy of the frame to save time.
+"""
+
+import os
+import logging
+import cv2
+import numpy as np
+
+logger = logging.getLogger("face_detectors")
+
+# Directory holding the ONNX/Caffe model files for the DNN backends
+MODEL_DIR = os.getenv('FACE_MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+
+# Directories searched for cascade files
+CASCADE_DIRS = [
+    '/usr/share/opencv4/haarcascades',  # Common location
+    '/usr/share/opencv4/lbpcascades',
+    '/usr/local/share/opencv4/haarcascades',  # Alternative location
+    '/usr/local/share/opencv4/lbpcascades',
+    '/usr/local/lib/python3.9/dist-packages/cv2/data',  # Pip installation location
+    getattr(getattr(cv2, 'data', None), 'haarcascades', '')
+]
+
+def find_cascade(filename):
+    """Return the path of a cascade file in the known OpenCV locations, or None"""
+    for directory in CASCADE_DIRS:
+        if not directory:
+            continue
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            return path
+    return None
+
+def find_model(filename):
+    """Return the path of a model file in MODEL_DIR, or None"""
+    path = os.path.join(MODEL_DIR, filename)
+    return path if os.path.exists(path) else None
+
+class FaceDetector:
+    """Base class: handles downscaling, subclasses implement _detect()"""
+
+    name = None
+    needs_color = False  # The detector looks at the BGR frame, not the grayscale one
+
+    def __init__(self, detection_scale=1.0):
+        self.detection_scale = detection_scale
+        self.buffers = {}  # Downscaled images, reused while the input size stays the same
+
+    def _resize(self, key, image, size):
+        shape = (size[1], size[0]) + image.shape[2:]
+        buffer = self.buffers.get(key)
+        if buffer is None or buffer.shape != shape or buffer.dtype != image.dtype:
+            buffer = self.buffers[key] = np.empty(shape, image.dtype)
+        return cv2.resize(image, size, dst=buffer, interpolation=cv2.INTER_AREA)
+
+    def detect(self, frame, gray=None):
+        """Return the (x, y, w, h) face boxes in a BGR frame
+
+        gray may be passed when the caller already converted the frame.
+        """
+        if self.needs_color:
+            gray = None
+        scale = self.detection_scale
+        if scale != 1.0:
+            size = (max(1, int(frame.shape[1] * scale)), max(1, int(frame.shape[0] * scale)))
+            if gray is None:
+                frame = self._resize("frame", frame, size)
+            else:
+                # Grayscale detectors never look at the colour frame once gray is given
+                gray = self._resize("gray", gray, size)
+
+        faces = self._detect(frame, gray)
+        if scale != 1.0:
+            faces = [(int(x / scale), int(y / scale), int(w / scale), int(h / scale)) for (x, y, w, h) in faces]
+        return faces
+
+    def _detect(self, frame, gray):
+        raise NotImplementedError
+
+class CascadeFaceDetector(FaceDetector):
+    """OpenCV cascade classifier (Haar or LBP)"""
+
+    def __init__(self, cascade_file, scale_factor=1.1, min_neighbors=5, min_size=30, detection_scale=1.0):
+        super().__init__(detection_scale)
+        path = find_cascade(cascade_file)
+        self.classifier = cv2.CascadeClassifier(path) if path else None
+        if self.classifier is None or self.classifier.empty():
+            raise FileNotFoundError(f"Could not load cascade {cascade_file} from any known location")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        # Minimum face size is given at full resolution
+        self.min_size = max(12, int(min_size * detection_scale))
+
+    def _detect(self, frame, gray):
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = self.classifier.detectMultiScale(gray, scaleFactor=self.scale_factor,
+                                                 minNeighbors=self.min_neighbors,
+                                                 minSize=(self.min_size, self.min_size))
+        return [tuple(int(v) for v in face) for face in faces]
+
+class HaarFaceDetector(CascadeFaceDetector):
+    """The original Haar frontal face cascade, optionally with the profile cascade"""
+
+    name = "haar"
+
+    def __init__(self, profile=False, **options):
+        super().__init__('haarcascade_frontalface_default.xml', **options)
+        self.profile = None
+        if profile:
+            self.profile = CascadeFaceDetector('haarcascade_profileface.xml', **options)
+
+    def _detect(self, frame, gray):
+        if gray is None:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        faces = super()._detect(frame, gray)
+        if not faces and self.profile is not None:
+            faces = self.profile._detect(frame, gray)
+            if not faces:
+                # The profile cascade only finds faces turned one way; mirror for the other
+                flipped = self.profile._detect(frame, cv2.flip(gray, 1))
+                width = gray.shape[1]
+                faces = [(width - x - w, y, w, h) for (x, y, w, h) in flipped]
+        return faces
+
+class LbpFaceDetector(CascadeFaceDetector):
+    """LBP cascade: several times faster than Haar at slightly lower accuracy"""
+
+    name = "lbp"
+
+    def __init__(self, **options):
+        options.setdefault('min_neighbors', 3)
+        super().__init__('lbpcascade_frontalface_improved.xml', **options)
+
+class YuNetFaceDetector(FaceDetector):
+    """OpenCV YuNet CNN detector (cv2.FaceDetectorYN), handles profile and tilted faces"""
+
+    name = "yunet"
+    needs_color = True
+    model_file = 'face_detection_yunet_2023mar.onnx'
+
+    def __init__(self, score_threshold=0.8, nms_threshold=0.3, top_k=20, detection_scale=1.0):
+        super().__init__(detection_scale)
+        path = find_model(self.model_file)
+        if path is None:
+            raise FileNotFoundError(f"YuNet model {self.model_file} not found in {MODEL_DIR}")
+        self.detector = cv2.FaceDetectorYN.create(path, "", (320, 320), score_threshold, nms_threshold, top_k)
+        self.input_size = (320, 320)
+        self.last_detections = None
+
+    def _detect(self, frame, gray):
+        size = (frame.shape[1], frame.shape[0])
+        if size != self.input_size:
+            self.detector.setInputSize(size)
+            self.input_size = size
+        _, detections = self.detector.detect(frame)
+        # Full rows (with landmarks) are kept for face alignment
+        self.last_detections = detections
+        if detections is None:
+            return []
+        return [tuple(int(v) for v in row[:4]) for row in detections]
+
+class DnnFaceDetector(FaceDetector):
+    """ResNet-10 SSD face detector from the OpenCV samples (Caffe model)"""
+
+    name = "dnn"
+    needs_color = True
+    prototxt_file = 'deploy.prototxt'
+    model_file = 'res10_300x300_ssd_iter_140000_fp16.caffemodel'
+
+    def __init__(self, confidence=0.5, detection_scale=1.0):
+        super().__init__(detection_scale)
+        prototxt = find_model(self.prototxt_file)
+        model = find_model(self.model_file)
+        if prototxt is None or model is None:
+            raise FileNotFoundError(f"DNN face model files not found in {MODEL_DIR}")
+        self.net = cv2.dnn.readNetFromCaffe(prototxt, model)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.confidence = confidence
+
+    def _detect(self, frame, gray):
+        height, width = frame.shape[:2]
+        blob = cv2.dnn.blobFromImage(frame, 1.0, (300, 300), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        detections = self.net.forward()
+        faces = []
+        for i in range(detections.shape[2]):
+            if detections[0, 0, i, 2] < self.confidence:
+                continue
+            x1, y1, x2, y2 = detections[0, 0, i, 3:7] * (width, height, width, height)
+            x1, y1 = max(0, int(x1)), max(0, int(y1))
+            faces.append((x1, y1, int(x2) - x1, int(y2) - y1))
+        return faces
+
+FACE_DETECTORS = {
+    HaarFaceDetector.name: HaarFaceDetector,
+    LbpFaceDetector.name: LbpFaceDetector,
+    YuNetFaceDetector.name: YuNetFaceDetector,
+    DnnFaceDetector.name: DnnFaceDetector
+}
+
+# Order tried by "auto": fastest first, Haar always works
+AUTO_ORDER = [
+    (YuNetFaceDetector.name, {'detection_scale': 0.5}),
+    (LbpFaceDetector.name, {'detection_scale': 0.5}),
+    (HaarFaceDetector.name, {'detection_scale': 0.5})
+]
+
+def create_face_detector(name="auto", **options):
+    """Create a face detector backend by name
+
+    "auto" picks the first backend whose model files are installed, from
+    AUTO_ORDER, using its default options overridden by the given ones.
+    """
+    if name == "auto":
+        for candidate, defaults in AUTO_ORDER:
+            try:
+                return FACE_DETECTORS[candidate](**{**defaults, **options})
+            except FileNotFoundError as e:
+                logger.info(f"Face detector {candidate} unavailable: {e}")
+        raise FileNotFoundError("No face detector backend could be loaded")
+
+    if name not in FACE_DETECTORS:
+        raise ValueError(f"Unknown face detector '{name}', expected one of: auto, {', '.join(FACE_DETECTORS)}")
+    return FACE_DETECTORS[name](**options)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Face Index Module
+
+This module provides face identity verification for the gate. FaceEmbedder
+turns a face into a 128-dimensional OpenCV SFace embedding, and
+FaceEmbeddingIndex stores one L2-normalised embedding per student roll number
+as a float32 matrix on disk. The matrix is memory-mapped, so checking a scanned
+student against the live face is a dictionary lookup and one dot product,
+whatever the size of the roster.
+"""
+
+import os
+import json
+import logging
+import threading
+import numpy as np
+import cv2
+from face_detectors import find_model, YuNetFaceDetector
+
+logger = logging.getLogger("face_index")
+
+# Cosine similarity above which two SFace embeddings are the same person
+# (the threshold recommended for the SFace model)
+DEFAULT_MATCH_THRESHOLD = 0.363
+
+class FaceEmbedder:
+    """Aligns the largest face in a frame with YuNet landmarks and embeds it with SFace"""
+
+    model_file = 'face_recognition_sface_2021dec.onnx'
+
+    def __init__(self):
+        path = find_model(self.model_file)
+        if path is None:
+            raise FileNotFoundError(f"SFace model {self.model_file} not found")
+        self.recognizer = cv2.FaceRecognizerSF.create(path, "")
+        # Alignment needs the landmarks only YuNet provides
+        self.detector = YuNetFaceDetector(score_threshold=0.7)
+
+    def embed(self, frame):
+        """Return the normalised embedding of the largest face in the frame, or None"""
+        self.detector.detect(frame)
+        detections = self.detector.last_detections
+        if detections is None or len(detections) == 0:
+            return None
+
+        face = max(detections, key=lambda row: row[2] * row[3])
+        aligned = self.recognizer.alignCrop(frame, face)
+        embedding = self.recognizer.feature(aligned).astype(np.float32).ravel()
+        return embedding / (np.linalg.norm(embedding) + 1e-12)
+
+class FaceEmbeddingIndex:
+    """Memory-mapped float32 matrix of student face embeddings, one row per roll number"""
+
+    def __init__(self, directory, threshold=DEFAULT_MATCH_THRESHOLD):
+        self.directory = directory
+        self.threshold = threshold
+        self.matrix_path = os.path.join(directory, "embeddings.npy")
+        self.rollnos_path = os.path.join(directory, "rollnos.json")
+        self.lock = threading.Lock()
+        self.matrix = None
+        self.rows = {}
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.matrix_path) or not os.path.exists(self.rollnos_path):
+            self.matrix = None
+            self.rows = {}
+            return
+        with open(self.rollnos_path) as f:
+            rollnos = json.load(f)
+        self.matrix = np.load(self.matrix_path, mmap_mode='r')
+        self.rows = {rollno: i for i, rollno in enumerate(rollnos)}
+        logger.info(f"Loaded {len(self.rows)} face embeddings from {self.matrix_path}")
+
+    def _save(self, rollnos, matrix):
+        """Write a new matrix next to the old one and swap it in atomically"""
+        tmp_matrix = self.matrix_path + ".tmp.npy"
+        tmp_rollnos = self.rollnos_path + ".tmp"
+        np.save(tmp_matrix, matrix)
+        with open(tmp_rollnos, "w") as f:
+            json.dump(rollnos, f)
+        os.replace(tmp_matrix, self.matrix_path)
+        os.replace(tmp_rollnos, self.rollnos_path)
+        self._load()
+
+    def _entries(self):
+        """Current (rollnos, matrix) as regular in-memory copies"""
+        rollnos = [None] * len(self.rows)
+        for rollno, i in self.rows.items():
+            rollnos[i] = rollno
+        matrix = np.array(self.matrix, dtype=np.float32) if self.matrix is not None else None
+        return rollnos, matrix
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, rollno):
+        return rollno in self.rows
+
+    def enroll(self, rollno, embedding):
+        """Store (or replace) a student's embedding"""
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        embedding = embedding / (np.linalg.norm(embedding) + 1e-12)
+        with self.lock:
+            rollnos, matrix = self._entries()
+            if matrix is not None and matrix.shape[1] != embedding.shape[0]:
+                raise ValueError(f"Embedding has {embedding.shape[0]} values, index uses {matrix.shape[1]}")
+            if rollno in self.rows:
+                matrix[self.rows[rollno]] = embedding
+            else:
+                rollnos.append(rollno)
+                row = embedding[np.newaxis, :]
+                matrix = row if matrix is None else np.vstack([matrix, row])
+            self._save(rollnos, matrix)
+
+    def enroll_many(self, embeddings):
+        """Replace the index with a {rollno: embedding} mapping in one write"""
+        with self.lock:
+            rollnos = list(embeddings)
+            if not rollnos:
+                self._clear()
+                return
+            matrix = np.stack([np.asarray(embeddings[r], dtype=np.float32).ravel() for r in rollnos])
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+            self._save(rollnos, matrix)
+
+    def remove(self, rollno):
+        """Forget a student's embedding; returns True if there was one"""
+        return self.retain(set(self.rows) - {rollno}) > 0
+
+    def rename(self, old_rollno, new_rollno):
+        """Move an embedding to a new roll number"""
+        with self.lock:
+            if old_rollno not in self.rows or old_rollno == new_rollno:
+                return False
+            rollnos, matrix = self._entries()
+            if new_rollno in self.rows:
+                # Keep a single row per roll number
+                keep = [i for i, r in enumerate(rollnos) if r != new_rollno]
+                rollnos = [rollnos[i] for i in keep]
+                matrix = matrix[keep]
+            rollnos[rollnos.index(old_rollno)] = new_rollno
+            self._save(rollnos, matrix)
+            return True
+
+    def retain(self, rollnos_to_keep):
+        """Drop embeddings of students no longer in the roster; returns how many were dropped"""
+        with self.lock:
+            rollnos, matrix = self._entries()
+            keep = [i for i, r in enumerate(rollnos) if r in rollnos_to_keep]
+            dropped = len(rollnos) - len(keep)
+            if dropped == 0:
+                return 0
+            if keep:
+                self._save([rollnos[i] for i in keep], matrix[keep])
+            else:
+                self._clear()
+            return dropped
+
+    def _clear(self):
+        for path in (self.matrix_path, self.rollnos_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.matrix = None
+        self.rows = {}
+
+    def similarity(self, rollno, embedding):
+        """Cosine similarity between a live embedding and a student's, or None if not enrolled"""
+        # Read both together so a concurrent enrolment can't mix old and new state
+        matrix, rows = self.matrix, self.rows
+        row = rows.get(rollno)
+        if row is None or matrix is None:
+            return None
+        return float(np.dot(matrix[row], embedding))
+
+    def match(self, rollno, embedding):
+        """1:1 check of a live embedding against the scanned student; returns (matched, score)"""
+        score = self.similarity(rollno, embedding)
+        if score is None:
+            return False, None
+        return score >= self.threshold, score
+
+    def summary(self):
+        return {
+            "enrolled": len(self.rows),
+            "dimensions": int(self.matrix.shape[1]) if self.matrix is not None else None,
+            "bytes": os.path.getsize(self.matrix_path) if os.path.exists(self.matrix_path) else 0,
+            "threshold": self.threshold
+        }
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Frame Buffers Module
+
+This module provides the preallocated buffers a gate lane captures into, so
+the per-frame path does not allocate a new 1280x720 frame and grayscale image
+on every iteration. At 10-15 frames per second those allocations churned
+megabytes a second through the allocator on a Pi with little memory to spare.
+
+Picamera2's capture_array() always returns a new array. Instead the lane takes
+the camera's request, copies the mapped buffer into a free slot of a small ring
+and hands the camera buffer straight back.
+
+The latest frame is also read by the snapshot, feed and enrolment endpoints
+from other threads. They read it inside hold_latest(), which leases the slot:
+the lane never writes into a leased slot or the latest one, so a reader never
+sees a frame being overwritten, however slowly it encodes. When every slot is
+taken the ring grows by one rather than making the lane wait.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+import numpy as np
+import cv2
+
+logger = logging.getLogger("frame_buffers")
+
+FRAME_BUFFERS = 3  # Slots in the ring: the latest, the one being filled and one spare for a reader
+
+try:
+    from picamera2 import MappedArray
+except ImportError:
+    MappedArray = None
+
+class FrameBuffers:
+    """Ring of preallocated frames plus one grayscale buffer; written by a single lane thread"""
+
+    def __init__(self, count=FRAME_BUFFERS):
+        self.count = count
+        self.frames = []
+        self.leases = []  # Readers holding each slot
+        self.gray = None
+        self.index = 0  # Slot last written
+        self.latest = None  # (slot, sequence, captured_at) of the published frame
+        self.sequence = 0
+        self.lock = threading.Lock()
+
+    def _allocate(self, shape, dtype):
+        # Readers keep the old arrays alive until they release them
+        self.frames = [np.empty(shape, dtype) for _ in range(self.count)]
+        self.leases = [0] * self.count
+        self.gray = np.empty(shape[:2], np.uint8)
+        self.latest = None
+        logger.info(f"Allocated {self.count} frame buffers of {shape[1]}x{shape[0]}")
+
+    def _free_slot(self):
+        """A slot that is neither the latest nor held by a reader; called with the lock held"""
+        latest = self.latest[0] if self.latest else None
+        for step in range(1, len(self.frames) + 1):
+            slot = (self.index + step) % len(self.frames)
+            if slot != latest and not self.leases[slot]:
+                return slot
+        self.frames.append(np.empty_like(self.frames[0]))
+        self.leases.append(0)
+        logger.warning(f"All frame buffers held by readers, grew the ring to {len(self.frames)}")
+        return len(self.frames) - 1
+
+    def store(self, image):
+        """Copy an image into a free slot and return that slot
+
+        The slot belongs to the lane thread until the next store(); readers
+        only see it once it is published.
+        """
+        with self.lock:
+            if not self.frames or self.frames[0].shape != image.shape or self.frames[0].dtype != image.dtype:
+                self._allocate(image.shape, image.dtype)
+            self.index = self._free_slot()
+            frame = self.frames[self.index]
+        np.copyto(frame, image)
+        return frame
+
+    def publish(self, captured_at=None):
+        """Make the slot last stored the latest frame; returns its sequence number
+
+        captured_at defaults to the capture time of the frame it replaces.
+        """
+        with self.lock:
+            if captured_at is None and self.latest is not None:
+                captured_at = self.latest[2]
+            self.sequence += 1
+            self.latest = (self.index, self.sequence, captured_at)
+            return self.sequence
+
+    def latest_sequence(self):
+        latest = self.latest
+        return latest[1] if latest else 0
+
+    @contextmanager
+    def hold_latest(self):
+        """Yield (frame, sequence, captured_at) of the latest frame, which stays untouched until the block ends
+
+        frame is None before anything was published.
+        """
+        with self.lock:
+            frames, latest = self.frames, self.latest
+            if latest is not None:
+                self.leases[latest[0]] += 1
+        if latest is None:
+            yield None, 0, None
+            return
+        slot, sequence, captured_at = latest
+        try:
+            yield frames[slot], sequence, captured_at
+        finally:
+            with self.lock:
+                if self.frames is frames:
+                    self.leases[slot] -= 1
+
+    def capture(self, picam2):
+        """Capture the camera's next frame into the ring without allocating a new array"""
+        if MappedArray is None or not hasattr(picam2, "capture_request"):
+            # Cameras without requests (the benchmark stand-in) still fill the ring
+            return self.store(picam2.capture_array())
+        request = picam2.capture_request()
+        try:
+            with MappedArray(request, "main") as mapped:
+                return self.store(mapped.array)
+        finally:
+            request.release()
+
+    def to_gray(self, frame):
+        """Grayscale of a frame from the ring, written into the shared gray buffer"""
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.gray)
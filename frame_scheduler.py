@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Frame Scheduler Module
+
+This module provides the FrameScheduler used by the gate lane loops. It paces
+frames against a target rate instead of a fixed sleep: the time spent
+processing a frame is subtracted from the wait, the rate switches between an
+idle and a burst target depending on activity, and the achieved rate and the
+number of frames that missed their slot are tracked for the lane metrics and
+for the API server's admission control. The load governor can cap the rate
+below the lane's settings while the Pi runs hot.
+"""
+
+import time
+import threading
+
+class FrameScheduler:
+    """Paces a capture loop between an idle and a burst frame rate"""
+
+    def __init__(self, idle_fps=2.0, burst_fps=10.0, burst_hold=3.0, clock=time.monotonic, sleep=time.sleep):
+        self.idle_fps = idle_fps
+        self.burst_fps = burst_fps
+        self.burst_hold = burst_hold  # Seconds to stay at the burst rate after activity
+        self.max_fps = None  # Cap on both rates set by the load governor (None = no cap)
+        self.clock = clock
+        self.sleep = sleep
+
+        self.burst_until = 0.0
+        self.next_deadline = None
+        self.last_frame_time = None
+        self.frame_interval = None  # Smoothed time between frames
+        self.frame_started = None
+        self.busy_seconds = None  # Smoothed time spent on a frame, excluding the wait
+
+        self.frames = 0
+        self.dropped_frames = 0
+        self.late_ratio = 0.0  # Smoothed share of recent frames that overran their slot
+        self.lock = threading.Lock()
+
+    def set_rates(self, idle_fps=None, burst_fps=None, burst_hold=None):
+        """Change the target rates; takes effect from the next frame"""
+        with self.lock:
+            if idle_fps is not None:
+                self.idle_fps = idle_fps
+            if burst_fps is not None:
+                self.burst_fps = burst_fps
+            if burst_hold is not None:
+                self.burst_hold = burst_hold
+
+    def mark_activity(self):
+        """Switch to (or stay at) the burst rate"""
+        self.burst_until = self.clock() + self.burst_hold
+
+    def target_fps(self):
+        fps = self.burst_fps if self.clock() < self.burst_until else self.idle_fps
+        if self.max_fps:
+            return min(fps, self.max_fps)
+        return fps
+
+    def frame_done(self, active=False):
+        """Call after each frame; sleeps until the next frame is due"""
+        now = self.clock()
+        if active:
+            self.mark_activity()
+
+        with self.lock:
+            self.frames += 1
+            if self.last_frame_time is not None:
+                interval = now - self.last_frame_time
+                if self.frame_interval is None:
+                    self.frame_interval = interval
+                else:
+                    self.frame_interval = 0.9 * self.frame_interval + 0.1 * interval
+            self.last_frame_time = now
+            if self.frame_started is not None:
+                busy = now - self.frame_started
+                self.busy_seconds = busy if self.busy_seconds is None else 0.9 * self.busy_seconds + 0.1 * busy
+
+            period = 1.0 / self.target_fps()
+            if self.next_deadline is None:
+                self.next_deadline = now
+            self.next_deadline += period
+
+            late = now > self.next_deadline
+            self.late_ratio = 0.9 * self.late_ratio + (0.1 if late else 0.0)
+            if late:
+                # Processing overran: count the slots we missed and restart the
+                # schedule from now instead of bursting to catch up
+                self.dropped_frames += int((now - self.next_deadline) / period) + 1
+                self.next_deadline = now
+                self.frame_started = now
+                return
+
+            delay = self.next_deadline - now
+
+        self.sleep(delay)
+        self.frame_started = self.clock()
+
+    def achieved_fps(self):
+        if not self.frame_interval:
+            return 0.0
+        return 1.0 / self.frame_interval
+
+    def snapshot(self):
+        """Scheduler figures for the lane metrics"""
+        return {
+            "fps": round(self.achieved_fps(), 2),
+            "targetFps": self.target_fps(),
+            "droppedFrames": self.dropped_frames,
+            "lateRatio": round(self.late_ratio, 3),
+            "frameMs": round(self.busy_seconds * 1000, 1) if self.busy_seconds is not None else None
+        }
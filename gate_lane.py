@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+Gate Lane Module
+
+This module provides the GateLane class, which owns the camera, GPIO lines and
+pipeline state of a single gate lane. One API server process can run several
+lanes side by side, each with its own processing thread, while sharing the
+database pool and Supabase sync with the rest of the server.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import cv2
+import gpiod
+import RPi.GPIO as GPIO
+import detection
+from motion_gate import MotionGate, face_roi_above
+from frame_buffers import FrameBuffers
+from frame_scheduler import FrameScheduler
+from metrics import Histogram
+from logging_setup import log_event
+
+# Hot-path stage timings, labelled by lane
+CAPTURE_SECONDS = Histogram("gate_capture_seconds", "Time to capture a camera frame", ["lane"])
+DECODE_SECONDS = Histogram("gate_barcode_decode_seconds", "Time to decode barcodes in a frame", ["lane"])
+FACE_DETECT_SECONDS = Histogram("gate_face_detect_seconds", "Time to detect faces in a frame", ["lane"])
+FACE_MATCH_SECONDS = Histogram("gate_face_match_seconds", "Time to embed the live face and match it", ["lane"])
+DOOR_CYCLE_SECONDS = Histogram("gate_door_cycle_seconds", "Time from starting to open the door to it being closed", ["lane"])
+SCAN_TO_OPEN_SECONDS = Histogram("gate_scan_to_open_seconds",
+                                 "Time from capturing the frame with the code to the door being open", ["lane"])
+
+# Default lane, matching the original single-gate wiring
+DEFAULT_LANE_CONFIG = {
+    "id": "main",
+    "camera_index": 0,
+    "infrared_pin": 17,
+    "buzzer_pin": 27,
+    "servo_pin": 22,
+    "door_open_time": 10,  # Time in seconds to keep the door open
+    "entry_window": 15,    # Time in seconds the student has to walk through
+    "servo_move_time": 0.5,  # Time in seconds the servo needs to swing the door
+    "deny_buzz_time": 1,   # Buzzer time in seconds for an unknown student
+    "alert_buzz_time": 3,  # Buzzer time in seconds when nobody walks through
+    "motion_gate": True,   # Skip decoding while the scene is static
+    "motion_min_changed": 0.01,  # Share of changed pixels that counts as motion
+    "face_roi": True,      # Look for the face above the scanned code first
+    "burst_fps": 10,       # Frame rate while someone is at the gate
+    "idle_fps": 2,         # Frame rate while the scene is static
+    "burst_hold": 3        # Seconds to stay at the burst rate after activity
+}
+
+# Settings that can change while the lane runs; the camera and GPIO lines need a restart
+LIVE_LANE_SETTINGS = ("door_open_time", "entry_window", "servo_move_time", "deny_buzz_time", "alert_buzz_time",
+                      "motion_gate", "motion_min_changed", "face_roi", "burst_fps", "idle_fps", "burst_hold")
+
+# Default camera frame size (width, height); frames are RGB888
+FRAME_SIZE = (1280, 720)
+
+def validate_lane_config(config):
+    """Raise ValueError unless every setting of a lane has a sensible value"""
+    lane = config.get("id", "?")
+    for key, value in config.items():
+        if key == "id":
+            if not isinstance(value, str) or not value:
+                raise ValueError(f"Lane id must be a non-empty string, got {value!r}")
+            continue
+        if key not in DEFAULT_LANE_CONFIG:
+            raise ValueError(f"Unknown setting '{key}' for lane {lane}")
+        expected = type(DEFAULT_LANE_CONFIG[key])
+        if expected is bool:
+            valid = isinstance(value, bool)
+        elif expected is int and key.endswith(("_pin", "_index")):
+            valid = isinstance(value, int) and not isinstance(value, bool) and value >= 0
+        else:
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+        if not valid:
+            raise ValueError(f"Invalid value {value!r} for '{key}' of lane {lane}")
+    for key in ("burst_fps", "idle_fps"):
+        if key in config and config[key] <= 0:
+            raise ValueError(f"'{key}' of lane {lane} must be above 0")
+
+def load_lane_configs(path=None):
+    """Load and validate lane definitions from a JSON file, falling back to the default lane"""
+    if not path or not os.path.exists(path):
+        return [dict(DEFAULT_LANE_CONFIG)]
+
+    with open(path) as f:
+        lane_configs = json.load(f)
+
+    if not isinstance(lane_configs, list) or not lane_configs:
+        raise ValueError(f"{path} must contain a non-empty list of lanes")
+
+    configs = []
+    seen_ids = set()
+    for index, lane_config in enumerate(lane_configs):
+        config = {**DEFAULT_LANE_CONFIG, **lane_config}
+        if "id" not in lane_config:
+            config["id"] = f"lane{index + 1}"
+        validate_lane_config(config)
+        if config["id"] in seen_ids:
+            raise ValueError(f"Duplicate lane id '{config['id']}' in {path}")
+        seen_ids.add(config["id"])
+        configs.append(config)
+    return configs
+
+class GateLane:
+    """A single gate lane: camera, infrared sensor, buzzer, servo and its pipeline"""
+
+    def __init__(self, config, check_student, log_attendance, mark_proxy, detector=None,
+                 face_index=None, face_match_required=False, frame_size=FRAME_SIZE, evidence=None):
+        self.config = config
+        self.frame_size = tuple(frame_size)
+        self.lane_id = config["id"]
+        self.logger = logging.getLogger(f"gate_lane.{self.lane_id}")
+        self.door_open_time = config["door_open_time"]
+        self.entry_window = config["entry_window"]
+
+        # Shared services provided by the API server
+        self.check_student = check_student
+        self.log_attendance = log_attendance
+        self.mark_proxy = mark_proxy
+        # In-process detection unless the server hands us a worker pool
+        self.detector = detector or detection.LocalDetector()
+        # Shared face embedding index for 1:1 identity checks
+        self.face_index = face_index
+        self.face_match_required = face_match_required
+        # Shared evidence ring for reviewing decisions (None = not kept)
+        self.evidence = evidence
+        self.motion_gate = MotionGate(min_changed_fraction=config["motion_min_changed"]) if config["motion_gate"] else None
+        self.scheduler = FrameScheduler(idle_fps=config["idle_fps"],
+                                        burst_fps=config["burst_fps"],
+                                        burst_hold=config["burst_hold"])
+
+        # Hardware handles, filled in by setup_gpio() and setup_camera()
+        self.picam2 = None
+        self.infrared_pin = None
+        self.buzzer_pin = None
+        self.motor_pwm = None
+
+        # Lane state
+        self.door_status = "closed"  # closed, opening, open, closing, alert
+        self.last_opened = None
+        self.recognized_face = None
+        self.last_activity = None
+        self.barcode_data = None
+        self.barcode_rect = None
+        self.face_detected = False
+        self.face_region = None  # Region the last face was found in (None = whole frame)
+        self.face_boxes = []  # Faces found in the frame being decided on
+        self.door_cycle_active = False  # A door cycle or denial is running
+        # Frames are captured into reused buffers rather than new arrays; other
+        # threads read the latest one with frame_buffers.hold_latest()
+        self.frame_buffers = FrameBuffers()
+
+        # Per-lane counters
+        self.stats = {
+            "framesProcessed": 0,
+            "framesSkipped": 0,
+            "faceRoiHits": 0,
+            "scans": 0,
+            "accepted": 0,
+            "denied": 0,
+            "faceFailed": 0,
+            "faceMismatch": 0,
+            "faceUnverified": 0,
+            "lastMatchScore": None,
+            "entered": 0,
+            "proxy": 0,
+            "lastDecisionMs": None
+        }
+        self.processing_thread = None
+
+        # Metric children for this lane, resolved once
+        self.capture_seconds = CAPTURE_SECONDS.labels(self.lane_id)
+        self.decode_seconds = DECODE_SECONDS.labels(self.lane_id)
+        self.face_detect_seconds = FACE_DETECT_SECONDS.labels(self.lane_id)
+        self.face_match_seconds = FACE_MATCH_SECONDS.labels(self.lane_id)
+        self.door_cycle_seconds = DOOR_CYCLE_SECONDS.labels(self.lane_id)
+        self.scan_to_open_seconds = SCAN_TO_OPEN_SECONDS.labels(self.lane_id)
+
+    def setup_gpio(self, chip):
+        """Request this lane's infrared and buzzer lines and start its servo PWM"""
+        # Keep gpiod for infrared and buzzer
+        self.infrared_pin = chip.get_line(self.config["infrared_pin"])
+        self.buzzer_pin = chip.get_line(self.config["buzzer_pin"])
+
+        consumer = f"attendance_system_{self.lane_id}"
+        self.infrared_pin.request(consumer=consumer, type=gpiod.LINE_REQ_DIR_IN)
+        self.buzzer_pin.request(consumer=consumer, type=gpiod.LINE_REQ_DIR_OUT)
+
+        # RPi.GPIO for the servo motor (GPIO.setmode is done once by the server)
+        servo_pin = self.config["servo_pin"]
+        GPIO.setup(servo_pin, GPIO.OUT)
+        self.motor_pwm = GPIO.PWM(servo_pin, 50)  # 50Hz for servos
+        self.motor_pwm.start(0)
+
+        self.logger.info(f"GPIO pins initialized successfully for lane {self.lane_id}")
+
+    def setup_camera(self, camera_info, picamera_class):
+        """Open and configure this lane's camera, leaving picam2 as None on failure"""
+        camera_index = self.config["camera_index"]
+        try:
+            if camera_index < len(camera_info):
+                picam2 = picamera_class(camera_index)
+                # Configure for RGB format explicitly
+                camera_config = picam2.create_still_configuration(
+                    main={"size": self.frame_size, "format": "RGB888"},  # Specify RGB format
+                    lores={"size": (640, 480)},
+                    display=None,
+                    buffer_count=2
+                )
+
+                picam2.configure(camera_config)  # Apply the configuration
+                picam2.set_controls({"AwbEnable": True, "AwbMode": 0})  # Auto white balance
+                picam2.start()
+                self.picam2 = picam2
+                self.logger.info(f"Camera {camera_index} initialized successfully for lane {self.lane_id}")
+            else:
+                self.logger.error(f"No camera {camera_index} detected for lane {self.lane_id}")
+        except Exception as e:
+            self.logger.error(f"Failed to initialize camera for lane {self.lane_id}: {e}")
+            self.picam2 = None
+
+    # Function to scan barcode
+    def scan_barcode(self, frame, gray=None):
+        try:
+            with self.decode_seconds.time():
+                result = self.detector.scan_barcode(frame, gray)
+            if not result:
+                return None
+            self.barcode_data, self.barcode_rect = result
+            log_event(self.logger, "scan", lane=self.lane_id, student=self.barcode_data)
+            return self.barcode_data
+        except Exception as e:
+            self.logger.error(f"Error scanning barcode on lane {self.lane_id}: {e}")
+            return None
+
+    # Function to verify face
+    def verify_face(self, frame, roi=None, gray=None):
+        try:
+            with self.face_detect_seconds.time():
+                faces = self.detector.detect_faces(frame, roi, gray) if roi else []
+                if faces:
+                    self.stats["faceRoiHits"] += 1
+                    self.face_region = roi
+                else:
+                    faces = self.detector.detect_faces(frame, gray=gray)
+                    self.face_region = None
+
+            self.face_boxes = [tuple(int(v) for v in face) for face in faces]
+            if len(faces) > 0:
+                self.face_detected = True
+                self.logger.debug(f"Face detected on lane {self.lane_id} ({'code region' if self.face_region else 'full frame'})")
+                return True
+            self.face_detected = False
+            return False
+        except Exception as e:
+            self.logger.error(f"Error in face detection on lane {self.lane_id}: {e}")
+            return False
+
+    def annotate_faces(self, frame):
+        """Copy of the frame with the face boxes drawn, published for the live feed
+
+        The copy goes into another frame buffer, so the frame being decided on
+        and any snapshot being encoded from it stay untouched.
+        """
+        annotated = self.frame_buffers.store(frame)
+        for (x, y, w, h) in self.face_boxes:
+            cv2.rectangle(annotated, (x, y), (x+w, y+h), (0, 255, 0), 2)
+        self.frame_buffers.publish()
+        return annotated
+
+    # Door opening/closing with RPi.GPIO servo control
+    def open_door(self):
+        log_event(self.logger, "door", lane=self.lane_id, state="opening")
+        cycle_start = time.perf_counter()
+        self.door_status = "opening"
+
+        # Move servo to open position (90 degrees)
+        duty = 90 / 18 + 2  # Convert angle to duty cycle
+        self.motor_pwm.ChangeDutyCycle(duty)
+        time.sleep(self.config["servo_move_time"])
+        self.motor_pwm.ChangeDutyCycle(0)  # Stop the servo from jittering
+
+        self.door_status = "open"
+        self.last_opened = time.strftime("%H:%M:%S")
+
+        def auto_close():
+            time.sleep(self.door_open_time)
+            self.door_status = "closing"
+
+            # Move servo to closed position (0 degrees)
+            duty = 0 / 18 + 2  # Convert angle to duty cycle
+            self.motor_pwm.ChangeDutyCycle(duty)
+            time.sleep(self.config["servo_move_time"])
+            self.motor_pwm.ChangeDutyCycle(0)  # Stop the servo from jittering
+
+            self.door_status = "closed"
+            cycle_seconds = time.perf_counter() - cycle_start
+            self.door_cycle_seconds.observe(cycle_seconds)
+            log_event(self.logger, "door", lane=self.lane_id, state="closed", cycle_ms=round(cycle_seconds * 1000))
+
+        threading.Thread(target=auto_close, daemon=True).start()
+
+    # Function to check student entry
+    def check_entry(self):
+        self.logger.debug(f"Waiting for student to enter on lane {self.lane_id}")
+        start_time = time.time()
+
+        while time.time() - start_time < self.entry_window:
+            if self.infrared_pin.get_value() == 0:
+                return True
+            time.sleep(0.01)  # Poll the sensor without spinning a core
+
+        log_event(self.logger, "door", logging.WARNING, lane=self.lane_id, state="alert")
+        self.door_status = "alert"
+        self.buzzer_pin.set_value(1)
+        time.sleep(self.config["alert_buzz_time"])
+        self.buzzer_pin.set_value(0)
+        self.door_status = "closed"
+        return False
+
+    def deny_access(self):
+        """Sound the buzzer for an unknown student"""
+        log_event(self.logger, "door", lane=self.lane_id, state="denied")
+        self.door_status = "alert"
+        self.buzzer_pin.set_value(1)
+        time.sleep(self.config["deny_buzz_time"])
+        self.buzzer_pin.set_value(0)
+        time.sleep(self.config["deny_buzz_time"] / 2)
+        self.door_status = "closed"
+
+    def ready_for_decision(self):
+        """A new scan may only start once the previous door cycle has finished"""
+        return not self.door_cycle_active and self.door_status == "closed"
+
+    def start_door_cycle(self, target, *args):
+        """Run a door cycle in its own thread so the lane keeps capturing frames"""
+        self.door_cycle_active = True
+        threading.Thread(target=self._run_door_cycle, args=(target,) + args,
+                         name=f"door-{self.lane_id}", daemon=True).start()
+
+    def _run_door_cycle(self, target, *args):
+        try:
+            target(*args)
+        except Exception as e:
+            self.logger.error(f"Error in door cycle on lane {self.lane_id}: {e}")
+            if self.door_status == "alert":
+                self.buzzer_pin.set_value(0)
+                self.door_status = "closed"
+        finally:
+            self.door_cycle_active = False
+
+    def verify_identity(self, student_id, frame):
+        """Compare the live face with the scanned student's enrolled face
+
+        Returns ("match", method), ("unverified", method) when the student has
+        no enrolled face and matching is optional, ("retry", None) when no face
+        could be embedded from this frame, or ("mismatch", None).
+        """
+        if self.face_index is None or student_id not in self.face_index:
+            if self.face_match_required:
+                self.logger.info(f"No enrolled face for {student_id} on lane {self.lane_id}; identity match is required")
+                return "mismatch", None
+            self.stats["faceUnverified"] += 1
+            return "unverified", "face detected"
+
+        with self.face_match_seconds.time():
+            embedding = self.detector.embed_face(frame, self.face_region)
+            if embedding is None:
+                return "retry", None
+            matched, score = self.face_index.match(student_id, embedding)
+        self.stats["lastMatchScore"] = round(score, 3)
+        if matched:
+            return "match", "fully verified"
+        self.logger.info(f"Face does not match student {student_id} on lane {self.lane_id} (score {score:.3f})")
+        return "mismatch", None
+
+    def record_evidence(self, frame, student_id, outcome, **details):
+        """Queue a record of a decision for later review; returns its event id or None"""
+        if self.evidence is None:
+            return None
+        try:
+            return self.evidence.record(frame, lane=self.lane_id, student=student_id, outcome=outcome,
+                                        barcodeRect=list(self.barcode_rect) if self.barcode_rect else None,
+                                        faces=[list(face) for face in self.face_boxes], **details)
+        except Exception as e:
+            self.logger.error(f"Could not record evidence on lane {self.lane_id}: {e}")
+            return None
+
+    def entry_cycle(self, student_id, verification_method="fully verified", captured_at=None, event_id=None):
+        """Open the door, wait for the student and record the outcome"""
+        self.open_door()
+        if captured_at is not None:
+            self.scan_to_open_seconds.observe(time.perf_counter() - captured_at)
+        # Wait for student to enter
+        if self.check_entry():
+            name = self.log_attendance(student_id, verification_method)  # Mark as present only if entered
+            if name:
+                self.recognized_face = name
+            self.stats["entered"] += 1
+            log_event(self.logger, "attendance", lane=self.lane_id, student=student_id, status="present",
+                      method=verification_method)
+        else:
+            self.mark_proxy(student_id)  # Mark as proxy if not entered
+            self.stats["proxy"] += 1
+            # The frame is kept with the decision record; this one points to it
+            proxy_event = self.record_evidence(None, student_id, "proxy", decisionEvent=event_id,
+                                               entryWindow=self.entry_window)
+            log_event(self.logger, "attendance", logging.WARNING, lane=self.lane_id, student=student_id,
+                      status="proxy", proxy_event_id=proxy_event)
+
+        # Update the activity time so the frontend refreshes the attendance table
+        self.last_activity = time.strftime("%H:%M:%S")
+
+    def process_frame(self, frame, captured_at=None, gray=None):
+        """Run one gate decision on a captured frame; return True if a code was seen
+
+        captured_at is the perf_counter() time the frame capture started. gray
+        is the frame's grayscale when the caller already converted it; the
+        barcode decoder and the face detector share it.
+        """
+        decode_start = time.perf_counter()
+        self.face_boxes = []
+        detected_barcode = self.scan_barcode(frame, gray)
+        if not detected_barcode:
+            return False
+
+        decode_ms = round((time.perf_counter() - decode_start) * 1000, 1)
+        decision_start = time.time()
+        self.stats["scans"] += 1
+        if self.check_student(detected_barcode):
+            roi = face_roi_above(self.barcode_rect, frame.shape) if self.config["face_roi"] else None
+            if self.verify_face(frame, roi, gray):
+                outcome, verification_method = self.verify_identity(detected_barcode, frame)
+                annotated = self.annotate_faces(frame)
+                if outcome == "retry":
+                    self.stats["faceFailed"] += 1
+                    log_event(self.logger, "decision", lane=self.lane_id, student=detected_barcode, outcome="retry")
+                elif outcome == "mismatch":
+                    self.stats["faceMismatch"] += 1
+                    self.stats["lastDecisionMs"] = round((time.time() - decision_start) * 1000, 1)
+                    event_id = self.record_evidence(annotated, detected_barcode, "mismatch",
+                                                    matchScore=self.stats["lastMatchScore"], decodeMs=decode_ms,
+                                                    decisionMs=self.stats["lastDecisionMs"])
+                    log_event(self.logger, "decision", lane=self.lane_id, student=detected_barcode, outcome="mismatch",
+                              score=self.stats["lastMatchScore"], decision_ms=self.stats["lastDecisionMs"],
+                              event_id=event_id)
+                    self.start_door_cycle(self.deny_access)
+                else:
+                    self.stats["accepted"] += 1
+                    self.stats["lastDecisionMs"] = round((time.time() - decision_start) * 1000, 1)
+                    event_id = self.record_evidence(annotated, detected_barcode, "accepted", method=verification_method,
+                                                    matchScore=self.stats["lastMatchScore"]
+                                                    if verification_method == "fully verified" else None,
+                                                    decodeMs=decode_ms, decisionMs=self.stats["lastDecisionMs"])
+                    log_event(self.logger, "decision", lane=self.lane_id, student=detected_barcode, outcome="accepted",
+                              method=verification_method, decision_ms=self.stats["lastDecisionMs"], event_id=event_id)
+                    self.start_door_cycle(self.entry_cycle, detected_barcode, verification_method, captured_at,
+                                          event_id)
+            else:
+                self.stats["faceFailed"] += 1
+                log_event(self.logger, "decision", lane=self.lane_id, student=detected_barcode, outcome="no_face")
+        else:
+            self.stats["denied"] += 1
+            self.stats["lastDecisionMs"] = round((time.time() - decision_start) * 1000, 1)
+            event_id = self.record_evidence(frame, detected_barcode, "unknown_student", decodeMs=decode_ms,
+                                            decisionMs=self.stats["lastDecisionMs"])
+            log_event(self.logger, "decision", lane=self.lane_id, student=detected_barcode, outcome="unknown_student",
+                      decision_ms=self.stats["lastDecisionMs"], event_id=event_id)
+            self.start_door_cycle(self.deny_access)
+        return True
+
+    # Background processing thread
+    def run(self):
+        while True:
+            active = False
+            try:
+                if self.picam2:
+                    captured_at = time.perf_counter()
+                    frame = self.frame_buffers.capture(self.picam2)
+                    self.capture_seconds.observe(time.perf_counter() - captured_at)
+                    self.stats["framesProcessed"] += 1
+                    self.frame_buffers.publish(time.time())
+                    should_decode = self.motion_gate.update(frame) if self.motion_gate else True
+                    active = self.motion_gate.moving if self.motion_gate else False
+
+                    if should_decode and self.ready_for_decision():
+                        gray = self.frame_buffers.to_gray(frame)
+                        active = self.process_frame(frame, captured_at, gray) or active
+                    else:
+                        # Static scene, or the door is still cycling
+                        self.stats["framesSkipped"] += 1
+            except Exception as e:
+                self.logger.error(f"Error in background processing on lane {self.lane_id}: {e}")
+            self.scheduler.frame_done(active)
+
+    def apply_config(self, changes):
+        """Apply changed live settings to the running lane, from the next frame or door cycle"""
+        config = {**self.config, **changes}
+        validate_lane_config(config)
+        self.config.update(changes)
+        self.door_open_time = config["door_open_time"]
+        self.entry_window = config["entry_window"]
+        self.scheduler.set_rates(idle_fps=config["idle_fps"], burst_fps=config["burst_fps"],
+                                 burst_hold=config["burst_hold"])
+        if not config["motion_gate"]:
+            self.motion_gate = None
+        elif self.motion_gate is None:
+            self.motion_gate = MotionGate(min_changed_fraction=config["motion_min_changed"])
+        else:
+            self.motion_gate.min_changed_fraction = config["motion_min_changed"]
+        self.logger.info(f"Lane {self.lane_id} settings changed: {changes}")
+
+    def start(self):
+        """Start this lane's processing thread"""
+        self.processing_thread = threading.Thread(target=self.run, name=f"lane-{self.lane_id}")
+        self.processing_thread.daemon = True
+        self.processing_thread.start()
+
+    def door_state(self):
+        """Door status in the shape returned by /api/door-status"""
+        return {
+            'status': self.door_status,
+            'lastOpened': self.last_opened,
+            'autoCloseTimer': self.door_open_time if self.door_status == "open" else 0
+        }
+
+    def recognition_state(self):
+        """Recognition status in the shape returned by /api/recognition-status"""
+        return {
+            'recognizedFace': self.recognized_face,
+            'lastActivity': self.last_activity,
+            'status': 'processing' if self.face_detected or self.barcode_data else 'online'
+        }
+
+    def gpio_ready(self):
+        return self.infrared_pin is not None and self.buzzer_pin is not None
+
+    def metrics(self):
+        """Counters and frame rate figures for /api/lanes/<lane_id>/metrics"""
+        return {'id': self.lane_id, **self.stats, **self.scheduler.snapshot()}
+
+    def summary(self):
+        """Lane overview for /api/lanes"""
+        return {
+            'id': self.lane_id,
+            'cameraIndex': self.config["camera_index"],
+            'camera': self.picam2 is not None,
+            'gpio': self.gpio_ready(),
+            'door': self.door_state(),
+            'recognition': self.recognition_state()
+        }
+
+    def cleanup(self):
+        """Release this lane's camera and GPIO lines"""
+        if self.buzzer_pin:
+            self.buzzer_pin.release()
+        if self.infrared_pin:
+            self.infrared_pin.release()
+        if self.picam2:
+            self.picam2.stop()
+            self.picam2.close()
+        if self.motor_pwm:
+            self.motor_pwm.stop()
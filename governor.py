@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Governor Module
+
+This module provides the load governor, which keeps gate latency bounded
+when the Pi runs hot or short of CPU. Once the SoC throttles, every stage of
+the lane loop slows down unpredictably; the governor steps the vision
+pipeline down through fixed tiers before that happens, and back up once the
+pressure is gone.
+
+Every few seconds it reads the SoC temperature from a sysfs thermal zone, the
+CPU usage from /proc/stat and the lanes' measured time per frame. Any reading
+above its limit on two checks in a row moves one tier down; a temperature at
+the critical limit goes straight to the lowest tier. The governor moves one
+tier up only after every reading has stayed below its recovery level for a
+while, so it does not flap between tiers. The sensor path is a setting, so a
+plain file holding millidegrees stands in for the sensor in tests.
+"""
+
+import time
+import logging
+import threading
+from collections import namedtuple
+from metrics import Counter, Gauge
+
+logger = logging.getLogger("governor")
+
+GOVERNOR_TIER = Gauge("governor_tier", "Current load governor tier (0 = full quality)")
+GOVERNOR_TIER_CHANGES = Counter("governor_tier_changes_total", "Load governor tier changes", ["direction"])
+SOC_TEMPERATURE = Gauge("soc_temperature_celsius", "SoC temperature read by the load governor")
+
+# None leaves the configured value; other values are caps on it
+# barcode_scale stays above detection_scale: a badge's modules must keep a few
+# pixels each to decode, while a face is still found at a quarter of the frame.
+Tier = namedtuple("Tier", ["name", "detection_scale", "face_detector", "max_fps", "jpeg_quality", "stream_fps",
+                           "barcode_scale"])
+
+TIERS = [
+    Tier("full", None, None, None, None, None, None),
+    Tier("reduced", 0.5, None, 8, 80, 5, 0.75),
+    Tier("low", 0.35, "lbp", 5, 70, 2, 0.5),
+    Tier("minimal", 0.25, "lbp", 3, 60, 1, 0.5)
+]
+
+DEFAULT_SENSOR = "/sys/class/thermal/thermal_zone0/temp"
+
+def read_temperature(path):
+    """SoC temperature in °C from a sysfs thermal zone file (millidegrees), or None"""
+    try:
+        with open(path) as f:
+            return int(f.read().strip()) / 1000
+    except (OSError, ValueError):
+        return None
+
+class CpuUsage:
+    """Share of CPU time spent busy since the previous reading, from /proc/stat"""
+
+    def __init__(self, path="/proc/stat"):
+        self.path = path
+        self.previous = None
+
+    def read(self):
+        try:
+            with open(self.path) as f:
+                fields = [int(value) for value in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return None
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)  # idle + iowait
+        total = sum(fields[:8])  # Guest time is already counted in user time
+        previous, self.previous = self.previous, (idle, total)
+        if previous is None or total == previous[1]:
+            return None
+        return 1 - (idle - previous[0]) / (total - previous[1])
+
+class Governor:
+    """Steps the vision pipeline through TIERS according to temperature, CPU usage and frame time"""
+
+    def __init__(self, apply, frame_seconds, sensor_path=DEFAULT_SENSOR, tiers=TIERS, interval=5.0,
+                 temp_high=75.0, temp_critical=82.0, temp_hysteresis=5.0, cpu_high=0.9, frame_ms=150.0,
+                 recover_after=60.0, clock=time.monotonic):
+        self.apply = apply  # Called with the new Tier after every change
+        self.frame_seconds = frame_seconds  # Callable returning the lanes' smoothed seconds per frame
+        self.sensor_path = sensor_path
+        self.tiers = tiers
+        self.interval = interval
+        self.temp_high = temp_high
+        self.temp_critical = temp_critical
+        self.temp_hysteresis = temp_hysteresis  # Degrees below temp_high before stepping back up
+        self.cpu_high = cpu_high
+        self.frame_ms = frame_ms
+        self.recover_after = recover_after  # Seconds of calm before stepping up one tier
+        self.clock = clock
+        self.enabled = True
+
+        self.cpu = CpuUsage()
+        self.index = 0
+        self.reason = None
+        self.changed_at = clock()
+        self.pressure_count = 0
+        self.calm_since = None
+        self.readings = {"temperature": None, "cpu": None, "frameMs": None}
+        self.lock = threading.Lock()
+
+    @property
+    def tier(self):
+        return self.tiers[self.index]
+
+    def cap(self, field, value):
+        """value limited by the current tier's cap for field, if it has one"""
+        limit = getattr(self.tier, field)
+        return value if limit is None else min(value, limit)
+
+    def read(self):
+        """Take a reading of every input"""
+        temperature = read_temperature(self.sensor_path)
+        cpu = self.cpu.read()
+        frame_seconds = [seconds for seconds in self.frame_seconds() if seconds is not None]
+        self.readings = {
+            "temperature": round(temperature, 1) if temperature is not None else None,
+            "cpu": round(cpu, 3) if cpu is not None else None,
+            "frameMs": round(max(frame_seconds) * 1000, 1) if frame_seconds else None
+        }
+        if temperature is not None:
+            SOC_TEMPERATURE.set(temperature)
+        return self.readings
+
+    def _pressure(self, readings):
+        """Why the pipeline should step down, or None"""
+        temperature, cpu, frame_ms = readings["temperature"], readings["cpu"], readings["frameMs"]
+        if temperature is not None and temperature >= self.temp_high:
+            return f"temperature {temperature} °C"
+        if cpu is not None and cpu >= self.cpu_high:
+            return f"CPU {cpu:.0%}"
+        if frame_ms is not None and frame_ms >= self.frame_ms:
+            return f"frame time {frame_ms} ms"
+        return None
+
+    def _calm(self, readings):
+        """Every reading is clearly below its limit"""
+        temperature, cpu, frame_ms = readings["temperature"], readings["cpu"], readings["frameMs"]
+        return ((temperature is None or temperature < self.temp_high - self.temp_hysteresis)
+                and (cpu is None or cpu < self.cpu_high * 0.75)
+                and (frame_ms is None or frame_ms < self.frame_ms * 0.6))
+
+    def check(self):
+        """Read the inputs and change tier if needed; returns the current Tier"""
+        readings = self.read()
+        if not self.enabled:
+            return self.tier
+        now = self.clock()
+        pressure = self._pressure(readings)
+        if pressure:
+            self.calm_since = None
+            self.pressure_count += 1
+            if readings["temperature"] is not None and readings["temperature"] >= self.temp_critical:
+                self.set_tier(len(self.tiers) - 1, f"critical {pressure}")
+            elif self.pressure_count >= 2:
+                self.pressure_count = 0
+                self.set_tier(self.index + 1, pressure)
+            return self.tier
+
+        self.pressure_count = 0
+        if not self._calm(readings):
+            self.calm_since = None
+        elif self.calm_since is None:
+            self.calm_since = now
+        elif now - self.calm_since >= self.recover_after and self.index > 0:
+            self.calm_since = now
+            self.set_tier(self.index - 1, "load back to normal")
+        return self.tier
+
+    def set_tier(self, index, reason):
+        """Switch to a tier (clamped to the defined ones) and apply it"""
+        index = min(max(index, 0), len(self.tiers) - 1)
+        with self.lock:
+            if index == self.index:
+                return
+            direction = "down" if index > self.index else "up"
+            self.index = index
+            self.reason = reason
+            self.changed_at = self.clock()
+        GOVERNOR_TIER.set(index)
+        GOVERNOR_TIER_CHANGES.labels(direction).inc()
+        log = logger.warning if direction == "down" else logger.info
+        log(f"Stepping {direction} to tier {index} ({self.tier.name}): {reason}")
+        try:
+            self.apply(self.tier)
+        except Exception as e:
+            logger.error(f"Could not apply tier {self.tier.name}: {e}")
+
+    def set_enabled(self, enabled):
+        """Turn the governor on or off; off returns the pipeline to full quality"""
+        self.enabled = enabled
+        if not enabled:
+            self.set_tier(0, "governor disabled")
+
+    def start(self):
+        threading.Thread(target=self._run, name="governor", daemon=True).start()
+
+    def _run(self):
+        event = threading.Event()
+        while not event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Governor check failed: {e}")
+
+    def summary(self):
+        """Current tier and readings for /api/health"""
+        return {
+            "enabled": self.enabled,
+            "tier": self.index,
+            "name": self.tier.name,
+            "reason": self.reason,
+            "sinceSeconds": round(self.clock() - self.changed_at, 1),
+            "readings": self.readings,
+            "caps": {
+                "detectionScale": self.tier.detection_scale,
+                "barcodeScale": self.tier.barcode_scale,
+                "faceDetector": self.tier.face_detector,
+                "maxFps": self.tier.max_fps,
+                "jpegQuality": self.tier.jpeg_quality,
+                "streamFps": self.tier.stream_fps
+            }
+        }
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Logging Setup Module
+
+This module configures logging for the whole server once. Every logger writes
+into an in-memory queue, and a single listener thread formats the records and
+writes them to the console and to rotating log files, so gate lanes and request
+threads never wait for the disk. Records are handed over unformatted; the
+formatting happens on the listener thread too.
+
+Scan, decision and door events are logged with log_event() and also written as
+JSON lines to a separate event log for later analysis. Each subsystem logs
+under its module name (api_server, gate_lane.<lane id>, detection, ...) and can
+be given its own level.
+"""
+
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from datetime import datetime
+from metrics import Counter
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Records waiting for the listener; when the disk stalls this long, new records are dropped
+QUEUE_SIZE = 10000
+
+LOG_RECORDS_DROPPED = Counter("log_records_dropped_total", "Log records dropped because the log queue was full")
+
+_listener = None
+# Loggers given their own level by set_log_levels()
+_subsystem_levels = set()
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks or formats on the logging thread"""
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the fields of log_event() at the top level"""
+
+    def format(self, record):
+        document = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name
+        }
+        event = getattr(record, "event", None)
+        if event:
+            document["event"] = event
+            document.update(record.fields)
+        else:
+            document["message"] = record.getMessage()
+        if record.exc_info:
+            document["exception"] = self.formatException(record.exc_info)
+        return json.dumps(document, default=str)
+
+class EventFilter(logging.Filter):
+    """Pass only records logged with log_event()"""
+
+    def filter(self, record):
+        return getattr(record, "event", None) is not None
+
+def log_event(logger, event, level=logging.INFO, **fields):
+    """Log a structured event, e.g. log_event(logger, "scan", lane="main", student="R001")"""
+    if not logger.isEnabledFor(level):
+        return
+    message = event + "".join(f" {key}={value}" for key, value in fields.items())
+    logger.log(level, message, extra={"event": event, "fields": fields})
+
+def _file_handler(path, max_bytes, backup_count, rotate_when):
+    """Size-based rotation by default, time-based when rotate_when is set (e.g. "midnight")"""
+    if rotate_when:
+        return logging.handlers.TimedRotatingFileHandler(path, when=rotate_when, backupCount=backup_count)
+    return logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+
+def parse_levels(spec):
+    """Parse per-subsystem levels like "gate_lane=DEBUG,werkzeug=WARNING" """
+    levels = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, _, level = item.partition("=")
+        if not level:
+            raise ValueError(f"Invalid log level setting '{item}', expected name=LEVEL")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+def set_log_levels(level="INFO", levels=None):
+    """Set the root level and per-subsystem levels; may be called while running
+
+    Subsystems set by a previous call but missing from levels go back to
+    following the root level.
+    """
+    logging.getLogger().setLevel(level.upper())
+    levels = {name: subsystem_level.upper() for name, subsystem_level in (levels or {}).items()}
+    for name in _subsystem_levels - set(levels):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    for name, subsystem_level in levels.items():
+        logging.getLogger(name).setLevel(subsystem_level)
+    _subsystem_levels.clear()
+    _subsystem_levels.update(levels)
+
+def configure_logging(log_file="api_server.log", level="INFO", levels=None, log_format="text",
+                      event_log_file="gate_events.log", max_bytes=10 * 1024 * 1024, backup_count=5,
+                      rotate_when=None, start=True):
+    """Route all logging through the queue to the console and rotating files
+
+    levels maps logger names to levels, e.g. {"gate_lane": "DEBUG"}. log_format
+    is "text" or "json" for the console and main log file; the event log is
+    always JSON lines. Calling it again replaces the previous setup. With
+    start=False records wait in the queue until start_logging() starts the
+    listener thread, so the process can still fork safely.
+    """
+    global _listener
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+    formatter = JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(_file_handler(log_file, max_bytes, backup_count, rotate_when))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    if event_log_file:
+        event_handler = _file_handler(event_log_file, max_bytes, backup_count, rotate_when)
+        event_handler.setFormatter(JsonFormatter())
+        event_handler.addFilter(EventFilter())
+        handlers.append(event_handler)
+
+    log_queue = queue.Queue(QUEUE_SIZE)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+    set_log_levels(level, levels)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    if start:
+        _listener.start()
+    return _listener
+
+def start_logging():
+    """Start the listener thread of a configure_logging(start=False) setup"""
+    if _listener is not None and _listener._thread is None:
+        _listener.start()
+
+def configure_child_logging():
+    """Log straight to stderr in a forked worker process, which has no listener thread"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    root.addHandler(handler)
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+    _listener = None
+
+atexit.register(stop_logging)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Motion Gate Module
+
+This module provides a cheap frame-differencing check that lets a gate lane
+skip barcode decoding while nothing is moving in front of the camera. It works
+on a heavily subsampled luma image, so one check costs a small fraction of a
+full-frame decode.
+"""
+
+import numpy as np
+import cv2
+
+class MotionGate:
+    """Decides per frame whether the scene changed enough to be worth decoding"""
+
+    def __init__(self, sample_width=160, pixel_threshold=25, min_changed_fraction=0.01,
+                 hold_frames=20, keepalive_frames=30):
+        self.sample_width = sample_width
+        self.pixel_threshold = pixel_threshold  # Luma change that counts a pixel as changed
+        self.min_changed_fraction = min_changed_fraction  # Share of changed pixels that counts as motion
+        self.hold_frames = hold_frames  # Keep decoding this many frames after motion stops
+        self.keepalive_frames = keepalive_frames  # Decode at least once every this many static frames
+
+        self.previous = None
+        # Two sample buffers used in turn, and the difference image, reused every frame
+        self.samples = [None, None]
+        self.diff = None
+        self.hold_remaining = 0
+        self.static_count = 0
+        self.last_changed_fraction = 0.0
+        self.moving = False  # Motion seen within the hold period
+
+    def sample(self, frame):
+        """Subsampled luma: every n-th pixel of the green channel"""
+        step = max(1, frame.shape[1] // self.sample_width)
+        view = frame[::step, ::step, 1]
+        # Write into the buffer not holding the previous sample
+        slot = 1 if self.samples[0] is self.previous else 0
+        if self.samples[slot] is None or self.samples[slot].shape != view.shape:
+            self.samples[slot] = np.empty(view.shape, np.uint8)
+        np.copyto(self.samples[slot], view)
+        return self.samples[slot]
+
+    def update(self, frame):
+        """Feed a frame; return True if it should be decoded"""
+        current = self.sample(frame)
+        previous, self.previous = self.previous, current
+        if previous is None or previous.shape != current.shape:
+            return True
+
+        self.diff = cv2.absdiff(current, previous, self.diff)
+        # Changed pixels become 1 in place, then counted
+        cv2.threshold(self.diff, self.pixel_threshold, 1, cv2.THRESH_BINARY, dst=self.diff)
+        changed = cv2.countNonZero(self.diff)
+        self.last_changed_fraction = changed / self.diff.size
+
+        if self.last_changed_fraction >= self.min_changed_fraction:
+            self.hold_remaining = self.hold_frames
+            self.static_count = 0
+            self.moving = True
+            return True
+
+        if self.hold_remaining > 0:
+            self.hold_remaining -= 1
+            return True
+
+        self.moving = False
+
+        # Someone holding perfectly still still gets an occasional decode
+        self.static_count += 1
+        if self.static_count >= self.keepalive_frames:
+            self.static_count = 0
+            return True
+        return False
+
+    def trigger(self):
+        """Force decoding for the next hold_frames frames"""
+        self.hold_remaining = self.hold_frames
+
+def face_roi_above(barcode_rect, frame_shape, width_factor=4.0, height_factor=5.0):
+    """Region above a barcode where the holder's face is expected, as (x, y, w, h)
+
+    Badges are held at chest height, so the face is searched in a window centred
+    on the code, several code-widths wide, reaching up from just below the code.
+    """
+    x, y, w, h = barcode_rect
+    frame_height, frame_width = frame_shape[:2]
+
+    roi_width = int(w * width_factor)
+    left = max(0, x + w // 2 - roi_width // 2)
+    right = min(frame_width, left + roi_width)
+    top = max(0, y - int(h * height_factor))
+    bottom = min(frame_height, y + h)
+
+    if right - left < 30 or bottom - top < 30:
+        return None
+    return (left, top, right - left, bottom - top)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Profiler Module
+
+This module captures time-boxed profiles of the running server for the admin
+profile endpoint. A sampling thread reads every thread's Python stack with
+sys._current_frames() at a fixed interval, so the gate lanes, the database
+checker and request threads all show up, and the result is written in the
+collapsed-stack format flamegraph.pl and speedscope read. Optionally the
+largest allocation sites are reported with tracemalloc.
+
+Nothing runs between profiles: there is no sampling thread, tracer or
+allocation hook unless a capture is in progress.
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+
+logger = logging.getLogger("profiler")
+
+MAX_DURATION = 60  # Seconds; longer captures tie up a request thread for too long
+
+class ProfilerBusy(RuntimeError):
+    """A capture is already running"""
+
+_capture_lock = threading.Lock()
+
+def _frame_label(frame, lines):
+    code = frame.f_code
+    filename = os.path.basename(code.co_filename)
+    if lines:
+        return f"{code.co_name} ({filename}:{frame.f_lineno})"
+    return f"{code.co_name} ({filename})"
+
+def _stack(frame, lines):
+    """Root-first labels of a thread's stack"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame, lines))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+def sample_stacks(duration, interval=0.01, lines=False):
+    """Sample every thread's stack for duration seconds; returns (Counter of stacks, samples taken)
+
+    Each stack is "<thread name>;<outermost frame>;...;<innermost frame>".
+    """
+    stacks = Counter()
+    samples = 0
+    own_ident = threading.get_ident()
+    deadline = time.monotonic() + duration
+    next_sample = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            break
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            thread_name = names.get(ident, f"thread-{ident}").replace(";", ":").replace(" ", "_")
+            stacks[";".join([thread_name] + _stack(frame, lines))] += 1
+        samples += 1
+        next_sample += interval
+        time.sleep(max(0.0, next_sample - time.monotonic()))
+    return stacks, samples
+
+def collapsed(stacks):
+    """Collapsed-stack text: one "frame;frame;... count" line per distinct stack"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+def capture(duration, interval=0.01, memory=False, top=25, lines=False):
+    """Profile the process for duration seconds; raises ProfilerBusy if a capture is running
+
+    Returns a dict with the collapsed stacks, the sample count and, with
+    memory=True, the top allocation sites that grew during the capture.
+    """
+    duration = min(max(duration, 0.1), MAX_DURATION)
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already being captured")
+    started_tracing = False
+    try:
+        logger.info(f"Capturing a {duration:.1f} s profile (interval {interval * 1000:.1f} ms, memory {memory})")
+        baseline = None
+        if memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(1)
+                started_tracing = True
+            baseline = tracemalloc.take_snapshot()
+
+        start = time.perf_counter()
+        stacks, samples = sample_stacks(duration, interval, lines)
+        elapsed = time.perf_counter() - start
+
+        result = {
+            "duration": round(elapsed, 3),
+            "interval": interval,
+            "samples": samples,
+            "threads": len({stack.split(";", 1)[0] for stack in stacks}),
+            "collapsed": collapsed(stacks)
+        }
+        if memory:
+            # Leave out the profiler's own allocations
+            own = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+            snapshot = tracemalloc.take_snapshot().filter_traces(own)
+            baseline = baseline.filter_traces(own)
+            current, peak = tracemalloc.get_traced_memory()
+            result["memory"] = {
+                "tracedBytes": current,
+                "peakBytes": peak,
+                "top": [{
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "sizeBytes": stat.size,
+                    "sizeDiffBytes": stat.size_diff,
+                    "count": stat.count,
+                    "countDiff": stat.count_diff
+                } for stat in snapshot.compare_to(baseline, "lineno")[:top]]
+            }
+        return result
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _capture_lock.release()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Response Encoding Module
+
+This module makes the API's responses smaller and cheaper to produce: a JSON
+provider backed by orjson (when installed) for jsonify(), gzip or brotli
+compression negotiated from Accept-Encoding for responses above a size
+threshold, and an optional columnar shape for long lists (?shape=columns),
+which sends every key once instead of once per row.
+"""
+
+import gzip
+import json
+import decimal
+import logging
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from metrics import Counter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger("response_encoding")
+
+# Only text formats are worth compressing; JPEG frames are already compressed
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/csv", "application/javascript")
+
+HTTP_RESPONSE_BYTES = Counter("http_response_bytes_total", "Response body bytes sent, by content encoding", ["encoding"])
+
+def _default(value):
+    """Types the database driver returns that JSON has no native form for"""
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify() through orjson: several times faster and compact output
+
+    Dates and datetimes are written as ISO 8601 strings.
+    """
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self.options).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=self.options)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def columnar(records):
+    """List of dicts as {"count": n, "columns": {key: [values]}}"""
+    keys = list(records[0]) if records else []
+    return {"count": len(records), "columns": {key: [record.get(key) for record in records] for key in keys}}
+
+def list_response(records):
+    """Rows as they are, or columnar when the client asks for ?shape=columns"""
+    if request.args.get("shape") == "columns":
+        return columnar(records)
+    return records
+
+def accepted_encodings(header):
+    """Encodings from an Accept-Encoding header with their q-values"""
+    encodings = {}
+    for item in (header or "").split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[name.strip().lower()] = quality
+    return encodings
+
+def choose_encoding(header):
+    """Best encoding we can produce for the client: br, then gzip, else None"""
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get("*", 0.0)
+    candidates = (["br"] if brotli else []) + ["gzip"]
+    best, best_quality = None, 0.0
+    for name in candidates:
+        quality = encodings.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+def compress(data, encoding, gzip_level=5, brotli_quality=4):
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+
+def init_app(app, min_size=1024, gzip_level=5, brotli_quality=4, use_orjson=True):
+    """Install the JSON provider and response compression on a Flask app
+
+    Responses shorter than min_size bytes are sent as they are: for them the
+    compression time outweighs the bytes saved. The settings are kept in
+    app.config (COMPRESS_MIN_SIZE, COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY)
+    and read for every response, so they can be changed while the app runs.
+    """
+    app.config.update(COMPRESS_MIN_SIZE=min_size, COMPRESS_GZIP_LEVEL=gzip_level,
+                      COMPRESS_BROTLI_QUALITY=brotli_quality)
+    if use_orjson and orjson:
+        app.json = OrjsonProvider(app)
+        logger.info("Using orjson for JSON responses")
+
+    @app.after_request
+    def compress_response(response):
+        response.vary.add("Accept-Encoding")
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 304)
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            HTTP_RESPONSE_BYTES.labels("identity").inc(response.content_length or 0)
+            return response
+
+        data = response.get_data()
+        encoding = (choose_encoding(request.headers.get("Accept-Encoding"))
+                    if len(data) >= app.config["COMPRESS_MIN_SIZE"] else None)
+        if encoding is None:
+            HTTP_RESPONSE_BYTES.labels("identity").inc(len(data))
+            return response
+
+        compressed = compress(data, encoding, app.config["COMPRESS_GZIP_LEVEL"], app.config["COMPRESS_BROTLI_QUALITY"])
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        HTTP_RESPONSE_BYTES.labels(encoding).inc(len(compressed))
+        return response
+
+    return app
+
+def dumps(obj):
+    """Serialize like the app's JSON provider, for code outside a request"""
+    if orjson:
+        return orjson.dumps(obj, default=_default, option=OrjsonProvider.options)
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode("utf-8")
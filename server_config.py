@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Server Configuration Module
+
+This module defines every server setting in one place, with its type, default,
+limits and environment variable (the setting name in upper case). Values come
+from the defaults, then a JSON file (server_config.json unless
+SERVER_CONFIG_FILE says otherwise), then the environment, and are validated
+when loaded, so a typo fails at startup instead of deep in the pipeline.
+
+Settings marked live can change while the server runs, through the admin API
+or by editing the file, which is watched. The server registers callbacks with
+on_change() that apply new values to the running pipeline; the camera,
+database connections and workers keep running. Other settings are read once
+and take effect at the next restart.
+"""
+
+import os
+import json
+import logging
+import threading
+from logging_setup import parse_levels
+
+logger = logging.getLogger("server_config")
+
+DEFAULT_CONFIG_FILE = "server_config.json"
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+class Setting:
+    """One typed setting: int, float, bool, str or list (of strings)"""
+
+    def __init__(self, name, kind, default, live=False, minimum=None, maximum=None, choices=None,
+                 optional=False, secret=False, check=None, help=""):
+        self.name = name
+        self.env = name.upper()
+        self.kind = kind
+        self.default = default
+        self.live = live
+        self.minimum = minimum
+        self.maximum = maximum
+        self.choices = choices
+        self.optional = optional  # None (or an empty string) is allowed
+        self.secret = secret      # Never returned by the API
+        self.check = check        # Extra validation; raises ValueError
+        self.help = help
+
+    def parse(self, value):
+        """Convert a file, environment or API value to this setting's type, or raise ValueError"""
+        if value is None or (isinstance(value, str) and not value.strip() and (self.kind is not str or self.optional)):
+            if self.optional:
+                return None
+            raise ValueError(f"{self.name} is required")
+
+        if self.kind is bool:
+            if isinstance(value, bool):
+                parsed = value
+            elif str(value).strip().lower() in _TRUE:
+                parsed = True
+            elif str(value).strip().lower() in _FALSE:
+                parsed = False
+            else:
+                raise ValueError(f"{self.name} must be true or false, got {value!r}")
+        elif self.kind is list:
+            if isinstance(value, str):
+                parsed = [item.strip() for item in value.split(",") if item.strip()]
+            elif isinstance(value, (list, tuple)):
+                parsed = [str(item) for item in value]
+            else:
+                raise ValueError(f"{self.name} must be a list or a comma-separated string")
+        elif self.kind in (int, float):
+            if isinstance(value, bool):
+                raise ValueError(f"{self.name} must be a number, got {value!r}")
+            try:
+                parsed = self.kind(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{self.name} must be {'an integer' if self.kind is int else 'a number'}, "
+                                 f"got {value!r}") from None
+            if self.minimum is not None and parsed < self.minimum:
+                raise ValueError(f"{self.name} must be at least {self.minimum}, got {parsed}")
+            if self.maximum is not None and parsed > self.maximum:
+                raise ValueError(f"{self.name} must be at most {self.maximum}, got {parsed}")
+        else:
+            parsed = str(value)
+
+        if self.choices:
+            match = next((choice for choice in self.choices if choice.lower() == parsed.lower()), None)
+            if match is None:
+                raise ValueError(f"{self.name} must be one of {', '.join(self.choices)}, got {parsed!r}")
+            parsed = match
+        if self.check:
+            self.check(parsed)
+        return parsed
+
+    def describe(self, value, source):
+        """Setting as returned by GET /api/config"""
+        return {
+            'name': self.name,
+            'type': self.kind.__name__,
+            'value': "***" if self.secret and value else value,
+            'default': None if self.secret else self.default,
+            'live': self.live,
+            'source': source,
+            'help': self.help
+        }
+
+def _page_multiple(value):
+    if value % 4:
+        raise ValueError(f"evidence_slot_kb must be a multiple of 4, got {value}")
+
+SETTINGS = [
+    # Database
+    Setting("db_host", str, "localhost"),
+    Setting("db_user", str, "root"),
+    Setting("db_password", str, "test", secret=True),
+    Setting("db_name", str, "attendance"),
+    Setting("db_pool_size", int, 5, live=True, minimum=1, maximum=32,
+            help="MySQL connections; a change swaps in a new pool, requests in flight finish on the old one"),
+
+    # HTTP
+    Setting("cors_origins", list, ["http://192.168.165.222:8080", "http://localhost:8080"],
+            help="frontend origins allowed to call the API"),
+    Setting("compress_min_size", int, 1024, live=True, minimum=0, help="smallest response body compressed, in bytes"),
+    Setting("compress_gzip_level", int, 5, live=True, minimum=1, maximum=9),
+    Setting("compress_brotli_quality", int, 4, live=True, minimum=0, maximum=11),
+    Setting("json_encoder", str, "orjson", choices=("orjson", "json")),
+    Setting("admin_token", str, None, optional=True, secret=True,
+            help="bearer token for the admin endpoints; they are disabled without one"),
+
+    # Admission control
+    Setting("rate_limit_per_client", float, 20.0, live=True, minimum=0,
+            help="requests per second each client may make; 0 = no limit"),
+    Setting("rate_limit_burst", int, 40, live=True, minimum=1, help="requests a client may make at once after idling"),
+    Setting("stream_limit", int, 2, live=True, minimum=0, maximum=32, help="live camera feeds open at once"),
+    Setting("heavy_limit", int, 2, live=True, minimum=1, maximum=32,
+            help="attendance listings, archive and enrolment requests running at once"),
+    Setting("gate_late_ratio_limit", float, 0.2, live=True, minimum=0.01, maximum=1.0,
+            help="share of late frames above which the gate counts as overloaded"),
+    Setting("snapshot_max_age_overloaded", float, 5.0, live=True, minimum=0,
+            help="seconds a cached snapshot is reused while the gate is overloaded"),
+
+    # Camera and streaming
+    Setting("camera_width", int, 1280, minimum=160, maximum=4608),
+    Setting("camera_height", int, 720, minimum=120, maximum=2592),
+    Setting("jpeg_quality", int, 95, live=True, minimum=10, maximum=100, help="quality of snapshots and the live feed"),
+    Setting("stream_fps", float, 10.0, live=True, minimum=0.5, maximum=30, help="frame rate of the live feed"),
+
+    # Gate lanes, detection and identity
+    Setting("gate_lanes_file", str, "gate_lanes.json", help="lane wiring and timings; live timings are reloaded"),
+    Setting("barcode_decoder", str, "auto",
+            help='QR decoder backend (auto, zbar, zxing, opencv, opencv-aruco) or a fallback chain such as "zbar,zxing"'),
+    Setting("face_detector", str, "auto", choices=("auto", "haar", "lbp", "yunet", "dnn")),
+    Setting("face_detection_scale", float, None, live=True, minimum=0.1, maximum=1.0, optional=True,
+            help="downscale factor before face detection; empty for the backend's default"),
+    Setting("detection_workers", int, 0, minimum=0, maximum=8),
+    Setting("face_index_dir", str, "face_index"),
+    Setting("face_match_required", bool, False, live=True),
+    Setting("face_match_threshold", float, None, live=True, minimum=0.0, maximum=1.0, optional=True,
+            help="minimum similarity for a face match; empty for the model's recommended threshold"),
+
+    # Load governor
+    Setting("governor_enabled", bool, True, live=True,
+            help="step detection, frame rate and stream quality down when the Pi runs hot or busy"),
+    Setting("thermal_sensor_file", str, "/sys/class/thermal/thermal_zone0/temp", live=True,
+            help="temperature in millidegrees; point at a plain file to simulate the sensor"),
+    Setting("governor_interval", float, 5.0, live=True, minimum=1, maximum=60, help="seconds between checks"),
+    Setting("governor_temp_high", float, 75.0, live=True, minimum=40, maximum=95,
+            help="SoC temperature in °C above which the pipeline steps down"),
+    Setting("governor_temp_critical", float, 82.0, live=True, minimum=40, maximum=100,
+            help="SoC temperature in °C that goes straight to the lowest tier"),
+    Setting("governor_cpu_high", float, 0.9, live=True, minimum=0.1, maximum=1.0,
+            help="share of CPU time busy above which the pipeline steps down"),
+    Setting("governor_frame_ms", float, 150.0, live=True, minimum=10,
+            help="time a lane may spend on a frame before the pipeline steps down"),
+    Setting("governor_recover_after", float, 60.0, live=True, minimum=5,
+            help="seconds of normal load before stepping back up one tier"),
+
+    # Decision evidence
+    Setting("evidence_dir", str, "evidence"),
+    Setting("evidence_slots", int, 1000, minimum=0, maximum=100000,
+            help="decision records kept on disk, each in one slot; 0 = none"),
+    Setting("evidence_slot_kb", int, 64, minimum=8, maximum=1024, check=_page_multiple,
+            help="slot size in KB, a multiple of 4; disk use is slots x slot size"),
+    Setting("evidence_thumbnail_width", int, 320, live=True, minimum=80, maximum=1280),
+    Setting("evidence_jpeg_quality", int, 70, live=True, minimum=30, maximum=95),
+
+    # Logging
+    Setting("log_file", str, "api_server.log"),
+    Setting("log_level", str, "INFO", live=True, choices=("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")),
+    Setting("log_levels", str, "", live=True, check=parse_levels, help='per-subsystem levels, e.g. "gate_lane=DEBUG,werkzeug=WARNING"'),
+    Setting("log_format", str, "text", choices=("text", "json")),
+    Setting("event_log_file", str, "gate_events.log"),
+    Setting("log_max_bytes", int, 10 * 1024 * 1024, minimum=1024),
+    Setting("log_backup_count", int, 5, minimum=0),
+    Setting("log_rotate_when", str, None, optional=True),
+
+    # Supabase and sync
+    Setting("supabase_credentials_file", str, "supabase_credentials.json"),
+    Setting("supabase_pool_size", int, 4, minimum=1, maximum=32),
+    Setting("supabase_connect_timeout", float, 3.05, live=True, minimum=0.1),
+    Setting("supabase_read_timeout", float, 10.0, live=True, minimum=0.1),
+    Setting("supabase_retries", int, 2, minimum=0, maximum=10),
+    Setting("supabase_health_ttl", float, 30.0, live=True, minimum=1, help="seconds a health probe result is reused"),
+    Setting("sync_batch_size", int, 500, live=True, minimum=1, maximum=5000),
+    Setting("sync_interval", float, 300.0, live=True, minimum=5),
+    Setting("sync_debounce", float, 2.0, live=True, minimum=0),
+    Setting("sync_pull", bool, True, live=True),
+
+    # Reports and archive
+    Setting("rollup_compaction_hour", int, 2, minimum=0, maximum=23),
+    Setting("rollup_reconcile_days", int, 7, minimum=1),
+    Setting("attendance_retention_months", int, 12, minimum=1),
+    Setting("attendance_partitioning", bool, False),
+    Setting("archive_dir", str, "archive"),
+    Setting("archive_format", str, "csv", choices=("csv", "parquet")),
+
+    # This module
+    Setting("config_watch_interval", float, 2.0, minimum=0, help="seconds between checks of the config files; 0 = off")
+]
+
+SETTINGS_BY_NAME = {setting.name: setting for setting in SETTINGS}
+
+class ServerConfig:
+    """Validated setting values with change notification"""
+
+    def __init__(self, path=None, environ=None):
+        self.environ = os.environ if environ is None else environ
+        self.path = path or self.environ.get("SERVER_CONFIG_FILE", DEFAULT_CONFIG_FILE)
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.watched = []
+        self.values, self.sources = self._load()
+        self.loaded = dict(self.values)  # As last read from the file and environment
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def _read_file(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            settings = json.load(f)
+        if not isinstance(settings, dict):
+            raise ValueError(f"{self.path} must contain a JSON object")
+        return settings
+
+    def _load(self):
+        """Values and their sources from defaults, file and environment; raises ValueError listing every problem"""
+        values = {setting.name: setting.default for setting in SETTINGS}
+        sources = {setting.name: "default" for setting in SETTINGS}
+        problems = []
+        for name, value in self._read_file().items():
+            setting = SETTINGS_BY_NAME.get(name)
+            if setting is None:
+                problems.append(f"unknown setting '{name}' in {self.path}")
+                continue
+            try:
+                values[name] = setting.parse(value)
+                sources[name] = "file"
+            except ValueError as e:
+                problems.append(str(e))
+        for setting in SETTINGS:
+            if setting.env in self.environ:
+                try:
+                    values[setting.name] = setting.parse(self.environ[setting.env])
+                    sources[setting.name] = "env"
+                except ValueError as e:
+                    problems.append(f"{e} (from ${setting.env})")
+        if problems:
+            raise ValueError("Invalid configuration: " + "; ".join(problems))
+        return values, sources
+
+    def on_change(self, names, callback):
+        """Call callback(config, changed_names) after any of the named live settings changes"""
+        self.listeners.append((set(names), callback))
+
+    def update(self, changes, source="api"):
+        """Validate and apply live settings; returns the names whose value changed
+
+        Nothing is applied if any value is invalid or a setting is not live.
+        """
+        parsed = {}
+        problems = []
+        for name, value in changes.items():
+            setting = SETTINGS_BY_NAME.get(name)
+            if setting is None:
+                problems.append(f"unknown setting '{name}'")
+            elif not setting.live:
+                problems.append(f"{name} cannot change while the server runs; set it in {self.path} and restart")
+            else:
+                try:
+                    parsed[name] = setting.parse(value)
+                except ValueError as e:
+                    problems.append(str(e))
+        if problems:
+            raise ValueError("; ".join(problems))
+
+        with self.lock:
+            changed = {name for name, value in parsed.items() if self.values[name] != value}
+            for name in changed:
+                self.values[name] = parsed[name]
+                self.sources[name] = source
+        if changed:
+            logger.info(f"Settings changed by {source}: " + ", ".join(
+                f"{name}={'***' if SETTINGS_BY_NAME[name].secret else self.values[name]}" for name in sorted(changed)))
+            self._notify(changed)
+        return changed
+
+    def _notify(self, changed):
+        for names, callback in self.listeners:
+            if names & changed:
+                try:
+                    callback(self, names & changed)
+                except Exception as e:
+                    logger.error(f"Could not apply {', '.join(sorted(names & changed))}: {e}")
+
+    def reload(self):
+        """Re-read the file and apply the live settings edited since it was last read
+
+        Settings changed through the API keep their value unless the file
+        changes them too. Edited settings that are not live are logged.
+        """
+        values, _ = self._load()
+        live = {}
+        for setting in SETTINGS:
+            name = setting.name
+            if values[name] == self.loaded[name]:
+                continue
+            if setting.live:
+                live[name] = values[name]
+            else:
+                logger.warning(f"{name} changed in {self.path}; it takes effect after a restart")
+        self.loaded = values
+        return self.update(live, source="file")
+
+    def snapshot(self):
+        """Every setting with its value and where it came from; secrets are masked"""
+        return [setting.describe(self.values[setting.name], self.sources[setting.name]) for setting in SETTINGS]
+
+    def watch(self, path, callback):
+        """Also call callback() when another file changes (checked by the watcher thread)"""
+        self.watched.append([path, _mtime(path), callback])
+
+    def start_watching(self):
+        """Reload the config file, and run the other watched callbacks, when their files change"""
+        interval = self.values["config_watch_interval"]
+        if not interval:
+            return
+        self.watched.insert(0, [self.path, _mtime(self.path), self.reload])
+        threading.Thread(target=self._watch_loop, args=(interval,), name="config-watch", daemon=True).start()
+
+    def _watch_loop(self, interval):
+        event = threading.Event()
+        while not event.wait(interval):
+            for entry in self.watched:
+                path, last, callback = entry
+                current = _mtime(path)
+                if current == last:
+                    continue
+                entry[1] = current
+                logger.info(f"{path} changed, reloading")
+                try:
+                    callback()
+                except (OSError, ValueError) as e:
+                    # Keep running on the previous settings until the file is fixed
+                    logger.error(f"Ignoring the changes to {path}: {e}")
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Snapshot Cache Module
+
+This module provides the SnapshotCache class, which serves the camera snapshot
+and live feed endpoints from the frames the gate lanes capture anyway. Each
+lane's latest frame is JPEG-encoded at most once per max_age, however many
+browsers are watching, and the endpoints never open the camera or run
+detection themselves.
+
+The encoded frame is stored once, already framed as a part of the
+multipart/x-mixed-replace feed, so a feed sends the same bytes object to every
+client instead of building a new part per client per frame. The plain JPEG is
+a view into the same bytes.
+"""
+
+import time
+import threading
+from collections import namedtuple
+import cv2
+
+# jpeg is a memoryview of the image inside part
+Snapshot = namedtuple("Snapshot", ["jpeg", "part", "sequence", "captured_at", "encoded_at"])
+
+FEED_BOUNDARY = "frame"
+PART_HEADER = f"--{FEED_BOUNDARY}\r\nContent-Type: image/jpeg\r\n\r\n".encode()
+PART_TRAILER = b"\r\n"
+
+class SnapshotCache:
+    """Latest JPEG per lane, shared by all snapshot and feed requests"""
+
+    def __init__(self, max_age=0.5):
+        self.max_age = max_age  # Seconds a JPEG is reused even if the lane has a newer frame
+        self.snapshots = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def _lane_lock(self, lane_id):
+        with self.lock:
+            return self.locks.setdefault(lane_id, threading.Lock())
+
+    def get(self, lane, quality, max_age=None):
+        """Snapshot of the lane's latest frame, or None before the lane has captured one
+
+        A cached JPEG is returned while it is younger than max_age or the lane
+        has no newer frame; otherwise one request encodes the new frame while
+        the others wait for it.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        snapshot = self.snapshots.get(lane.lane_id)
+        if self._fresh(snapshot, lane, max_age):
+            return snapshot
+        with self._lane_lock(lane.lane_id):
+            snapshot = self.snapshots.get(lane.lane_id)
+            if self._fresh(snapshot, lane, max_age):
+                return snapshot
+            # The lane does not write into the frame while it is held
+            with lane.frame_buffers.hold_latest() as (frame, sequence, captured_at):
+                if frame is None:
+                    return snapshot
+                ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                return snapshot
+            # The only copy of the encoded image: straight into the feed part
+            part = b"".join((PART_HEADER, buffer, PART_TRAILER))
+            jpeg = memoryview(part)[len(PART_HEADER):len(part) - len(PART_TRAILER)]
+            snapshot = Snapshot(jpeg, part, sequence, captured_at, time.monotonic())
+            self.snapshots[lane.lane_id] = snapshot
+            return snapshot
+
+    @staticmethod
+    def _fresh(snapshot, lane, max_age):
+        if snapshot is None:
+            return False
+        return snapshot.sequence == lane.frame_buffers.latest_sequence() or time.monotonic() - snapshot.encoded_at < max_age
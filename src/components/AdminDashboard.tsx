@@ -1,5 +1,5 @@
 
-import { useState, useEffect } from "react";
+import { useState } from "react";
 import { Users, PlusCircle, Pencil, Trash, Search, AlertTriangle } from "lucide-react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Table, TableHeader, TableBody, TableHead, TableRow, TableCell } from "@/components/ui/table";
@@ -15,6 +15,8 @@ import {
 } from "@/components/ui/dialog";
 import { Label } from "@/components/ui/label";
 import { API_ENDPOINTS, buildApiUrl } from "@/config/api";
+import { useStudentSearch, STUDENT_PAGE_SIZE } from "@/hooks/use-student-search";
+import StudentPager from "./StudentPager";
 
 // Remove this line
 // import { syncDataToSupabase } from "@/lib/syncData";
@@ -29,8 +31,8 @@ interface Student {
 }
 
 const AdminDashboard = () => {
-  const [students, setStudents] = useState<Student[]>([]);
   const [searchTerm, setSearchTerm] = useState("");
+  const [page, setPage] = useState(0);
   const [isDialogOpen, setIsDialogOpen] = useState(false);
   const [isDeleteDialogOpen, setIsDeleteDialogOpen] = useState(false);
   const [currentStudent, setCurrentStudent] = useState<Student | null>(null);
@@ -42,41 +44,15 @@ const AdminDashboard = () => {
     email: ""  // Add this line
   });
 
-  useEffect(() => {
-    fetchStudents();
-  }, []);
-
-  const fetchStudents = async () => {
-    try {
-      const response = await fetch(buildApiUrl(API_ENDPOINTS.STUDENTS));
-      if (response.ok) {
-        const data = await response.json();
-        
-        // Validate data is an array before processing
-        if (Array.isArray(data)) {
-          const validatedStudents = data.map((student: any) => ({
-            id: student.id ? student.id.toString() : 'unknown',
-            name: typeof student.name === 'string' ? student.name : 'Unknown',
-            studentId: typeof student.rollno === 'string' ? student.rollno : 'N/A',
-            course: typeof student.course === 'string' ? student.course : "",
-            dob: typeof student.dob === 'string' ? student.dob : "",
-            email: typeof student.email === 'string' ? student.email : ""  // Add this line
-          }));
-          setStudents(validatedStudents);
-          console.log("Fetched students:", validatedStudents); // Add this line for debugging
-        } else {
-          console.error("Invalid students data format: expected an array");
-          setStudents([]);
-        }
-      } else {
-        console.error("Failed to fetch students:", response.statusText);
-        setStudents([]);
-      }
-    } catch (error) {
-      console.error("Error fetching students:", error);
-      setStudents([]);
-    }
-  };
+  const { students: matches, total, error, refresh: fetchStudents } = useStudentSearch(searchTerm, page);
+  const students: Student[] = matches.map(student => ({
+    id: student.id,
+    name: student.name,
+    studentId: student.rollno,
+    course: student.course,
+    dob: student.dob,
+    email: student.email
+  }));
 
   const handleInputChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     const { name, value } = e.target;
@@ -86,12 +62,6 @@ const AdminDashboard = () => {
     }));
   };
 
-  const filteredStudents = students.filter(student => 
-    student.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    student.studentId.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    student.course.toLowerCase().includes(searchTerm.toLowerCase())
-  );
-
   const openAddDialog = () => {
     setCurrentStudent(null);
     setFormData({
@@ -209,7 +179,10 @@ const AdminDashboard = () => {
                 <Input
                   placeholder="Search students..."
                   value={searchTerm}
-                  onChange={(e) => setSearchTerm(e.target.value)}
+                  onChange={(e) => {
+                    setSearchTerm(e.target.value);
+                    setPage(0);
+                  }}
                   className="pl-8 h-9 w-full sm:w-[200px]"
                 />
               </div>
@@ -252,8 +225,8 @@ const AdminDashboard = () => {
                 </TableRow>
               </TableHeader>
               <TableBody>
-                {filteredStudents.length > 0 ? (
-                  filteredStudents.map((student) => (
+                {students.length > 0 ? (
+                  students.map((student) => (
                     <TableRow key={student.id}>
                       <TableCell className="font-medium">{student.name}</TableCell>
                       <TableCell>{student.studentId}</TableCell>
@@ -279,7 +252,7 @@ const AdminDashboard = () => {
                       </TableCell>
                     </TableRow>
                   ))
-                ) : students.length === 0 ? (
+                ) : error ? (
                   <TableRow>
                     <TableCell colSpan={5} className="text-center py-4 text-muted-foreground">
                       <AlertTriangle className="h-5 w-5 mx-auto mb-2" />
@@ -296,6 +269,7 @@ const AdminDashboard = () => {
               </TableBody>
             </Table>
           </div>
+          <StudentPager page={page} pageSize={STUDENT_PAGE_SIZE} total={total} onPageChange={setPage} />
         </CardContent>
       </Card>
 
@@ -16,6 +16,8 @@ import { Badge } from "@/components/ui/badge";
 // Fix duplicate imports - use only one import statement
 import { buildApiUrl, API_ENDPOINTS, DATA_SOURCE } from '../config/api';
 import { fetchAttendance } from '../integrations/supabase';
+import { useStudentSearch, STUDENT_PAGE_SIZE } from "@/hooks/use-student-search";
+import StudentPager from "./StudentPager";
 
 interface Student {
   id: string;
@@ -38,6 +40,7 @@ interface AttendanceRecord {
 const AttendanceTable = () => {
   const [attendanceData, setAttendanceData] = useState<AttendanceRecord[]>([]);
   const [searchTerm, setSearchTerm] = useState("");
+  const [page, setPage] = useState(0);
   const [statusFilter, setStatusFilter] = useState<Record<string, boolean>>({
     present: true,
     absent: true,
@@ -48,7 +51,18 @@ const AttendanceTable = () => {
     "partially verified": true,
     none: true,
   });
-  const [students, setStudents] = useState<Student[]>([]);
+  // The roster is paged like the students table and changes rarely, so it is
+  // refreshed less often than the attendance
+  const { students: roster, total: rosterTotal } = useStudentSearch(searchTerm, page, STUDENT_PAGE_SIZE, 30000);
+  // Only a roster that fits on one page tells which records have no student
+  const rosterComplete = rosterTotal <= STUDENT_PAGE_SIZE;
+  const students: Student[] = roster.map(student => ({
+    id: student.id,
+    name: student.name,
+    rollno: student.rollno,
+    studentId: student.rollno,
+    course: student.course
+  }));
   // Add missing loading state
   const [loading, setLoading] = useState(false);
   
@@ -89,44 +103,11 @@ const AttendanceTable = () => {
     }
   };
   
-  // Define fetchStudents function
-  const fetchStudents = async () => {
-    try {
-      const response = await fetch(buildApiUrl(API_ENDPOINTS.STUDENTS));
-      if (response.ok) {
-        const rawData = await response.json();
-        
-        if (Array.isArray(rawData)) {
-          const validatedStudents = rawData.map((student: any) => ({
-            id: student.id ? student.id.toString() : 'unknown',
-            name: typeof student.name === 'string' ? student.name : 'Unknown',
-            rollno: typeof student.rollno === 'string' ? student.rollno : 'N/A',
-            studentId: typeof student.rollno === 'string' ? student.rollno : 
-                       typeof student.studentId === 'string' ? student.studentId : 'N/A',
-            course: typeof student.course === 'string' ? student.course : ""
-          }));
-          setStudents(validatedStudents);
-        } else {
-          console.error("Invalid students data format: expected an array");
-          setStudents([]);
-        }
-      } else {
-        console.error("Failed to fetch students:", response.statusText);
-        setStudents([]);
-      }
-    } catch (error) {
-      console.error("Error fetching students:", error);
-      setStudents([]);
-    }
-  };
-  
   useEffect(() => {
     // Call the fetchAttendanceData function defined above
     fetchAttendanceData();
-    fetchStudents();
     const interval = setInterval(() => {
       fetchAttendanceData();
-      fetchStudents();
     }, 5000); // Change from 10000 to 5000 for more frequent updates
     return () => clearInterval(interval);
   }, []);
@@ -147,9 +128,10 @@ const AttendanceTable = () => {
                           attendanceRecord?.status === 'proxy' ? 'partially verified' : 'none'
     };
   }),
-  // Add any attendance records that don't match existing students
+  // Add any attendance records that don't match existing students; on a paged
+  // roster their students are on another page
   ...attendanceData
-    .filter(record => !students.some(s => 
+    .filter(record => rosterComplete && !students.some(s => 
       s.studentId === record.studentId || s.rollno === record.studentId
     ))
     .map(record => ({
@@ -164,10 +146,6 @@ const AttendanceTable = () => {
     }))
   ];
 
-  console.log('Attendance data from API:', attendanceData);
-  console.log('Students data from API:', students);
-  console.log('Merged data:', mergedData);
-
   const filteredData = mergedData.filter((record) => {
     const matchesSearch =
       record.studentName.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -196,7 +174,10 @@ const AttendanceTable = () => {
               <Input
                 placeholder="Search student..."
                 value={searchTerm}
-                onChange={(e) => setSearchTerm(e.target.value)}
+                onChange={(e) => {
+                  setSearchTerm(e.target.value);
+                  setPage(0);
+                }}
                 className="pl-8 h-9 w-full sm:w-[200px]"
               />
             </div>
@@ -361,6 +342,7 @@ const AttendanceTable = () => {
             </TableBody>
           </Table>
         </div>
+        <StudentPager page={page} pageSize={STUDENT_PAGE_SIZE} total={rosterTotal} onPageChange={setPage} />
       </CardContent>
     </Card>
   );
@@ -0,0 +1,43 @@
+import { ChevronLeft, ChevronRight } from "lucide-react";
+import { Button } from "@/components/ui/button";
+
+interface StudentPagerProps {
+  page: number;
+  pageSize: number;
+  total: number;
+  onPageChange: (page: number) => void;
+}
+
+const StudentPager = ({ page, pageSize, total, onPageChange }: StudentPagerProps) => {
+  if (total <= pageSize) {
+    return null;
+  }
+  const first = page * pageSize + 1;
+  const last = Math.min(total, (page + 1) * pageSize);
+
+  return (
+    <div className="flex items-center justify-end gap-2 px-4 py-2 text-sm text-muted-foreground">
+      <span>{first}–{last} of {total}</span>
+      <Button
+        variant="ghost"
+        size="icon"
+        className="h-8 w-8"
+        disabled={page === 0}
+        onClick={() => onPageChange(page - 1)}
+      >
+        <ChevronLeft className="h-4 w-4" />
+      </Button>
+      <Button
+        variant="ghost"
+        size="icon"
+        className="h-8 w-8"
+        disabled={last >= total}
+        onClick={() => onPageChange(page + 1)}
+      >
+        <ChevronRight className="h-4 w-4" />
+      </Button>
+    </div>
+  );
+};
+
+export default StudentPager;
@@ -1,70 +1,17 @@
-import { useState, useEffect } from "react";
+import { useState } from "react";
 import { Users, Search, PlusCircle, Pencil, Trash } from "lucide-react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Table, TableHeader, TableBody, TableHead, TableRow, TableCell } from "@/components/ui/table";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
-import { buildApiUrl, API_ENDPOINTS } from '../config/api';
-
-interface Student {
-  id: string;
-  name: string;
-  rollno: string;
-  course: string;
-  dob: string;
-  email: string;
-}
+import { useStudentSearch, STUDENT_PAGE_SIZE } from "@/hooks/use-student-search";
+import StudentPager from "./StudentPager";
 
 const StudentsTable = () => {
-  const [students, setStudents] = useState<Student[]>([]);
   const [searchTerm, setSearchTerm] = useState("");
-  const [loading, setLoading] = useState(false);
-
-  const fetchStudents = async () => {
-    setLoading(true);
-    try {
-      const response = await fetch(buildApiUrl(API_ENDPOINTS.STUDENTS));
-      if (response.ok) {
-        const data = await response.json();
-        
-        if (Array.isArray(data)) {
-          const validatedStudents = data.map((student: any) => ({
-            id: student.id ? student.id.toString() : 'unknown',
-            name: typeof student.name === 'string' ? student.name : 'Unknown',
-            rollno: typeof student.rollno === 'string' ? student.rollno : 'N/A',
-            course: typeof student.course === 'string' ? student.course : "",
-            dob: typeof student.dob === 'string' ? student.dob : "",
-            email: typeof student.email === 'string' ? student.email : ""
-          }));
-          setStudents(validatedStudents);
-        } else {
-          console.error("Invalid students data format: expected an array");
-          setStudents([]);
-        }
-      } else {
-        console.error("Failed to fetch students:", response.statusText);
-        setStudents([]);
-      }
-    } catch (error) {
-      console.error("Error fetching students:", error);
-      setStudents([]);
-    } finally {
-      setLoading(false);
-    }
-  };
-
-  useEffect(() => {
-    fetchStudents();
-    // Refresh data every 10 seconds
-    const interval = setInterval(fetchStudents, 10000);
-    return () => clearInterval(interval);
-  }, []);
-
-  const filteredStudents = students.filter(student => 
-    student.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    student.rollno.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    student.course.toLowerCase().includes(searchTerm.toLowerCase())
-  );
+  const [page, setPage] = useState(0);
+  // Refresh the current page every 10 seconds
+  const { students, total, loading } = useStudentSearch(searchTerm, page, STUDENT_PAGE_SIZE, 10000);
 
   return (
     <Card className="shadow-md">
@@ -81,7 +28,10 @@ const StudentsTable = () => {
               <Input
                 placeholder="Search students..."
                 value={searchTerm}
-                onChange={(e) => setSearchTerm(e.target.value)}
+                onChange={(e) => {
+                  setSearchTerm(e.target.value);
+                  setPage(0);
+                }}
                 className="pl-8 h-9 w-full sm:w-[200px]"
               />
             </div>
@@ -103,14 +53,14 @@ const StudentsTable = () => {
               </TableRow>
             </TableHeader>
             <TableBody>
-              {loading ? (
+              {loading && students.length === 0 ? (
                 <TableRow>
                   <TableCell colSpan={7} className="text-center py-4">
                     Loading students data...
                   </TableCell>
                 </TableRow>
-              ) : filteredStudents.length > 0 ? (
-                filteredStudents.map((student) => (
+              ) : students.length > 0 ? (
+                students.map((student) => (
                   <TableRow key={student.id}>
                     <TableCell>{student.id}</TableCell>
                     <TableCell>{student.rollno}</TableCell>
@@ -140,6 +90,7 @@ const StudentsTable = () => {
             </TableBody>
           </Table>
         </div>
+        <StudentPager page={page} pageSize={STUDENT_PAGE_SIZE} total={total} onPageChange={setPage} />
       </CardContent>
     </Card>
   );
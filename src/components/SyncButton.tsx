@@ -32,7 +32,7 @@ const SyncButton = () => {
         setLastSync(new Date());
         toast({
           title: "Sync Successful",
-          description: `Successfully synced ${result.data?.studentsCount || 0} students and ${result.data?.attendanceCount || 0} attendance records to Supabase.`,
+          description: `Sent ${result.data?.pushed || 0} changed records to Supabase and applied ${result.data?.applied || 0} changes from it.`,
           variant: "default",
         });
       } else {
@@ -26,7 +26,8 @@ export const API_ENDPOINTS = {
   ATTENDANCE: "/api/attendance",
   STATS: "/api/stats",
   STUDENTS: "/api/students",
-  HEALTH: "/api/health"
+  HEALTH: "/api/health",
+  SYNC: "/api/sync"
 };
 
 // Data source configuration
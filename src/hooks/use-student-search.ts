@@ -0,0 +1,91 @@
+import { useCallback, useEffect, useState } from "react";
+import { buildApiUrl, API_ENDPOINTS } from "@/config/api";
+
+export interface StudentRecord {
+  id: string;
+  name: string;
+  rollno: string;
+  course: string;
+  dob: string;
+  email: string;
+}
+
+interface StudentPage {
+  students: any[];
+  total: number;
+  offset: number;
+  limit: number;
+}
+
+export const STUDENT_PAGE_SIZE = 50;
+
+// Wait this long after the last keystroke before searching
+const SEARCH_DEBOUNCE_MS = 250;
+
+const toStudentRecord = (student: any): StudentRecord => ({
+  id: student.id ? student.id.toString() : 'unknown',
+  name: typeof student.name === 'string' ? student.name : 'Unknown',
+  rollno: typeof student.rollno === 'string' ? student.rollno : 'N/A',
+  course: typeof student.course === 'string' ? student.course : "",
+  dob: typeof student.dob === 'string' ? student.dob : "",
+  email: typeof student.email === 'string' ? student.email : ""
+});
+
+// Searches the roster on the API server one page at a time, instead of
+// downloading every student and filtering in the browser
+export function useStudentSearch(query: string, page: number, pageSize = STUDENT_PAGE_SIZE, refreshMs?: number) {
+  const [students, setStudents] = useState<StudentRecord[]>([]);
+  const [total, setTotal] = useState(0);
+  const [loading, setLoading] = useState(false);
+  const [error, setError] = useState(false);
+  const [debouncedQuery, setDebouncedQuery] = useState(query.trim());
+
+  useEffect(() => {
+    const timeoutId = setTimeout(() => setDebouncedQuery(query.trim()), SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timeoutId);
+  }, [query]);
+
+  const refresh = useCallback(async (signal?: AbortSignal) => {
+    const params = new URLSearchParams({
+      q: debouncedQuery,
+      offset: String(page * pageSize),
+      limit: String(pageSize)
+    });
+    setLoading(true);
+    try {
+      const response = await fetch(buildApiUrl(`${API_ENDPOINTS.STUDENTS}?${params}`), { signal });
+      if (!response.ok) {
+        throw new Error(`Failed to fetch students: ${response.statusText}`);
+      }
+      const data: StudentPage = await response.json();
+      if (!Array.isArray(data.students)) {
+        throw new Error("Invalid students data format: expected a page of students");
+      }
+      setStudents(data.students.map(toStudentRecord));
+      setTotal(data.total);
+      setError(false);
+    } catch (error) {
+      if (error instanceof DOMException && error.name === "AbortError") {
+        return;  // A newer search replaced this one
+      }
+      console.error("Error fetching students:", error);
+      setStudents([]);
+      setTotal(0);
+      setError(true);
+    } finally {
+      setLoading(false);
+    }
+  }, [debouncedQuery, page, pageSize]);
+
+  useEffect(() => {
+    const controller = new AbortController();
+    refresh(controller.signal);
+    const interval = refreshMs ? setInterval(() => refresh(controller.signal), refreshMs) : undefined;
+    return () => {
+      controller.abort();
+      if (interval) clearInterval(interval);
+    };
+  }, [refresh, refreshMs]);
+
+  return { students, total, loading, error, refresh };
+}
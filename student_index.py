@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Student Index Module
+
+This module provides the StudentIndex class, an in-memory copy of the student
+roster that answers the admin UI's searches without a database query or
+shipping the whole roster to the browser.
+
+Three structures are kept in step with every student write:
+
+- the roster in name order, so an unfiltered page is a slice;
+- one lowercased line of the fields per student, in the same order;
+- a sorted list of (token, student) pairs over the words of the name, the
+  roll number, the course and the email address, so a prefix lookup is two
+  binary searches and a slice.
+
+Query words of three characters or more also match anywhere inside the
+fields, through a substring test over those lines. For tens of thousands
+of students the scan takes milliseconds, without the memory a trigram index
+would take on the Pi. Students whose every query word matched the start of
+a word come first, then the other matches, each in name order.
+"""
+
+import re
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger("student_index")
+
+FIELDS = ("name", "rollno", "course", "email")
+MIN_SUBSTRING = 3  # Shorter query words only match the start of a word
+_WORD = re.compile(r"[^\W_]+")
+
+def _fold(value):
+    return str(value or "").casefold()
+
+def _line(student):
+    # Fields are joined with a tab, which never occurs in a query word
+    return "\t".join(_fold(student.get(field)) for field in FIELDS)
+
+def _tokens(student):
+    """Words of every field, the whole fields and the email's local part"""
+    tokens = set()
+    for field in FIELDS:
+        value = _fold(student.get(field))
+        if not value:
+            continue
+        tokens.add(value)
+        tokens.update(_WORD.findall(value))
+    email = _fold(student.get("email"))
+    if "@" in email:
+        tokens.add(email.split("@", 1)[0])
+    return tokens
+
+class StudentIndex:
+    """Searchable in-memory roster: prefix index plus substring scan, in name order"""
+
+    def __init__(self):
+        self.students = {}  # key -> student record as returned by the API
+        self.sort_keys = {}  # key -> (folded name, key)
+        self.order = []  # Sorted sort keys
+        self.prefixes = []  # Sorted (token, key)
+        self.tokens = {}  # key -> tokens of the student
+        self.lines = []  # Folded fields of each student, in the same order
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.students)
+
+    def load(self, students):
+        """Replace the roster; students are dicts with id, name, rollno, course and email"""
+        with self.lock:
+            self.students = {}
+            self.sort_keys = {}
+            self.tokens = {}
+            prefixes = []
+            for student in students:
+                key = str(student["id"])
+                self.students[key] = student
+                self.sort_keys[key] = (_fold(student.get("name")), key)
+                self.tokens[key] = _tokens(student)
+                prefixes.extend((token, key) for token in self.tokens[key])
+            self.order = sorted(self.sort_keys.values())
+            self.lines = [_line(self.students[key]) for _, key in self.order]
+            self.prefixes = sorted(prefixes)
+            self.loaded = True
+        logger.info(f"Student index loaded with {len(self.students)} student(s)")
+
+    def invalidate(self):
+        """Mark the roster as changed outside the API; the next request reloads it"""
+        self.loaded = False
+
+    def _remove(self, key):
+        if key not in self.students:
+            return
+        position = bisect.bisect_left(self.order, self.sort_keys.pop(key))
+        del self.order[position]
+        del self.lines[position]
+        for token in self.tokens.pop(key):
+            del self.prefixes[bisect.bisect_left(self.prefixes, (token, key))]
+        del self.students[key]
+
+    def _upsert(self, student):
+        """Add or replace a student; called with the lock held"""
+        key = str(student["id"])
+        self._remove(key)
+        self.students[key] = student
+        self.sort_keys[key] = (_fold(student.get("name")), key)
+        position = bisect.bisect_left(self.order, self.sort_keys[key])
+        self.order.insert(position, self.sort_keys[key])
+        self.lines.insert(position, _line(student))
+        self.tokens[key] = _tokens(student)
+        for token in self.tokens[key]:
+            bisect.insort(self.prefixes, (token, key))
+
+    def upsert(self, student):
+        """Add a student, or replace the one with the same id"""
+        with self.lock:
+            self._upsert(student)
+
+    def update(self, student_id, changes):
+        """Apply changed fields to an indexed student; False if it is not indexed"""
+        with self.lock:
+            current = self.students.get(str(student_id))
+            if current is None:
+                return False
+            # Read and write under one hold, so a concurrent update's fields are not lost
+            self._upsert({**current, **changes})
+            return True
+
+    def remove(self, student_id):
+        with self.lock:
+            self._remove(str(student_id))
+
+    def _prefix_matches(self, term):
+        start = bisect.bisect_left(self.prefixes, (term,))
+        end = bisect.bisect_left(self.prefixes, (term + "\U0010ffff",))
+        return {key for _, key in self.prefixes[start:end]}
+
+    def _substring_matches(self, term):
+        return {key for (_, key), line in zip(self.order, self.lines) if term in line}
+
+    def search(self, query="", offset=0, limit=50):
+        """(total matches, page of students) for a query; every word of the query must match"""
+        terms = _fold(query).split()
+        with self.lock:
+            if not terms:
+                page = self.order[offset:offset + limit]
+                return len(self.order), [self.students[key] for _, key in page]
+
+            prefix_all = None
+            matched = None
+            for term in terms:
+                prefix = self._prefix_matches(term)
+                found = prefix | self._substring_matches(term) if len(term) >= MIN_SUBSTRING else prefix
+                prefix_all = prefix if prefix_all is None else prefix_all & prefix
+                matched = found if matched is None else matched & found
+                if not matched:
+                    return 0, []
+            # Start-of-word matches first, both groups in name order
+            first = prefix_all & matched
+            ranked = [key for _, key in self.order if key in first]
+            if len(ranked) < len(matched):
+                ranked += [key for _, key in self.order if key in matched and key not in first]
+            return len(ranked), [self.students[key] for key in ranked[offset:offset + limit]]
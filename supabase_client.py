@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Supabase Client Module
+
+This module provides the SupabaseClient class, which sends all of the server's
+calls to the Supabase REST API through one pooled requests.Session. Connections
+are kept alive and reused, so a sync does not pay for a new TLS handshake, and
+transient gateway errors are retried with backoff. The health probe runs in the
+background and its result is cached, so /api/health never waits on the network.
+
+Credentials come from the SUPABASE_URL and SUPABASE_KEY environment variables
+or from a JSON file ({"url": ..., "key": ...}); they are not kept in the code.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import Histogram
+
+logger = logging.getLogger("supabase_client")
+
+SUPABASE_REQUEST_SECONDS = Histogram("supabase_request_seconds", "Supabase REST call latency", ["operation", "outcome"])
+
+def load_supabase_settings(path="supabase_credentials.json"):
+    """(url, key) from the environment, else from the JSON file; (None, None) if neither"""
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+    if (not url or not key) and path and os.path.exists(path):
+        with open(path) as f:
+            settings = json.load(f)
+        url = url or settings.get("url")
+        key = key or settings.get("key")
+    return url, key
+
+class SupabaseClient:
+    """Shared Supabase REST client; safe to use from the sync threads"""
+
+    def __init__(self, url, key, pool_size=4, connect_timeout=3.05, read_timeout=10, retries=2,
+                 health_ttl=30):
+        self.url = url.rstrip("/") if url else None
+        self.key = key
+        self.timeout = (connect_timeout, read_timeout)
+        self.health_ttl = health_ttl
+
+        self.session = requests.Session()
+        retry = Retry(total=retries, connect=retries, read=retries, backoff_factor=0.5,
+                      status_forcelist=(502, 503, 504), allowed_methods=None,  # upserts and deletes are idempotent
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if key:
+            self.session.headers.update({
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+                "Content-Type": "application/json"
+            })
+
+        # Cached health probe
+        self.healthy = None
+        self.health_checked = 0.0
+        self.health_lock = threading.Lock()
+        self.probing = False
+
+    @property
+    def configured(self):
+        return bool(self.url and self.key)
+
+    def _request(self, operation, method, table, **kwargs):
+        if not self.configured:
+            logger.warning(f"Supabase is not configured; skipping {operation} on {table}")
+            return None
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = self.session.request(method, f"{self.url}/rest/v1/{table}", timeout=self.timeout, **kwargs)
+            outcome = "ok" if response.status_code in (200, 201, 204, 206) else "failed"
+            # Any answer from the API shows it is reachable
+            self._record_health(response.status_code < 500)
+            return response
+        except requests.RequestException:
+            self._record_health(False)
+            raise
+        finally:
+            SUPABASE_REQUEST_SECONDS.labels(operation, outcome).observe(time.perf_counter() - start)
+
+    def upsert(self, table, data, on_conflict=None):
+        """Insert or merge rows; returns True on success"""
+        params = {"on_conflict": on_conflict} if on_conflict else None
+        response = self._request("upsert", "POST", table, json=data, params=params,
+                                 headers={"Prefer": "resolution=merge-duplicates"})
+        if response is None:
+            return False
+        if response.status_code in (200, 201, 204):
+            return True
+        logger.error(f"Supabase upsert into {table} failed ({response.status_code}): {response.text}")
+        return False
+
+    def select(self, table, params):
+        """Rows matching PostgREST query params, or None on failure"""
+        response = self._request("select", "GET", table, params=params)
+        if response is None:
+            return None
+        if response.status_code == 200:
+            return response.json()
+        logger.error(f"Supabase select from {table} failed ({response.status_code}): {response.text}")
+        return None
+
+    def delete(self, table, **filters):
+        """Delete rows matching PostgREST filters, e.g. delete("students", rollno="eq.R001")"""
+        response = self._request("delete", "DELETE", table, params=filters)
+        if response is None:
+            return False
+        if response.status_code in (200, 201, 204):
+            return True
+        logger.error(f"Supabase delete from {table} failed ({response.status_code}): {response.text}")
+        return False
+
+    def _record_health(self, healthy):
+        self.healthy = healthy
+        self.health_checked = time.monotonic()
+
+    def _probe(self):
+        try:
+            response = self.session.get(f"{self.url}/rest/v1/students", params={"select": "rollno", "limit": 1},
+                                        timeout=self.timeout)
+            self._record_health(response.status_code < 500)
+        except requests.RequestException as e:
+            logger.warning(f"Supabase health probe failed: {e}")
+            self._record_health(False)
+        finally:
+            self.probing = False
+
+    def health(self):
+        """Last known reachability (None until the first probe finishes); never blocks
+
+        When the cached result is older than health_ttl, a probe is started in
+        the background and the previous result is returned.
+        """
+        if not self.configured:
+            return False
+        if time.monotonic() - self.health_checked > self.health_ttl:
+            with self.health_lock:
+                if not self.probing:
+                    self.probing = True
+                    threading.Thread(target=self._probe, name="supabase-health", daemon=True).start()
+        return self.healthy
+
+    def close(self):
+        self.session.close()
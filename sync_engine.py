@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Sync Engine Module
+
+This module keeps Supabase in step with the local database incrementally.
+Every write to students or student_attendance also appends a row to the
+sync_changes log in the same transaction. The engine pushes the logged changes
+to Supabase in batches, sending only the current state of each changed row,
+and deletes exactly the log rows of a batch once Supabase has accepted it; a
+failed push leaves them in place. There is no high-water mark on the log ids:
+MySQL assigns an id when a row is inserted, not when its transaction commits,
+so a change with a lower id can appear after higher ones were read. It stays
+in the log until a later batch pushes it. It then pulls the rows
+changed remotely since the last pull, found through an updated_at column on
+the Supabase tables, and applies those that differ from the local copy. A sync
+therefore costs in proportion to the changes, not to the size of the tables.
+
+Local changes that are still waiting to be pushed win over remote ones.
+Deletes travel from the Pi to Supabase only, and archived attendance months are
+not pulled back.
+"""
+
+import time
+import json
+import logging
+import threading
+from datetime import datetime
+import attendance_rollups
+from attendance_rollups import as_date
+from metrics import Counter, Gauge
+
+logger = logging.getLogger("sync_engine")
+
+SYNC_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS sync_changes (
+      id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+      table_name VARCHAR(40) NOT NULL,
+      row_key VARCHAR(64) NOT NULL,
+      operation VARCHAR(6) NOT NULL DEFAULT 'upsert',
+      changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS sync_state (
+      name VARCHAR(60) NOT NULL PRIMARY KEY,
+      value VARCHAR(255) NOT NULL
+    )"""
+]
+
+# Tables in the order they are pushed: students before the attendance that refers to them
+STUDENTS = "students"
+ATTENDANCE = "student_attendance"
+ON_CONFLICT = {STUDENTS: "rollno", ATTENDANCE: "student_id,timestamp"}
+
+SYNC_QUEUE_DEPTH = Gauge("sync_queue_depth", "Local changes waiting to be pushed to Supabase")
+SYNC_ROWS = Counter("sync_rows_total", "Rows sent to or applied from Supabase", ["direction", "table"])
+
+class SyncError(Exception):
+    """A sync step failed; the high-water marks stay where they were"""
+
+def ensure_sync_tables(cursor):
+    """Create the change log; the first time, log every existing row so it is pushed once
+
+    Returns the number of rows logged.
+    """
+    for statement in SYNC_SCHEMA:
+        cursor.execute(statement)
+    # The "push" state only records that the initial full log was taken
+    if get_state(cursor, "push") is not None:
+        return 0
+    cursor.execute("INSERT INTO sync_changes (table_name, row_key, operation) "
+                   "SELECT 'students', rollno, 'upsert' FROM students")
+    logged = cursor.rowcount
+    cursor.execute("INSERT INTO sync_changes (table_name, row_key, operation) "
+                   "SELECT 'student_attendance', id, 'upsert' FROM student_attendance ORDER BY id")
+    logged += cursor.rowcount
+    set_state(cursor, "push", 0)
+    return logged
+
+def record_change(cursor, table, key, operation="upsert"):
+    """Log a change to one row in the caller's transaction"""
+    cursor.execute("INSERT INTO sync_changes (table_name, row_key, operation) VALUES (%s, %s, %s)",
+                   (table, str(key), operation))
+
+def get_state(cursor, name, default=None):
+    cursor.execute("SELECT value FROM sync_state WHERE name = %s", (name,))
+    row = cursor.fetchone()
+    return row[0] if row else default
+
+def set_state(cursor, name, value):
+    cursor.execute("INSERT INTO sync_state (name, value) VALUES (%s, %s) ON DUPLICATE KEY UPDATE value = %s",
+                   (name, str(value), str(value)))
+
+def _text(value):
+    """Column value as the string Supabase stores, for comparing and sending"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+def _quote(value):
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def _in_filter(values):
+    """PostgREST in.(...) filter with each value quoted"""
+    return f"in.({','.join(_quote(v) for v in values)})"
+
+def _after(columns, values):
+    """PostgREST or=(...) filter for rows sorting after values on columns (keyset pagination)"""
+    alternatives = []
+    for i, column in enumerate(columns):
+        terms = [f"{c}.eq.{_quote(v)}" for c, v in zip(columns[:i], values[:i])]
+        terms.append(f"{column}.gt.{_quote(values[i])}")
+        alternatives.append(terms[0] if len(terms) == 1 else f"and({','.join(terms)})")
+    return f"({','.join(alternatives)})"
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+def _counts(status):
+    """(present, proxy) contributed by an attendance status, as in the rollups"""
+    return (0, 1) if str(status).lower() == "proxy" else (1, 0)
+
+def remote_student(row):
+    rollno, name, course, dob, email = row
+    return {"rollno": rollno, "name": name, "course": course, "dob": _text(dob), "email": email}
+
+def remote_attendance(row):
+    _, student_id, day, timestamp, status, verification_method = row
+    return {
+        "student_id": student_id,
+        "date": _text(as_date(day)),
+        "timestamp": _text(timestamp).replace(" ", "T"),
+        "status": str(status).lower(),
+        "verification_method": verification_method
+    }
+
+class SyncEngine:
+    """Pushes the change log to Supabase and pulls remote changes back
+
+    connect returns a pooled database connection; floor, when given, returns
+    the oldest day still in the attendance table. on_pulled, when given, is
+    called with the table name after pulled rows changed local data.
+    """
+
+    def __init__(self, connect, client, batch_size=500, interval=300, debounce=2.0, pull=True, floor=None,
+                 on_pulled=None):
+        self.connect = connect
+        self.client = client
+        self.batch_size = batch_size
+        self.interval = interval
+        self.debounce = debounce
+        self.pull_enabled = pull
+        self.floor = floor
+        self.on_pulled = on_pulled
+
+        self.run_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.last_pull = 0.0
+        self.thread = None
+        self.progress = {
+            'state': 'idle',
+            'phase': None,
+            'table': None,
+            'pushed': 0,
+            'deleted': 0,
+            'pulled': 0,
+            'applied': 0,
+            'batches': 0,
+            'startedAt': None,
+            'finishedAt': None,
+            'lastSuccessAt': None,
+            'lastError': None
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self._loop, name="supabase-sync", daemon=True)
+        self.thread.start()
+
+    def notify(self):
+        """Called after a logged change is committed; the worker pushes it shortly"""
+        self.wake.set()
+
+    def _loop(self):
+        while True:
+            woken = self.wake.wait(self.interval)
+            if woken:
+                # Let a burst of writes land in the same batch
+                time.sleep(self.debounce)
+            self.wake.clear()
+            pull_due = time.monotonic() - self.last_pull >= self.interval
+            self.run(pull=self.pull_enabled and pull_due)
+
+    def trigger(self, pull=True):
+        """Start a sync in the background; False if one is already running"""
+        if self.run_lock.locked():
+            return False
+        threading.Thread(target=self.run, kwargs={'pull': pull}, name="supabase-sync-manual", daemon=True).start()
+        return True
+
+    def run(self, pull=True):
+        """Push pending changes, then pull remote ones; False if a sync was already running"""
+        if not self.run_lock.acquire(blocking=False):
+            return False
+        try:
+            self.progress.update(state='running', phase=None, table=None, pushed=0, deleted=0, pulled=0,
+                                 applied=0, batches=0, startedAt=datetime.now().isoformat(timespec="seconds"),
+                                 lastError=None)
+            if not self.client.configured:
+                raise SyncError("Supabase is not configured")
+            self.push()
+            if pull:
+                self.pull()
+                self.last_pull = time.monotonic()
+            self.progress['lastSuccessAt'] = datetime.now().isoformat(timespec="seconds")
+            if self.progress['pushed'] or self.progress['deleted'] or self.progress['applied']:
+                logger.info(f"Sync pushed {self.progress['pushed']} row(s), deleted {self.progress['deleted']} "
+                            f"and applied {self.progress['applied']} remote change(s)")
+        except Exception as e:
+            logger.error(f"Sync with Supabase failed: {e}")
+            self.progress['lastError'] = str(e)
+        finally:
+            self.progress.update(state='idle', phase=None, table=None,
+                                 finishedAt=datetime.now().isoformat(timespec="seconds"))
+            self.run_lock.release()
+            try:
+                self.pending()
+            except Exception:
+                pass
+        return True
+
+    def pending(self):
+        """Changes not yet pushed"""
+        db = self.connect()
+        cursor = db.cursor()
+        try:
+            cursor.execute("SELECT COUNT(*) FROM sync_changes")
+            count = cursor.fetchone()[0]
+            SYNC_QUEUE_DEPTH.set(count)
+            return count
+        finally:
+            cursor.close()
+            db.close()  # Return to pool
+
+    def status(self):
+        status = dict(self.progress)
+        try:
+            status['pending'] = self.pending()
+        except Exception as e:
+            status['pending'] = None
+            logger.warning(f"Could not count pending sync changes: {e}")
+        return status
+
+    # Push
+
+    def push(self):
+        self.progress['phase'] = 'push'
+        while True:
+            db = self.connect()
+            cursor = db.cursor()
+            try:
+                # Every row still in the log is pending, whatever order the ids committed in
+                cursor.execute("SELECT id, table_name, row_key, operation FROM sync_changes "
+                               "ORDER BY id LIMIT %s", (self.batch_size,))
+                changes = cursor.fetchall()
+                if not changes:
+                    return
+                # Only the latest operation on each row matters
+                latest = {}
+                for _, table, key, operation in changes:
+                    latest.pop((table, key), None)
+                    latest[(table, key)] = operation
+                for table in (STUDENTS, ATTENDANCE):
+                    self.progress['table'] = table
+                    upserts = [key for (t, key), op in latest.items() if t == table and op == "upsert"]
+                    deletes = [key for (t, key), op in latest.items() if t == table and op == "delete"]
+                    self._push_deletes(table, deletes)
+                    self._push_upserts(cursor, table, upserts)
+
+                # Only the rows read for this batch; a change committed meanwhile stays
+                ids = [change[0] for change in changes]
+                cursor.execute(f"DELETE FROM sync_changes WHERE id IN ({_placeholders(ids)})", ids)
+                db.commit()
+                self.progress['batches'] += 1
+            finally:
+                cursor.close()
+                db.close()  # Return to pool
+            if len(changes) < self.batch_size:
+                return
+
+    def _push_deletes(self, table, keys):
+        if not keys:
+            return
+        if table != STUDENTS:
+            # Attendance rows only leave the table when archived, which is not a remote delete
+            return
+        if not self.client.delete(STUDENTS, rollno=_in_filter(keys)):
+            raise SyncError(f"Deleting {len(keys)} row(s) from Supabase {table} failed")
+        self.progress['deleted'] += len(keys)
+        SYNC_ROWS.labels("delete", table).inc(len(keys))
+
+    def _push_upserts(self, cursor, table, keys):
+        if not keys:
+            return
+        if table == STUDENTS:
+            cursor.execute(f"SELECT rollno, name, course, dob, email FROM students "
+                           f"WHERE rollno IN ({_placeholders(keys)})", keys)
+            rows = [remote_student(row) for row in cursor.fetchall()]
+        else:
+            ids = [int(key) for key in keys]
+            cursor.execute(f"SELECT id, student_id, date, timestamp, status, verification_method "
+                           f"FROM student_attendance WHERE id IN ({_placeholders(ids)})", ids)
+            rows = [remote_attendance(row) for row in cursor.fetchall()]
+        # Rows deleted since the change was logged are skipped; their delete follows
+        if not rows:
+            return
+        if not self.client.upsert(table, rows, ON_CONFLICT[table]):
+            raise SyncError(f"Pushing {len(rows)} row(s) to Supabase {table} failed")
+        self.progress['pushed'] += len(rows)
+        SYNC_ROWS.labels("push", table).inc(len(rows))
+
+    # Pull
+
+    def pull(self):
+        self.progress['phase'] = 'pull'
+        self._pull_table(STUDENTS, "rollno,name,course,dob,email", ("rollno",), self._apply_students)
+        self._pull_table(ATTENDANCE, "student_id,date,timestamp,status,verification_method",
+                         ("student_id", "timestamp"), self._apply_attendance)
+
+    def _pull_table(self, table, columns, keys, apply):
+        """Page through remote rows in (updated_at, keys) order from the last row pulled"""
+        self.progress['table'] = table
+        order = ("updated_at",) + keys
+        while True:
+            db = self.connect()
+            cursor = db.cursor()
+            try:
+                state = get_state(cursor, f"pull:{table}")
+                params = {"select": f"{columns},updated_at", "order": ",".join(f"{c}.asc" for c in order),
+                          "limit": self.batch_size}
+                if state:
+                    params["or"] = _after(order, json.loads(state))
+                rows = self.client.select(table, params)
+                if rows is None:
+                    raise SyncError(f"Pulling {table} failed; the Supabase table needs an updated_at column")
+                if not rows:
+                    return
+
+                pending = self._pending_keys(cursor, table)
+                applied = apply(cursor, rows, pending)
+
+                set_state(cursor, f"pull:{table}", json.dumps([rows[-1][c] for c in order]))
+                db.commit()
+                self.progress['pulled'] += len(rows)
+                self.progress['applied'] += applied
+                self.progress['batches'] += 1
+                SYNC_ROWS.labels("pull", table).inc(applied)
+            finally:
+                cursor.close()
+                db.close()  # Return to pool
+            if applied and self.on_pulled:
+                self.on_pulled(table)
+            if len(rows) < self.batch_size:
+                return
+
+    def _pending_keys(self, cursor, table):
+        cursor.execute("SELECT row_key FROM sync_changes WHERE table_name = %s", (table,))
+        return {row[0] for row in cursor.fetchall()}
+
+    def _apply_students(self, cursor, rows, pending):
+        keys = [row["rollno"] for row in rows]
+        cursor.execute(f"SELECT rollno, name, course, dob, email FROM students "
+                       f"WHERE rollno IN ({_placeholders(keys)})", keys)
+        local = {row[0]: tuple(_text(value) for value in row) for row in cursor.fetchall()}
+
+        applied = 0
+        for row in rows:
+            rollno = row["rollno"]
+            if rollno in pending or not row.get("name"):
+                continue
+            dob = row.get("dob")[:10] if row.get("dob") else None
+            remote = (rollno, row["name"], row.get("course"), dob, row.get("email"))
+            current = local.get(rollno)
+            if current == remote:
+                continue
+            if current is None:
+                cursor.execute("INSERT INTO students (rollno, name, course, dob, email) VALUES (%s, %s, %s, %s, %s)",
+                               remote)
+            else:
+                cursor.execute("UPDATE students SET name = %s, course = %s, dob = %s, email = %s WHERE rollno = %s",
+                               remote[1:] + (rollno,))
+            local[rollno] = remote
+            applied += 1
+        return applied
+
+    def _apply_attendance(self, cursor, rows, pending):
+        floor = self.floor() if self.floor else None
+        if floor:
+            rows = [row for row in rows if as_date(row["date"]) >= floor]
+        if not rows:
+            return 0
+        students = sorted({row["student_id"] for row in rows})
+        days = sorted({str(row["date"])[:10] for row in rows})
+
+        cursor.execute(f"SELECT rollno, course FROM students WHERE rollno IN ({_placeholders(students)})", students)
+        courses = dict(cursor.fetchall())
+        cursor.execute(f"SELECT id, student_id, date, status, verification_method FROM student_attendance "
+                       f"WHERE student_id IN ({_placeholders(students)}) AND date IN ({_placeholders(days)})",
+                       students + days)
+        local = {(student_id, as_date(day).isoformat()): [record_id, str(status).lower(), method]
+                 for record_id, student_id, day, status, method in cursor.fetchall()}
+
+        applied = 0
+        for row in rows:
+            student_id = row["student_id"]
+            day = str(row["date"])[:10]
+            status = str(row.get("status") or "present").lower()
+            method = row.get("verification_method")
+            current = local.get((student_id, day))
+            if current is not None:
+                record_id, old_status, old_method = current
+                if str(record_id) in pending or (old_status, old_method) == (status, method):
+                    continue
+                cursor.execute("UPDATE student_attendance SET status = %s, verification_method = %s WHERE id = %s",
+                               (status, method, record_id))
+                old_counts = _counts(old_status)
+            else:
+                timestamp = str(row.get("timestamp") or day)[:19].replace("T", " ")
+                cursor.execute("INSERT INTO student_attendance (student_id, date, timestamp, status, "
+                               "verification_method) VALUES (%s, %s, %s, %s, %s)",
+                               (student_id, day, timestamp, status, method))
+                record_id = cursor.lastrowid
+                old_counts = (0, 0)
+            new_counts = _counts(status)
+            attendance_rollups.record_attendance(cursor, student_id, courses.get(student_id), as_date(day),
+                                                 present=new_counts[0] - old_counts[0],
+                                                 proxy=new_counts[1] - old_counts[1])
+            local[(student_id, day)] = [record_id, status, method]
+            applied += 1
+        return applied
@@ -10,9 +10,10 @@ import requests
 import json
 import time
 import sys
+import os
 
-# API base URL - using Raspberry Pi's IP address
-API_BASE_URL = "http://192.168.187.113:5000"
+# API base URL - the Raspberry Pi's IP address unless API_BASE_URL is set
+API_BASE_URL = os.getenv("API_BASE_URL", "http://192.168.187.113:5000")
 
 # Color codes for terminal output
 COLORS = {